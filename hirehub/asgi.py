@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hirehub.settings')
+# The async views run their queries on short-lived threads, and a persistent
+# connection is per thread, so each would leak one (see DB_CONN_MAX_AGE)
+os.environ.setdefault('DJANGO_DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -5,6 +5,8 @@ Django settings for hirehub project.
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -37,7 +39,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Before anything else that reads or changes the response body
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    # Sends catalog reads to the read replicas, if any. After SessionMiddleware.
+    'job_portal.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -67,14 +73,128 @@ WSGI_APPLICATION = 'hirehub.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+#
+# Chosen by environment: DJANGO_DB_ENGINE=sqlite (the default) or postgresql.
+# SQLite runs in WAL mode so readers never block the writer (set once per
+# database file, see job_portal.signals.use_wal_journal), waits up to
+# DJANGO_DB_TIMEOUT seconds for the write lock instead of failing with
+# "database is locked", and takes that lock when a transaction begins
+# (IMMEDIATE), so two transactions never deadlock upgrading their read locks.
+# Under WSGI each worker thread keeps its connection for
+# DJANGO_DB_CONN_MAX_AGE seconds, saving a connect per request. hirehub.asgi
+# defaults it to 0 instead: under ASGI queries run on threads that come and
+# go, and each would keep a connection open that nothing closes, so every
+# request opens and closes its own.
+# PostgreSQL borrows connections from Django's pool (needs psycopg[pool]),
+# which reuses them under ASGI too; set DJANGO_DB_POOL=0 to keep persistent connections instead, e.g. behind
+# PgBouncer.
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+DB_ENGINE = os.environ.get('DJANGO_DB_ENGINE', 'sqlite')
+DB_TIMEOUT = float(os.environ.get('DJANGO_DB_TIMEOUT', 20))
+DB_CONN_MAX_AGE = int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', 600))
+
+# Per connection; the journal mode is stored in the database file instead
+SQLITE_PRAGMAS = (
+    # In WAL mode only a checkpoint needs to fsync; commits stay durable
+    # against application crashes, though not against power loss
+    'PRAGMA synchronous = NORMAL;'
+    'PRAGMA mmap_size = 268435456;'
+    'PRAGMA cache_size = -32000;'
+    'PRAGMA temp_store = MEMORY'
+)
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DJANGO_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': DB_TIMEOUT,
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': SQLITE_PRAGMAS,
+            },
+        }
     }
+elif DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'hirehub'),
+            'USER': os.environ.get('DJANGO_DB_USER', ''),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', ''),
+            'PORT': os.environ.get('DJANGO_DB_PORT', ''),
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DJANGO_DB_POOL', '1') == '1':
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DJANGO_DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DJANGO_DB_POOL_MAX_SIZE', 20)),
+            # Seconds a request waits for a free connection
+            'timeout': DB_TIMEOUT,
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+else:
+    raise ImproperlyConfigured(f'DJANGO_DB_ENGINE must be sqlite or postgresql, not {DB_ENGINE!r}')
+
+# Read replicas of the job catalog: DJANGO_DB_REPLICAS is a comma-separated
+# list of SQLite files or PostgreSQL hosts, each a copy of the primary kept
+# up to date by replication. Job and company reads in GET requests go to a
+# replica (job_portal.routers); everything else, and every read by a user
+# who changed the catalog in the last DJANGO_DB_REPLICA_STICKY_SECONDS,
+# stays on the primary.
+DATABASE_REPLICAS = []
+for number, location in enumerate(filter(None, os.environ.get('DJANGO_DB_REPLICAS', '').split(',')), 1):
+    replica = {**DATABASES['default'], 'OPTIONS': {**DATABASES['default']['OPTIONS']}, 'TEST': {'MIRROR': 'default'}}
+    if DB_ENGINE == 'sqlite':
+        replica['NAME'] = location.strip()
+        replica['OPTIONS']['init_command'] = SQLITE_PRAGMAS + ';PRAGMA query_only = ON'
+    else:
+        replica['HOST'] = location.strip()
+    DATABASES[f'replica{number}'] = replica
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['job_portal.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = float(os.environ.get('DJANGO_DB_REPLICA_STICKY_SECONDS', 10))
+
+# Caches
+# Rendered resume previews live in their own cache. Swap the backend for
+# django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.redis.RedisCache (any Redis-compatible server)
+# to share it between processes. LocMemCache evicts least recently used entries;
+# AsyncLocMemCache is LocMemCache whose async methods (used by the async views)
+# run on the event loop instead of a worker thread.
+CACHES = {
+    'default': {
+        'BACKEND': 'job_portal.cache_backends.AsyncLocMemCache',
+    },
+    'resume_previews': {
+        'BACKEND': 'job_portal.cache_backends.AsyncLocMemCache',
+        'LOCATION': 'resume-previews',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 500},
+    },
+    'search_results': {
+        'BACKEND': 'job_portal.cache_backends.AsyncLocMemCache',
+        'LOCATION': 'search-results',
+        'TIMEOUT': 60 * 5,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
 }
 
+RESUME_PREVIEW_CACHE = 'resume_previews'
+# Job search result pages; the catalog generation that invalidates them is
+# kept in the database (job_portal.cache)
+JOB_SEARCH_CACHE = 'search_results'
+# Seconds a process trusts the catalog and resume generations it last read;
+# changes made by other processes reach its caches and indexes within this long
+SHARED_GENERATION_TTL = 1
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -124,14 +244,27 @@ AUTH_USER_MODEL = 'job_portal.CustomUser'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Job search
+# SQLiteFTSBackend falls back to the in-memory InvertedIndexBackend when FTS5 is unavailable
+JOB_SEARCH_BACKEND = 'job_portal.search.SQLiteFTSBackend'
+# Seconds facet counts are cached per normalized search
+JOB_FACET_CACHE_TIMEOUT = 60
+
 # Login URL
-LOGIN_URL = 'login'
+LOGIN_URL = 'job_portal:login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'index'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resume PDFs
+# Rendered PDFs are cached on disk per content version and rendered on a
+# bounded pool of worker threads
+RESUME_PDF_CACHE_DIR = os.path.join(MEDIA_ROOT, 'resume_pdfs')
+RESUME_PDF_WORKERS = 2
+RESUME_PDF_TIMEOUT = 60
+
 # Tailwind css
 TAILWIND_APP_NAME = 'job_portal'
 TAILWIND_APP_NAME = 'resume_builder'
\ No newline at end of file
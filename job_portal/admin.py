@@ -14,7 +14,8 @@ class CompanyAdmin(admin.ModelAdmin):
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
-    list_display = ('title', 'company', 'location', 'job_type', 'posted_date')
+    list_display = ('title', 'company', 'location', 'job_type', 'posted_date', 'source', 'expired_at')
     list_filter = ('job_type', 'company')
+    list_select_related = ('company',)
     search_fields = ('title', 'description', 'requirements')
     date_hierarchy = 'posted_date'
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class Job_portalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'job_portal'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,303 @@
+"""
+Cache for job search result pages.
+
+Entries are keyed on the normalized search, the cursor and the job catalog
+generation. Any Job or Company write bumps the generation once it commits,
+so stale pages become unreachable and age out of the cache (LRU on
+MAX_ENTRIES, expiry on TIMEOUT). The storage backend is whichever Django
+cache ``JOB_SEARCH_CACHE`` names (see ``CACHES``).
+
+Generations are Generation rows in the database, which every process and
+management command shares whatever the cache backend. A process rereads a
+generation once it is SHARED_GENERATION_TTL seconds old, so writes made
+elsewhere (import_jobs, other workers) show up within that long; its own
+bumps show up at once.
+
+The in-process indexes built from the catalog (search, suggestions, job
+matches) and from resumes (candidate matches) are GenerationalIndex
+subclasses: they remember the generation they were built at and rebuild
+once it moves on, e.g. after a bulk write that sends no signals.
+
+Concurrent misses for the same page are coalesced within a process: one
+request runs the search and the others wait for its result. The async
+variants coalesce the requests of an event loop the same way.
+
+A request pinned to the primary (see job_portal.routers) bypasses the cache,
+so a user reads their own writes, and pages read from replicas right after
+a catalog change are not stored: a lagging replica may not have it yet.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+from .routers import pinned_to_primary, reads_from_replicas
+
+GENERATION_KEY = 'job-catalog-generation'
+# Bumped when resumes change, for indexes built from resumes
+RESUME_GENERATION_KEY = 'resume-generation'
+
+# name -> (generation, monotonic time it was read, monotonic time this
+# process first saw it)
+_seen = {}
+
+
+def get_search_cache():
+    return caches[getattr(settings, 'JOB_SEARCH_CACHE', 'default')]
+
+
+def _recent_generation(key):
+    seen = _seen.get(key)
+    if seen is not None and time.monotonic() - seen[1] < getattr(settings, 'SHARED_GENERATION_TTL', 1):
+        return seen[0]
+    return None
+
+
+def _read_generation(key):
+    from .models import Generation
+
+    generation = Generation.objects.filter(name=key).values_list('value', flat=True).first()
+    if generation is None:
+        # Seeded from the clock so a recreated counter never reuses old cache keys
+        generation = Generation.objects.get_or_create(name=key, defaults={'value': time.time_ns()})[0].value
+    _remember(key, generation)
+    return generation
+
+
+def _remember(key, generation):
+    now = time.monotonic()
+    seen = _seen.get(key)
+    _seen[key] = (generation, now, seen[2] if seen is not None and seen[0] == generation else now)
+
+
+def shared_generation(key):
+    generation = _recent_generation(key)
+    return _read_generation(key) if generation is None else generation
+
+
+async def ashared_generation(key):
+    generation = _recent_generation(key)
+    return await sync_to_async(_read_generation)(key) if generation is None else generation
+
+
+def bump_shared_generation(key):
+    """Start a new generation and return it"""
+    from .models import Generation
+
+    with transaction.atomic():
+        if not Generation.objects.filter(name=key).update(value=F('value') + 1):
+            Generation.objects.get_or_create(name=key, defaults={'value': time.time_ns()})
+        # The row stays locked until commit, so this is the value this bump set
+        generation = Generation.objects.values_list('value', flat=True).get(name=key)
+    _remember(key, generation)
+    return generation
+
+
+def catalog_generation():
+    return shared_generation(GENERATION_KEY)
+
+
+async def acatalog_generation():
+    return await ashared_generation(GENERATION_KEY)
+
+
+def bump_catalog_generation():
+    return bump_shared_generation(GENERATION_KEY)
+
+
+def replicas_may_lag():
+    """
+    Whether this request reads the catalog from replicas that may not have
+    the latest catalog change yet: one this process saw less than
+    DATABASE_REPLICA_STICKY_SECONDS ago. Results read then are not cached,
+    as they would be cached under the new generation.
+    """
+    seen = _seen.get(GENERATION_KEY)
+    return reads_from_replicas() and (
+        seen is None or time.monotonic() - seen[2] < settings.DATABASE_REPLICA_STICKY_SECONDS
+    )
+
+
+def resume_generation():
+    return shared_generation(RESUME_GENERATION_KEY)
+
+
+def bump_resume_generation():
+    return bump_shared_generation(RESUME_GENERATION_KEY)
+
+
+class GenerationalIndex:
+    """
+    Base of the indexes held in process memory and built from rows that
+    other processes write too.
+
+    Signals only reach the process that made a write, and bulk writes
+    (import_jobs, backfill_job_fields) send none, so an index remembers the
+    shared generation it was built at and _ensure_built() rebuilds it once
+    the generation has moved on. Writes this process applies to the index
+    itself are followed by caught_up() with the generation their bump
+    started, which keeps the index without a rebuild if no other write came
+    in between. Subclasses set generation_key and implement rebuild(),
+    which calls _start_build() before it reads anything.
+    """
+
+    generation_key = GENERATION_KEY
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._generation = None
+
+    def current_generation(self):
+        return shared_generation(self.generation_key)
+
+    def _ensure_built(self):
+        if not self._built or self._generation != self.current_generation():
+            self.rebuild()
+
+    def _start_build(self):
+        # Read first: a write that commits while the index loads bumps it again
+        self._generation = self.current_generation()
+
+    def caught_up(self, generation):
+        """This process applied the write whose bump started generation"""
+        with self._lock:
+            if self._built and self._generation == generation - 1:
+                self._generation = generation
+
+
+def _search_digest(params, cursor, variant):
+    search = json.dumps([params, cursor or '', variant], sort_keys=True)
+    return hashlib.md5(search.encode()).hexdigest()
+
+
+def search_cache_key(params, cursor, variant=''):
+    return f'job-search:{catalog_generation()}:{_search_digest(params, cursor, variant)}'
+
+
+async def asearch_cache_key(params, cursor, variant=''):
+    return f'job-search:{await acatalog_generation()}:{_search_digest(params, cursor, variant)}'
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run func once per key at a time; callers arriving meanwhile share its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines of one event loop"""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func):
+        call = self._calls.get(key)
+        if call is not None:
+            # shield: a waiter that is cancelled must not cancel the leader's result
+            return await asyncio.shield(call)
+        call = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except Exception as error:
+            call.set_exception(error)
+            call.exception()  # retrieved here, so an unawaited failure is not logged
+            raise
+        else:
+            call.set_result(result)
+        finally:
+            del self._calls[key]
+        return result
+
+
+_flights = SingleFlight()
+_async_flights = AsyncSingleFlight()
+
+
+def cached_search_results(params, cursor, compute, variant=''):
+    """
+    Return the cached result page for the search, calling compute() to
+    build it on a miss. compute must return a picklable value; variant
+    separates renderings of the same page.
+    """
+    if pinned_to_primary():
+        # Reading its own writes: cached pages may predate them
+        return compute()
+    cache = get_search_cache()
+    key = search_cache_key(params, cursor, variant)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    def fill():
+        # A request that led an earlier flight may have stored it already
+        result = cache.get(key)
+        if result is None:
+            result = compute()
+            if not replicas_may_lag():
+                cache.set(key, result)
+        return result
+
+    return _flights.do(key, fill)
+
+
+async def acached_search_results(params, cursor, compute, variant=''):
+    """cached_search_results() for async views; compute is a coroutine function"""
+    if pinned_to_primary():
+        return await compute()
+    cache = get_search_cache()
+    key = await asearch_cache_key(params, cursor, variant)
+    result = await cache.aget(key)
+    if result is not None:
+        return result
+
+    async def fill():
+        result = await cache.aget(key)
+        if result is None:
+            result = await compute()
+            if not replicas_may_lag():
+                await cache.aset(key, result)
+        return result
+
+    return await _async_flights.do(key, fill)
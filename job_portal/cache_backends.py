@@ -0,0 +1,36 @@
+"""
+Cache backends with native async methods.
+
+Django's base cache implements ``aget``, ``aset`` and the other async methods
+by running the sync ones through ``sync_to_async``, a thread hop per call.
+The local-memory cache never waits on I/O (its lock is only held to touch a
+dict), so here the async methods call the sync ones on the event loop.
+"""
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class AsyncLocMemCache(LocMemCache):
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.add(key, value, timeout, version)
+
+    async def aget(self, key, default=None, version=None):
+        return self.get(key, default, version)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set(key, value, timeout, version)
+
+    async def atouch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.touch(key, timeout, version)
+
+    async def adelete(self, key, version=None):
+        return self.delete(key, version)
+
+    async def ahas_key(self, key, version=None):
+        return self.has_key(key, version)
+
+    async def aincr(self, key, delta=1, version=None):
+        return self.incr(key, delta, version)
+
+    async def aclear(self):
+        self.clear()
@@ -0,0 +1,196 @@
+"""
+Candidate ranking: the resumes that best fit a job.
+
+Every resume is a sparse feature vector of its skill terms (weighted by
+level) and language terms (weighted by proficiency), held as a term-by-resume
+matrix in process memory, plus its years of experience from its Experience
+dates. A job's title, requirements and description are weighed against the
+matrix columns of their terms with resume-corpus IDF. Resumes at least as
+experienced as the "N+ years" the requirements ask for earn a bonus. The
+matrix is built lazily; resumes reported by resume_content_changed are
+reloaded before the next ranking, and deleted resumes are dropped. Both bump
+the shared resume generation, and the matrix is rebuilt when that moves past
+the one it was built at: another process changed a resume.
+"""
+import heapq
+import math
+import re
+from collections import defaultdict
+from datetime import date
+from functools import lru_cache
+
+from .cache import RESUME_GENERATION_KEY, GenerationalIndex
+from .recommendations import SKILL_LEVEL_WEIGHTS, term_frequencies
+from .search import tokenize
+
+PROFICIENCY_WEIGHTS = {
+    'elementary': 0.5,
+    'limited_working': 1.0,
+    'professional_working': 1.5,
+    'full_professional': 2.0,
+    'native': 2.5,
+}
+
+# "3+ years", "5-7 years", "2 yrs"; the first number is the minimum asked for
+YEARS_RE = re.compile(r'(\d+)\s*\+?\s*(?:-\s*\d+\s*)?(?:years?|yrs?)\b', re.IGNORECASE)
+# Share of the score a resume meeting the required years adds
+YEARS_WEIGHT = 0.25
+# Resumes reloaded per query when syncing changed ones
+SYNC_BATCH_SIZE = 500
+
+
+def required_years(text):
+    match = YEARS_RE.search(text or '')
+    return int(match.group(1)) if match else None
+
+
+def experience_years(periods, today=None):
+    """Years covered by (start_date, end_date, current) periods, overlaps counted once"""
+    today = today or date.today()
+    spans = sorted(
+        (start, today if current or end is None else end)
+        for start, end, current in periods
+        if start is not None
+    )
+    days = 0
+    covered_until = None
+    for start, end in spans:
+        if covered_until is not None and start < covered_until:
+            start = covered_until
+        if end > start:
+            days += (end - start).days
+            covered_until = end
+    return days / 365.25
+
+
+class CandidateMatcher(GenerationalIndex):
+    generation_key = RESUME_GENERATION_KEY
+
+    def __init__(self):
+        super().__init__()
+        self._postings = defaultdict(dict)  # term -> {resume_id: weight}
+        self._resume_terms = {}             # resume_id -> terms
+        self._years = {}                    # resume_id -> years of experience
+        self._stale = set()                 # resume ids to reload
+
+    def _add(self, resume_id, weights, years):
+        for term, weight in weights.items():
+            self._postings[term][resume_id] = weight
+        self._resume_terms[resume_id] = tuple(weights)
+        self._years[resume_id] = years
+
+    def _remove(self, resume_id):
+        for term in self._resume_terms.pop(resume_id, ()):
+            postings = self._postings[term]
+            postings.pop(resume_id, None)
+            if not postings:
+                del self._postings[term]
+        self._years.pop(resume_id, None)
+
+    @staticmethod
+    def load_features(resume_ids=None):
+        """{resume_id: (term weights, years)} of the given resumes, or of all"""
+        from resume_builder.models import Experience, Language, Resume, Skill
+
+        def rows(model, *fields):
+            queryset = model.objects.all()
+            if resume_ids is not None:
+                queryset = queryset.filter(resume_id__in=resume_ids)
+            return queryset.values_list('resume_id', *fields).iterator(chunk_size=5000)
+
+        # A term listed twice keeps its strongest level
+        weights = defaultdict(dict)
+        for resume_id, name, level in rows(Skill, 'name', 'level'):
+            resume_weights = weights[resume_id]
+            for token in tokenize(name):
+                resume_weights[token] = max(resume_weights.get(token, 0), SKILL_LEVEL_WEIGHTS.get(level, 1.5))
+        for resume_id, name, proficiency in rows(Language, 'name', 'proficiency'):
+            resume_weights = weights[resume_id]
+            for token in tokenize(name):
+                resume_weights[token] = max(resume_weights.get(token, 0), PROFICIENCY_WEIGHTS.get(proficiency, 1.0))
+        periods = defaultdict(list)
+        for resume_id, *period in rows(Experience, 'start_date', 'end_date', 'current'):
+            periods[resume_id].append(period)
+
+        today = date.today()
+        resumes = Resume.objects.all()
+        if resume_ids is not None:
+            resumes = resumes.filter(pk__in=resume_ids)
+        return {
+            resume_id: (weights.get(resume_id, {}), experience_years(periods.get(resume_id, ()), today))
+            for resume_id in resumes.values_list('pk', flat=True).iterator(chunk_size=5000)
+        }
+
+    def _sync(self):
+        while self._stale:
+            batch = [self._stale.pop() for _ in range(min(SYNC_BATCH_SIZE, len(self._stale)))]
+            features = self.load_features(batch)
+            for resume_id in batch:
+                self._remove(resume_id)
+                if resume_id in features:
+                    self._add(resume_id, *features[resume_id])
+
+    def job_vector(self, title, requirements, description):
+        """IDF-weighted terms of a job, against the resume corpus"""
+        frequencies = term_frequencies([(title, 3.0), (requirements, 2.0), (description, 1.0)])
+        total = len(self._resume_terms)
+        weights = {}
+        for term, tf in frequencies.items():
+            postings = self._postings.get(term)
+            if postings:
+                idf = math.log((1 + total) / (1 + len(postings))) + 1
+                weights[term] = (1 + math.log(tf)) * idf
+        return weights
+
+    def rank(self, title, requirements, description, limit=20):
+        """
+        [(resume_id, score, years), ...] of the limit best candidates, best
+        first. Only resumes sharing a skill or language term with the job
+        are ranked.
+        """
+        with self._lock:
+            self._ensure_built()
+            self._sync()
+            query = self.job_vector(title, requirements, description)
+            norm = math.sqrt(sum(weight * weight for weight in query.values())) or 1.0
+            scores = {}
+            get = scores.get
+            for term, weight in query.items():
+                weight /= norm
+                for resume_id, resume_weight in self._postings[term].items():
+                    scores[resume_id] = get(resume_id, 0.0) + weight * resume_weight
+
+            wanted = required_years(requirements)
+            if wanted:
+                years = self._years
+                for resume_id, score in scores.items():
+                    scores[resume_id] = score * (1 + YEARS_WEIGHT * min(years[resume_id] / wanted, 1.0))
+            best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+            return [(resume_id, scores[resume_id], self._years[resume_id]) for resume_id in best]
+
+    def mark_stale(self, resume_id):
+        with self._lock:
+            if self._built:
+                self._stale.add(resume_id)
+
+    def remove_resume(self, resume_id):
+        with self._lock:
+            if self._built:
+                self._stale.discard(resume_id)
+                self._remove(resume_id)
+
+    def rebuild(self):
+        with self._lock:
+            self._start_build()
+            self._postings.clear()
+            self._resume_terms.clear()
+            self._years.clear()
+            self._stale.clear()
+            for resume_id, (weights, years) in self.load_features().items():
+                self._add(resume_id, weights, years)
+            self._built = True
+
+
+@lru_cache(maxsize=None)
+def get_candidate_matcher():
+    return CandidateMatcher()
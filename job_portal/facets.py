@@ -0,0 +1,135 @@
+"""
+Facet counts for job search results.
+
+The counts for every facet come from one query: a UNION ALL of one grouped
+aggregate per facet over the filtered result set; for a keyword search, over
+every match the backend finds (its matches()), not only the ranked pages.
+The in-memory index's matches are no queryset: it counts their facets
+itself (see search.IndexMatches). The counts are cached per normalized
+search and catalog generation for JOB_FACET_CACHE_TIMEOUT seconds.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast
+
+from .cache import acatalog_generation, catalog_generation, replicas_may_lag
+from .routers import pinned_to_primary
+from .search import IndexMatches
+
+# Facet name (also its query parameter), heading, and the value and label columns
+FACETS = (
+    ('job_type', 'Job type', F('job_type'), F('job_type')),
+    ('city', 'Location', F('city_key'), F('city_key')),
+    ('company', 'Company', Cast('company_id', CharField()), F('company__name')),
+)
+FACET_LIMIT = 10
+
+
+def facet_query(queryset):
+    """The UNION ALL of every facet's grouped counts over queryset"""
+    base = queryset.order_by()
+    grouped = [
+        base.annotate(facet=Value(name), value=value, label=label)
+        .values('facet', 'value', 'label')
+        .annotate(count=Count('pk'))
+        for name, _, value, label in FACETS
+    ]
+    return grouped[0].union(*grouped[1:], all=True)
+
+
+def facet_counts(queryset, limit=FACET_LIMIT):
+    """
+    Count the jobs in queryset per job type, city and company. Returns
+    {facet: [{'value', 'label', 'count'}, ...]} with the largest counts first.
+    """
+    if isinstance(queryset, IndexMatches):
+        return collect_facet_counts(queryset.facet_rows(), limit)
+    if queryset.query.is_empty():
+        return collect_facet_counts([], limit)
+    return collect_facet_counts(facet_query(queryset), limit)
+
+
+async def afacet_counts(queryset, limit=FACET_LIMIT):
+    if isinstance(queryset, IndexMatches):
+        return collect_facet_counts(queryset.facet_rows(), limit)
+    if queryset.query.is_empty():
+        return collect_facet_counts([], limit)
+    return collect_facet_counts([row async for row in facet_query(queryset).aiterator()], limit)
+
+
+def collect_facet_counts(rows, limit):
+    counts = {name: [] for name, *_ in FACETS}
+    for row in rows:
+        if row['value']:
+            label = row['label'].title() if row['facet'] == 'city' else row['label']
+            counts[row['facet']].append({'value': row['value'], 'label': label, 'count': row['count']})
+    for values in counts.values():
+        values.sort(key=lambda item: (-item['count'], item['label']))
+        del values[limit:]
+    return counts
+
+
+def facet_cache_key(params, generation=None):
+    digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    if generation is None:
+        generation = catalog_generation()
+    return f'job-facets:{generation}:{digest}'
+
+
+def get_facets(queryset, params):
+    """
+    facet_counts() of queryset, cached under the normalized search params
+    like result pages are (see job_portal.cache)
+    """
+    if pinned_to_primary():
+        return facet_counts(queryset)
+    key = facet_cache_key(params)
+    counts = cache.get(key)
+    if counts is None:
+        counts = facet_counts(queryset)
+        if not replicas_may_lag():
+            cache.set(key, counts, settings.JOB_FACET_CACHE_TIMEOUT)
+    return counts
+
+
+async def aget_facets(queryset, params):
+    if pinned_to_primary():
+        return await afacet_counts(queryset)
+    key = facet_cache_key(params, await acatalog_generation())
+    counts = await cache.aget(key)
+    if counts is None:
+        counts = await afacet_counts(queryset)
+        if not replicas_may_lag():
+            await cache.aset(key, counts, settings.JOB_FACET_CACHE_TIMEOUT)
+    return counts
+
+
+def facet_groups(counts, query_dict, path):
+    """
+    Facets ready for the template: each value carries the URL (path plus
+    query string) that filters on it, and the group the URL that clears its
+    filter.
+    """
+    groups = []
+    for name, heading, *_ in FACETS:
+        selected = query_dict.get(name, '')
+        values = []
+        for item in counts.get(name, []):
+            params = query_dict.copy()
+            params[name] = item['value']
+            params.pop('cursor', None)
+            values.append(dict(item, url=f'{path}?{params.urlencode()}', active=item['value'] == selected))
+        cleared = query_dict.copy()
+        cleared.pop(name, None)
+        cleared.pop('cursor', None)
+        groups.append({
+            'name': name,
+            'heading': heading,
+            'values': values,
+            'clear_url': f'{path}?{cleared.urlencode()}' if selected else None,
+        })
+    return groups
@@ -0,0 +1,92 @@
+"""
+Streaming job feeds in CSV or JSON Lines.
+
+Rows are read and written one at a time, so a feed of any size is handled
+in constant memory. A ``.gz`` suffix is (de)compressed on the fly and ``-``
+stands for stdin/stdout.
+"""
+import csv
+import gzip
+import hashlib
+import io
+import json
+import sys
+
+# Columns of a feed row, in export order
+FEED_COLUMNS = (
+    'external_id', 'title', 'company_name', 'company_description', 'company_logo_url', 'location',
+    'salary_range', 'job_type', 'posted_date', 'description', 'requirements',
+)
+FEED_FORMATS = ('csv', 'jsonl')
+# Columns a job is written from; the company's details only matter when it is created
+HASHED_COLUMNS = (
+    'title', 'company_name', 'location', 'salary_range', 'job_type', 'posted_date', 'description', 'requirements',
+)
+
+
+class FeedError(Exception):
+    pass
+
+
+def feed_format(path, fmt=None):
+    """The explicit format, or the one named by the file extension"""
+    if fmt:
+        return fmt
+    name = path[:-3] if path.endswith('.gz') else path
+    for candidate in FEED_FORMATS:
+        if name.endswith('.' + candidate):
+            return candidate
+    raise FeedError(f'Cannot tell the format of {path}; pass --format')
+
+
+def open_feed(path, mode):
+    """Text stream for path, mode 'r' or 'w'"""
+    if path == '-':
+        return io.TextIOWrapper((sys.stdin if mode == 'r' else sys.stdout).buffer, encoding='utf-8', newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def read_feed(stream, fmt):
+    """
+    Yield (line number, row dict) for each row. A malformed JSON line yields
+    its error message in place of the dict.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        missing = {'title', 'company_name'} - set(reader.fieldnames or ())
+        if missing:
+            raise FeedError(f'CSV header lacks {", ".join(sorted(missing))}')
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield line_number, f'Invalid JSON: {error}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, 'Expected a JSON object'
+            continue
+        yield line_number, row
+
+
+def write_feed(rows, stream, fmt):
+    """Write row dicts with FEED_COLUMNS keys to stream"""
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, FEED_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def content_hash(values):
+    """SHA-256 hex digest of a row's HASHED_COLUMNS values (missing ones count as empty)"""
+    data = json.dumps([str(values.get(column) or '') for column in HASHED_COLUMNS], ensure_ascii=False)
+    return hashlib.sha256(data.encode()).hexdigest()
@@ -83,3 +83,18 @@ class SearchForm(forms.Form):
         'placeholder': 'Location',
         'class': 'form-control'
     }))
+
+class JobImportForm(JobForm):
+    """
+    One row of a job feed. The company is given by name (with optional
+    details for creating it) and resolved by the importer, so validating a
+    row runs no query.
+    """
+    external_id = forms.CharField(max_length=100, required=False)
+    company_name = forms.CharField(max_length=100)
+    company_description = forms.CharField(required=False)
+    company_logo_url = forms.URLField(max_length=500, required=False)
+    posted_date = forms.DateTimeField(required=False)
+    
+    class Meta(JobForm.Meta):
+        fields = [field for field in JobForm.Meta.fields if field != 'company'] + ['posted_date']
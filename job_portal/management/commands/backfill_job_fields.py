@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from job_portal.cache import bump_catalog_generation
+from job_portal.models import Job
+
+FIELDS = ['salary_min', 'salary_max', 'city_key']
+
+
+class Command(BaseCommand):
+    help = 'Parse salary_range and location of every job into the structured salary and city columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only report jobs whose structured columns are stale')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.order_by('pk').only('pk', 'salary_range', 'location', *FIELDS)
+
+        stale = []
+        checked = updated = unparsed = 0
+        for job in jobs.iterator(chunk_size=options['batch_size']):
+            checked += 1
+            before = [getattr(job, field) for field in FIELDS]
+            job.normalize_fields()
+            if job.salary_min is None and job.salary_max is None:
+                unparsed += 1
+            if [getattr(job, field) for field in FIELDS] != before:
+                stale.append(job)
+            if not options['verify'] and len(stale) >= options['batch_size']:
+                self.save(stale)
+                updated += len(stale)
+                stale = []
+
+        if options['verify']:
+            if stale:
+                raise CommandError(
+                    f'{len(stale)} of {checked} jobs have stale salary or city columns: '
+                    + ', '.join(str(job.pk) for job in stale[:20])
+                )
+            self.stdout.write(self.style.SUCCESS(f'All {checked} jobs have up-to-date salary and city columns.'))
+            return
+
+        self.save(stale)
+        updated += len(stale)
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {updated} of {checked} jobs ({unparsed} salary ranges could not be parsed).'
+        ))
+
+    def save(self, jobs):
+        # bulk_update sends no signals, so the search index is left alone and
+        # cached search results are invalidated here
+        with transaction.atomic():
+            Job.objects.bulk_update(jobs, FIELDS)
+            transaction.on_commit(bump_catalog_generation)
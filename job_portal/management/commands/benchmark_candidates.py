@@ -0,0 +1,53 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_portal.candidates import CandidateMatcher
+from job_portal.recommendations import SKILL_LEVEL_WEIGHTS
+
+from .benchmark_recommendations import weighted_words
+
+LANGUAGES = ['english', 'hindi', 'tamil', 'telugu', 'kannada', 'marathi', 'bengali', 'german', 'french']
+
+
+class Command(BaseCommand):
+    help = 'Time ranking a synthetic resume feature matrix against jobs and fail above the time budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=1000000)
+        parser.add_argument('--jobs', type=int, default=20,
+                            help='Number of synthetic jobs to rank candidates for')
+        parser.add_argument('--budget-s', type=float, default=5.0)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        levels = list(SKILL_LEVEL_WEIGHTS.values())
+        matcher = CandidateMatcher()
+        # Filled directly: the benchmark measures the matrix, not the database
+        started = time.perf_counter()
+        for resume_id in range(1, options['resumes'] + 1):
+            weights = {skill: rng.choice(levels) for skill in weighted_words(rng, 8).split()}
+            weights[rng.choice(LANGUAGES)] = 2.0
+            matcher._add(resume_id, weights, rng.uniform(0, 20))
+        matcher._built = True
+        matcher._generation = matcher.current_generation()
+        self.stdout.write(f'Built a {options["resumes"]}-resume matrix of {len(matcher._postings)} terms '
+                          f'in {time.perf_counter() - started:.1f}s')
+
+        timings = []
+        for _ in range(options['jobs']):
+            title = weighted_words(rng, 2)
+            requirements = f'{rng.randint(1, 8)}+ years of experience with {weighted_words(rng, 8)}, fluent English'
+            description = weighted_words(rng, 30)
+            started = time.perf_counter()
+            matcher.rank(title, requirements, description, 20)
+            timings.append(time.perf_counter() - started)
+
+        self.stdout.write(f'top 20 of {options["resumes"]} resumes: median {statistics.median(timings):.2f}s, '
+                          f'max {max(timings):.2f}s')
+        if max(timings) > options['budget_s']:
+            raise CommandError(f'Slowest ranking took {max(timings):.2f}s, over the {options["budget_s"]:.0f}s budget')
+        self.stdout.write(self.style.SUCCESS(f'Every ranking within {options["budget_s"]:.0f}s.'))
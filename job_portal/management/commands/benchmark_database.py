@@ -0,0 +1,137 @@
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection
+from django.http import QueryDict
+
+from job_portal.facets import facet_counts
+from job_portal.models import CustomUser, Job
+from job_portal.normalization import normalize_search_params
+from job_portal.pagination import paginate_keyset
+from job_portal.search import get_search_backend
+from job_portal.views import filter_jobs
+from resume_builder.document import save_resume_document
+from resume_builder.models import Resume
+
+BENCHMARK_EMAIL = 'db-benchmark@example.invalid'
+KEYWORDS = ('python', 'developer', 'engineer', 'manager', 'data', 'design')
+SKILLS = ('Python', 'Django', 'SQL', 'React', 'Docker', 'Go', 'Kubernetes', 'Figma')
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent resume saves and job searches against the configured database '
+        'and report throughput, latency and lock errors'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16,
+                            help='Concurrent workers, each with its own connection')
+        parser.add_argument('--duration', type=float, default=20,
+                            help='Seconds to run')
+        parser.add_argument('--write-share', type=float, default=0.2,
+                            help='Share of operations that save a resume; the rest search or browse')
+        parser.add_argument('--resumes', type=int, default=50,
+                            help='Resumes created for the writers to edit (deleted afterwards)')
+
+    def handle(self, *args, **options):
+        self.describe_profile()
+        CustomUser.objects.filter(email=BENCHMARK_EMAIL).delete()
+        user = CustomUser.objects.create_user(BENCHMARK_EMAIL, name='Database benchmark', mobile='0')
+        resumes = Resume.objects.bulk_create(
+            Resume(user=user, title=f'Benchmark resume {i}') for i in range(options['resumes'])
+        )
+        self.resume_ids = [resume.pk for resume in resumes]
+        try:
+            timings, errors, elapsed = self.run(options)
+        finally:
+            user.delete()
+
+        self.stdout.write(f'{"operation":<14}{"count":>8}{"errors":>8}{"ops/s":>9}{"p50 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+        for operation in ('resume save', 'search', 'browse'):
+            values = sorted(timings[operation])
+            failed = sum(errors[operation].values())
+            if len(values) < 2:
+                self.stdout.write(f'{operation:<14}{len(values):>8}{failed:>8}')
+                continue
+            p99 = statistics.quantiles(values, n=100, method='inclusive')[98]
+            self.stdout.write(
+                f'{operation:<14}{len(values):>8}{failed:>8}{len(values) / elapsed:>9.0f}'
+                f'{statistics.median(values):>9.1f}{p99:>9.1f}{values[-1]:>9.1f}'
+            )
+        for operation, messages in errors.items():
+            for message, count in messages.most_common():
+                self.stdout.write(self.style.ERROR(f'{operation}: {count} x {message}'))
+
+    def describe_profile(self):
+        settings_dict = connection.settings_dict
+        profile = [connection.vendor, f'CONN_MAX_AGE={settings_dict["CONN_MAX_AGE"]}']
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size'):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    profile.append(f'{pragma}={cursor.fetchone()[0]}')
+            profile.append(f'transaction_mode={connection.transaction_mode or "DEFERRED"}')
+        pool = settings_dict['OPTIONS'].get('pool')
+        if pool:
+            profile.append(f'pool={pool}')
+        self.stdout.write('Profile: ' + ', '.join(profile))
+
+    def run(self, options):
+        deadline = time.perf_counter() + options['duration']
+        timings = defaultdict(list)
+        errors = defaultdict(Counter)
+        lock = threading.Lock()
+        operations = {'resume save': self.save_resume, 'search': self.search, 'browse': self.browse}
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                while time.perf_counter() < deadline:
+                    if rng.random() < options['write_share']:
+                        operation = 'resume save'
+                    else:
+                        operation = rng.choice(('search', 'browse'))
+                    started = time.perf_counter()
+                    try:
+                        operations[operation](rng)
+                    except OperationalError as error:
+                        with lock:
+                            errors[operation][str(error)] += 1
+                    else:
+                        with lock:
+                            timings[operation].append((time.perf_counter() - started) * 1000)
+                    # Where a request would end: drops the connection unless CONN_MAX_AGE keeps it
+                    close_old_connections()
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, errors, time.perf_counter() - started
+
+    def save_resume(self, rng):
+        """An editor save: a new title and a replaced skills section, in one transaction"""
+        skills = rng.sample(SKILLS, rng.randint(1, 4))
+        save_resume_document(rng.choice(self.resume_ids), {
+            'title': f'Benchmark resume {rng.randrange(10**6)}',
+            'skills': [{'name': name, 'level': 'advanced'} for name in skills],
+        })
+
+    def search(self, rng):
+        """A keyword search page on a cache miss: ranked page plus facet counts"""
+        params = normalize_search_params(QueryDict(f'keyword={rng.choice(KEYWORDS)}'))
+        queryset = filter_jobs(Job.objects.active(), params).select_related('company')
+        _, matches = get_search_backend().search_page(queryset, params['keyword'])
+        facet_counts(matches)
+
+    def browse(self, rng):
+        paginate_keyset(Job.objects.active().select_related('company'), None, 20)
@@ -0,0 +1,59 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_portal.recommendations import JobMatcher, job_vector, term_frequencies
+
+# A skill vocabulary with a long tail, as in real postings: a few words are
+# in most jobs and most words are in few
+SKILLS = [f'skill{i}' for i in range(20000)]
+FILLER = ['experience', 'team', 'work', 'strong', 'knowledge', 'develop', 'years', 'good', 'communication']
+
+
+def weighted_words(rng, count):
+    return ' '.join(SKILLS[min(int(rng.paretovariate(0.8)) - 1, len(SKILLS) - 1)] for _ in range(count))
+
+
+class Command(BaseCommand):
+    help = 'Time top-N job recommendations against a synthetic job matrix and fail above the latency budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100000)
+        parser.add_argument('--resumes', type=int, default=200,
+                            help='Number of synthetic resumes to recommend for')
+        parser.add_argument('--budget-ms', type=float, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        matcher = JobMatcher()
+        # Filled directly: the benchmark measures the matrix, not the database
+        started = time.perf_counter()
+        for job_id in range(1, options['jobs'] + 1):
+            title = weighted_words(rng, 2)
+            requirements = weighted_words(rng, 8) + ' ' + ' '.join(rng.sample(FILLER, 3))
+            description = weighted_words(rng, 30) + ' ' + ' '.join(rng.sample(FILLER, 5))
+            matcher._add(job_id, job_vector(title, requirements, description))
+        matcher._built = True
+        matcher._generation = matcher.current_generation()
+        self.stdout.write(f'Built a {options["jobs"]}-job matrix of {len(matcher._postings)} terms '
+                          f'in {time.perf_counter() - started:.1f}s')
+
+        timings = []
+        for _ in range(options['resumes']):
+            frequencies = term_frequencies([
+                (weighted_words(rng, 12), 2.0),
+                (weighted_words(rng, 60) + ' ' + ' '.join(FILLER), 1.0),
+            ])
+            started = time.perf_counter()
+            matcher.top_jobs(frequencies, 5)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        p99 = statistics.quantiles(timings, n=100)[98]
+        self.stdout.write(f'top 5 of {options["jobs"]} jobs: p50 {statistics.median(timings):.1f} ms, '
+                          f'p99 {p99:.1f} ms, max {max(timings):.1f} ms')
+        if p99 > options['budget_ms']:
+            raise CommandError(f'p99 {p99:.1f} ms is over the {options["budget_ms"]:.0f} ms budget')
+        self.stdout.write(self.style.SUCCESS(f'p99 within {options["budget_ms"]:.0f} ms.'))
@@ -0,0 +1,67 @@
+import gzip
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from job_portal.management.seeding import seed_jobs
+from job_portal.models import Job
+from job_portal.pagination import DEFAULT_KEYSET, KeysetPage
+from job_portal.search import get_search_backend
+from job_portal.views import COMPACT_JSON, jobs_page_payload
+
+
+class Command(BaseCommand):
+    help = 'Compare bytes on the wire and server CPU of the HTML and row AJAX search payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[50, 500, 5000],
+                            help='Number of results per payload')
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = options['sizes']
+        factory = RequestFactory()
+        ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        formats = {
+            'html': factory.get('/search/', **ajax),
+            'rows': factory.get('/search/', {'format': 'rows'}, **ajax),
+        }
+        codecs = {'gzip': lambda data: gzip.compress(data, compresslevel=6)}
+
+        self.stdout.write(f'CPU milliseconds per payload (mean of {options["iterations"]}), bytes on the wire')
+        header = f'{"results":>8} {"format":<6}{"build ms":>10}{"bytes":>10}'
+        for name in codecs:
+            header += f'{name + " ms":>10}{name + " bytes":>12}'
+        self.stdout.write(header)
+        try:
+            with transaction.atomic():
+                seed_jobs(max(sizes))
+                for size in sizes:
+                    jobs = list(Job.objects.select_related('company').order_by(*DEFAULT_KEYSET)[:size])
+                    page = KeysetPage(jobs, None)
+                    for fmt, request in formats.items():
+                        context = {'jobs': jobs, 'page_obj': page, 'request': request}
+
+                        def build():
+                            payload = jobs_page_payload(request, page, context)
+                            return json.dumps(payload, **COMPACT_JSON).encode()
+
+                        build_ms, body = self.measure(build, options['iterations'])
+                        line = f'{size:>8} {fmt:<6}{build_ms:>10.2f}{len(body):>10}'
+                        for compress in codecs.values():
+                            compress_ms, compressed = self.measure(lambda: compress(body), options['iterations'])
+                            line += f'{compress_ms:>10.2f}{len(compressed):>12}'
+                        self.stdout.write(line)
+                transaction.set_rollback(True)
+        finally:
+            get_search_backend().rebuild()
+
+    def measure(self, func, iterations):
+        result = func()
+        started = time.process_time()
+        for _ in range(iterations):
+            func()
+        return (time.process_time() - started) / iterations * 1000, result
@@ -0,0 +1,126 @@
+import asyncio
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_portal.models import Job
+
+# Browsing traffic: listings, searches and job pages
+SEARCHES = ('/search/?keyword=python', '/search/?keyword=developer&job_type=Full-time', '/search/?city=bangalore')
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test running servers with concurrent keep-alive clients and compare throughput and latency. '
+        'Start the servers first, e.g. gunicorn hirehub.wsgi -b 127.0.0.1:8001 -w 4 --threads 8 '
+        'and uvicorn hirehub.asgi:application --port 8002 --workers 4'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='+', metavar='NAME=URL',
+                            help='Servers to compare, e.g. wsgi=http://127.0.0.1:8001 asgi=http://127.0.0.1:8002')
+        parser.add_argument('--clients', type=int, default=500,
+                            help='Concurrent connections, each sending its next request once answered')
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Seconds measured per server')
+        parser.add_argument('--warmup', type=float, default=5,
+                            help='Seconds of unmeasured load first, to fill caches and connection pools')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Request path (repeatable); defaults to a mix of listing, search and job pages')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['targets']:
+            name, _, url = target.partition('=')
+            parts = urlsplit(url)
+            if not name or parts.scheme != 'http' or not parts.hostname:
+                raise CommandError(f'Expected NAME=http://host:port, got {target}')
+            targets.append((name, parts.hostname, parts.port or 80))
+
+        paths = options['paths'] or self.default_paths()
+        self.stdout.write(f'{options["clients"]} clients, {options["duration"]:.0f}s per server, {len(paths)} paths')
+        self.stdout.write(f'{"server":<10}{"requests":>10}{"errors":>8}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"max ms":>10}')
+        for name, host, port in targets:
+            asyncio.run(self.load(host, port, paths, options['clients'], options['warmup']))
+            timings, errors, elapsed = asyncio.run(
+                self.load(host, port, paths, options['clients'], options['duration'])
+            )
+            if len(timings) < 2:
+                self.stdout.write(f'{name:<10}{len(timings):>10}{errors:>8}  no responses')
+                continue
+            timings.sort()
+            p99 = statistics.quantiles(timings, n=100)[98]
+            self.stdout.write(
+                f'{name:<10}{len(timings):>10}{errors:>8}{len(timings) / elapsed:>10.0f}'
+                f'{statistics.median(timings):>10.1f}{p99:>10.1f}{timings[-1]:>10.1f}'
+            )
+
+    def default_paths(self):
+        job_ids = Job.objects.active().order_by('-posted_date').values_list('pk', flat=True)[:6]
+        return ['/'] * 4 + list(SEARCHES) * 2 + [f'/job/{pk}/' for pk in job_ids]
+
+    async def load(self, host, port, paths, clients, duration):
+        """([latency ms of each answered request], error count, elapsed seconds)"""
+        deadline = time.perf_counter() + duration
+        timings = []
+        errors = 0
+
+        async def client(seed):
+            nonlocal errors
+            rng = random.Random(seed)
+            connection = None
+            while time.perf_counter() < deadline:
+                path = rng.choice(paths)
+                started = time.perf_counter()
+                try:
+                    if connection is None:
+                        connection = await asyncio.open_connection(host, port)
+                    status, keep_alive = await self.request(*connection, host, path)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    connection = self.close(connection)
+                    await asyncio.sleep(0.05)
+                    continue
+                if status == 200:
+                    timings.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+                if not keep_alive:
+                    connection = self.close(connection)
+            self.close(connection)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(seed) for seed in range(clients)))
+        return timings, errors, time.perf_counter() - started
+
+    async def request(self, reader, writer, host, path):
+        """Send a GET and read the whole response: (status, whether the connection stays open)"""
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readuntil(b'\r\n')
+        version, status = status_line.split()[:2]
+        headers = {}
+        while (line := await reader.readuntil(b'\r\n')) != b'\r\n':
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            while size := int((await reader.readuntil(b'\r\n')).split(b';')[0], 16):
+                await reader.readexactly(size + 2)
+            await reader.readuntil(b'\r\n')
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        else:
+            await reader.read()
+            return int(status), False
+
+        keep_alive = headers.get('connection') != 'close' and version == b'HTTP/1.1'
+        return int(status), keep_alive
+
+    def close(self, connection):
+        if connection is not None:
+            connection[1].close()
+        return None
@@ -0,0 +1,52 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from job_portal.management.seeding import seed_jobs
+from job_portal.search import get_search_backend
+from job_portal.suggest import SuggestionIndex
+
+# Typed prefixes, from a single letter to most of a word
+PREFIXES = ('e', 'en', 'eng', 'engineer 1', 'engineer 12', 'c', 'ci', 'city 4', 'co', 'company 7', 'zz')
+
+
+class Command(BaseCommand):
+    help = 'Time suggestion lookups against seeded jobs and fail when the p99 exceeds the budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000,
+                            help='Number of jobs to seed')
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--budget-us', type=float, default=1000,
+                            help='Largest acceptable p99 lookup time in microseconds')
+
+    def handle(self, *args, **options):
+        index = SuggestionIndex()
+        try:
+            with transaction.atomic():
+                seed_jobs(options['size'])
+                started = time.perf_counter()
+                index.rebuild()
+                build_ms = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+        finally:
+            get_search_backend().rebuild()
+
+        self.stdout.write(f'Built index of {options["size"]} jobs in {build_ms:.0f} ms')
+        self.stdout.write(f'{"prefix":<16}{"results":>8}{"p50 us":>10}{"p99 us":>10}')
+        worst = 0
+        for prefix in PREFIXES:
+            timings = []
+            for _ in range(options['iterations']):
+                started = time.perf_counter()
+                results = index.suggest(prefix)
+                timings.append((time.perf_counter() - started) * 1_000_000)
+            p99 = statistics.quantiles(timings, n=100)[98]
+            worst = max(worst, p99)
+            self.stdout.write(f'{prefix:<16}{len(results):>8}{statistics.median(timings):>10.1f}{p99:>10.1f}')
+
+        if worst > options['budget_us']:
+            raise CommandError(f'Slowest p99 lookup took {worst:.0f} us, over the {options["budget_us"]:.0f} us budget')
+        self.stdout.write(self.style.SUCCESS(f'Every p99 lookup is within {options["budget_us"]:.0f} us.'))
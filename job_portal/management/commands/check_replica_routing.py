@@ -0,0 +1,91 @@
+import re
+import time
+from contextlib import ExitStack
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from job_portal.middleware import STICKY_SESSION_KEY
+from job_portal.models import Company, CustomUser, Job
+
+CHECK_EMAIL = 'replica-routing-check@example.com'
+re_catalog_table = re.compile(r'\bjob_portal_(job|company)\b')
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that catalog reads go to the read replicas and that a user who changes the catalog '
+        'reads it back from the primary. Needs replicas that do not replicate while the check runs, '
+        'e.g. cp db.sqlite3 replica.sqlite3 && DJANGO_DB_REPLICAS=replica.sqlite3 manage.py check_replica_routing'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No read replicas configured; set DJANGO_DB_REPLICAS')
+        if not Job.objects.active().exists():
+            raise CommandError('The catalog is empty; load some jobs before copying the replica')
+
+        CustomUser.objects.filter(email=CHECK_EMAIL).delete()
+        admin = CustomUser.objects.create_user(CHECK_EMAIL, name='Replica check', mobile='0', role='admin')
+        setup_test_environment()
+        try:
+            self.run_checks(admin)
+        finally:
+            teardown_test_environment()
+            Company.objects.filter(name__startswith='Replica routing check').delete()
+            admin.delete()
+        self.stdout.write(self.style.SUCCESS('Catalog reads go to the replicas and writers read their own writes.'))
+
+    def run_checks(self, admin):
+        anonymous = Client()
+        writer = Client()
+        writer.force_login(admin)
+        job = Job.objects.active().order_by('-posted_date').first()
+
+        self.expect('browse', anonymous, reverse('job_portal:index'), 200, 'replica')
+        search = reverse('job_portal:search_jobs') + '?' + urlencode({'keyword': job.title.split()[0]})
+        self.expect('search', anonymous, search, 200, 'replica')
+        self.expect('job detail', anonymous, reverse('job_portal:job_detail', args=[job.pk]), 200, 'replica')
+        self.expect('writer, before writing', writer, reverse('job_portal:job_detail', args=[job.pk]), 200, 'replica')
+
+        # The new company only exists on the primary: the replica never sees it
+        name = f'Replica routing check {time.time_ns()}'
+        response = writer.post(reverse('job_portal:add_company'), {
+            'name': name, 'description': 'Created by check_replica_routing', 'logo_url': 'https://example.com/logo.png',
+        })
+        if response.status_code != 302:
+            raise CommandError(f'Adding a company returned HTTP {response.status_code}')
+        company = Company.objects.get(name=name)
+        profile = reverse('job_portal:company_profile', args=[company.pk])
+        self.stdout.write(f'{"write":<26} company {company.pk} on the primary')
+
+        self.expect('writer, after writing', writer, profile, 200, 'primary')
+        self.expect('anonymous, after writing', anonymous, profile, 404, 'replica')
+
+        session = writer.session
+        session[STICKY_SESSION_KEY] = time.time() - 1
+        session.save()
+        self.expect('writer, marker expired', writer, profile, 404, 'replica')
+
+    def expect(self, name, client, url, status, database):
+        """GET url and check its status and where its catalog queries ran"""
+        with ExitStack() as stack:
+            captures = {alias: stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections}
+            response = client.get(url)
+
+        catalog_queries = {
+            alias: sum(bool(re_catalog_table.search(query['sql'])) for query in capture.captured_queries)
+            for alias, capture in captures.items()
+        }
+        used = sorted(alias for alias, count in catalog_queries.items() if count)
+        self.stdout.write(f'{name:<26} HTTP {response.status_code}, catalog read from {", ".join(used) or "-"}')
+        if response.status_code != status:
+            raise CommandError(f'{name}: expected HTTP {status}, got {response.status_code}')
+        on_replicas = all(alias in settings.DATABASE_REPLICAS for alias in used)
+        if not used or on_replicas != (database == 'replica'):
+            raise CommandError(f'{name}: expected the catalog to be read from the {database}')
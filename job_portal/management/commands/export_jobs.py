@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from job_portal.feeds import FEED_FORMATS, FeedError, feed_format, open_feed, write_feed
+from job_portal.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Stream every listed job to a CSV or JSON Lines feed that import_jobs can read back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file (.csv, .jsonl, optionally .gz) or - for stdout')
+        parser.add_argument('--format', choices=FEED_FORMATS)
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Jobs fetched per database round trip')
+
+    def handle(self, *args, **options):
+        try:
+            fmt = feed_format(options['path'], options['format'] or ('jsonl' if options['path'] == '-' else None))
+            stream = open_feed(options['path'], 'w')
+        except (FeedError, OSError) as error:
+            raise CommandError(error)
+
+        jobs = Job.objects.active().order_by('pk').values_list(
+            'external_id', 'title', 'company__name', 'company__description', 'company__logo_url', 'location',
+            'salary_range', 'job_type', 'posted_date', 'description', 'requirements',
+        )
+        self.exported = 0
+
+        def rows():
+            for (external_id, title, company_name, company_description, company_logo_url, location,
+                 salary_range, job_type, posted_date, description, requirements) in jobs.iterator(options['batch_size']):
+                self.exported += 1
+                yield {
+                    'external_id': external_id or '',
+                    'title': title,
+                    'company_name': company_name,
+                    'company_description': company_description,
+                    'company_logo_url': company_logo_url,
+                    'location': location,
+                    'salary_range': salary_range,
+                    'job_type': job_type,
+                    'posted_date': posted_date.isoformat(),
+                    'description': description,
+                    'requirements': requirements,
+                }
+
+        with stream:
+            write_feed(rows(), stream, fmt)
+        if options['path'] != '-':
+            self.stdout.write(self.style.SUCCESS(f'Exported {self.exported} jobs to {options["path"]}'))
@@ -0,0 +1,226 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from job_portal.cache import bump_catalog_generation
+from job_portal.feeds import FEED_FORMATS, FeedError, content_hash, feed_format, open_feed, read_feed
+from job_portal.forms import JobImportForm
+from job_portal.models import Company, Job
+from job_portal.search import get_search_backend
+
+# Columns a changed posting is rewritten with
+SYNC_FIELDS = (
+    'title', 'description', 'company', 'location', 'salary_range', 'job_type', 'posted_date', 'requirements',
+    'salary_min', 'salary_max', 'city_key', 'content_hash', 'expired_at',
+)
+
+
+class Command(BaseCommand):
+    help = 'Stream jobs from a CSV or JSON Lines feed, creating missing companies by name'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file (.csv, .jsonl, optionally .gz) or - for stdin')
+        parser.add_argument('--format', choices=FEED_FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Jobs written per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate every row without writing')
+        parser.add_argument('--max-errors', type=int, default=20,
+                            help='Rejected rows to print')
+        parser.add_argument('--source',
+                            help='Name of the feed: rows are matched to its earlier postings by external_id, '
+                                 'and only new and changed ones are written')
+        parser.add_argument('--expire-missing', action='store_true',
+                            help="With --source, expire the source's listed postings this feed no longer carries")
+
+    def handle(self, *args, **options):
+        if options['expire_missing'] and not options['source']:
+            raise CommandError('--expire-missing needs --source')
+        try:
+            fmt = feed_format(options['path'], options['format'])
+            stream = open_feed(options['path'], 'r')
+        except (FeedError, OSError) as error:
+            raise CommandError(error)
+
+        self.verbosity = options['verbosity']
+        self.source = options['source']
+        # One form rebound to each row: building a form deep-copies its fields
+        self.form = JobImportForm()
+        # Company name -> Company, filled as chunks resolve their companies
+        self.companies = {}
+        self.created_companies = 0
+        # External id -> (pk, content hash) of the source's listed postings as last synced
+        self.synced = {}
+        if self.source:
+            listed = Job.objects.active().filter(source=self.source).values_list('external_id', 'pk', 'content_hash')
+            self.synced = {external_id: (pk, digest) for external_id, pk, digest in listed.iterator(chunk_size=5000)}
+        # External ids the feed carries, rejected rows included
+        self.seen = set()
+        self.created = self.updated = self.unchanged = self.expired = 0
+        batch = []
+        read = imported = rejected = 0
+        started = time.perf_counter()
+        try:
+            with stream:
+                for line_number, row in read_feed(stream, fmt):
+                    read += 1
+                    if self.unchanged_since_sync(row):
+                        self.unchanged += 1
+                        imported += 1
+                        continue
+                    job, errors = self.validate(row)
+                    if errors:
+                        rejected += 1
+                        if rejected <= options['max_errors']:
+                            self.stderr.write(f'Line {line_number}: {errors}')
+                        continue
+                    batch.append(job)
+                    if len(batch) >= options['batch_size']:
+                        imported += self.write(batch, options['dry_run'])
+                        batch = []
+                        self.progress(read, started)
+                imported += self.write(batch, options['dry_run'])
+            if options['expire_missing'] and not options['dry_run']:
+                self.expire_missing()
+        except FeedError as error:
+            raise CommandError(error)
+        finally:
+            if self.created + self.updated + self.expired:
+                # bulk writes send no signals: invalidate cached searches here. A sync
+                # indexes what it writes as it goes; a plain import rebuilds the index.
+                if not self.source:
+                    get_search_backend().rebuild()
+                bump_catalog_generation()
+
+        elapsed = time.perf_counter() - started
+        if self.source and not options['dry_run']:
+            outcome = (f'Synced {imported} of {read} rows from {self.source}: {self.created} created, '
+                       f'{self.updated} updated, {self.unchanged} unchanged, {self.expired} expired')
+        else:
+            outcome = f'{"Validated" if options["dry_run"] else "Imported"} {imported} of {read} rows'
+        self.stdout.write(self.style.SUCCESS(
+            f'{outcome} ({rejected} rejected, {self.created_companies} companies created) '
+            f'in {elapsed:.1f}s, {read / elapsed if elapsed else 0:.0f} rows/s'
+        ))
+
+    def unchanged_since_sync(self, row):
+        """
+        Whether row repeats its listed posting exactly, in which case it needs
+        neither validation nor a write
+        """
+        if not self.source or isinstance(row, str):
+            return False
+        external_id = str(row.get('external_id') or '').strip()
+        # A rejected row is still carried by the feed, so its posting is not expired
+        self.seen.add(external_id)
+        synced = self.synced.get(external_id)
+        return synced is not None and synced[1] == content_hash(row)
+
+    def validate(self, row):
+        """(unsaved Job with company_name set, None) or (None, error text)"""
+        if isinstance(row, str):
+            return None, row
+        if self.source and not str(row.get('external_id') or '').strip():
+            return None, 'external_id: This field is required with --source.'
+        if not row.get('posted_date'):
+            row.pop('posted_date', None)
+        form = self.form
+        form.data = row
+        form.is_bound = True
+        form.instance = Job()
+        form._errors = None
+        if not form.is_valid():
+            return None, '; '.join(f'{field}: {" ".join(messages)}' for field, messages in form.errors.items())
+        job = form.save(commit=False)
+        job.company_name = form.cleaned_data['company_name']
+        job.company_details = {
+            'description': form.cleaned_data['company_description'],
+            'logo_url': form.cleaned_data['company_logo_url'],
+        }
+        if self.source:
+            job.source = self.source
+            job.external_id = form.cleaned_data['external_id']
+            job.content_hash = content_hash(row)
+        # A row without a date keeps the date its posting was first imported with
+        job.dated = job.posted_date is not None
+        if not job.dated:
+            job.posted_date = timezone.now()
+        return job, None
+
+    def write(self, jobs, dry_run):
+        if dry_run or not jobs:
+            return len(jobs)
+        with transaction.atomic():
+            self.resolve_companies(jobs)
+            for job in jobs:
+                job.company = self.companies[job.company_name]
+                # bulk_create skips the pre_save signal that fills the parsed columns
+                job.normalize_fields()
+            if self.source:
+                self.sync(jobs)
+            else:
+                Job.objects.bulk_create(jobs)
+                self.created += len(jobs)
+        return len(jobs)
+
+    def sync(self, jobs):
+        """
+        Create the chunk's new postings and rewrite the changed or expired
+        ones. A posting whose content hash matches is not written at all.
+        """
+        # A posting repeated within the chunk keeps its last row
+        by_external_id = {job.external_id: job for job in jobs}
+        existing = Job.objects.filter(source=self.source, external_id__in=by_external_id).values_list(
+            'external_id', 'pk', 'content_hash', 'expired_at', 'posted_date',
+        )
+        changed = []
+        for external_id, pk, digest, expired_at, posted_date in existing:
+            job = by_external_id.pop(external_id)
+            if digest == job.content_hash and expired_at is None:
+                self.unchanged += 1
+                continue
+            job.pk = pk
+            if not job.dated:
+                job.posted_date = posted_date
+            changed.append(job)
+        new = list(by_external_id.values())
+        Job.objects.bulk_create(new)
+        Job.objects.bulk_update(changed, SYNC_FIELDS)
+        self.created += len(new)
+        self.updated += len(changed)
+        backend = get_search_backend()
+        for job in new + changed:
+            backend.index_job(job)
+
+    def expire_missing(self):
+        """Expire the source's listed postings the feed did not carry, in set-based UPDATEs"""
+        if not self.seen:
+            self.stderr.write(f'The feed carried no postings; not expiring any from {self.source}')
+            return
+        missing = [pk for external_id, (pk, _) in self.synced.items() if external_id not in self.seen]
+        # One statement, unless the backend caps the parameters per query
+        chunk = connection.features.max_query_params or len(missing) or 1
+        now = timezone.now()
+        with transaction.atomic():
+            for start in range(0, len(missing), chunk):
+                Job.objects.filter(pk__in=missing[start:start + chunk]).update(expired_at=now)
+        self.expired = len(missing)
+
+    def resolve_companies(self, jobs):
+        """Look up the chunk's unknown company names and create the missing ones"""
+        missing = {job.company_name: job.company_details for job in jobs if job.company_name not in self.companies}
+        if not missing:
+            return
+        for company in Company.objects.filter(name__in=missing).order_by('pk').only('pk', 'name'):
+            self.companies.setdefault(company.name, company)
+        new = [Company(name=name, **details) for name, details in missing.items() if name not in self.companies]
+        for company in Company.objects.bulk_create(new):
+            self.companies[company.name] = company
+        self.created_companies += len(new)
+
+    def progress(self, read, started):
+        if self.verbosity >= 2:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{read} rows, {read / elapsed:.0f} rows/s')
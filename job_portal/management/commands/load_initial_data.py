@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from django.contrib.auth.hashers import make_password
-from jobs.models import CustomUser
+from job_portal.models import CustomUser
 
 class Command(BaseCommand):
     help = 'Load initial data for the application'
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from job_portal.search import get_search_backend
+
+class Command(BaseCommand):
+    help = 'Rebuild the job search index from the database'
+
+    def handle(self, *args, **kwargs):
+        backend = get_search_backend()
+        self.stdout.write(f'Rebuilding search index using {type(backend).__name__}...')
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt successfully!'))
@@ -0,0 +1,40 @@
+"""Seed data shared by the benchmark commands and the tests"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from job_portal.cache import bump_catalog_generation
+from job_portal.models import Company, Job
+from job_portal.search import get_search_backend
+
+JOB_TYPES = ('Full-time', 'Part-time', 'Contract', 'Remote')
+
+
+def seed_jobs(size):
+    """Seed size jobs across size / 100 companies; returns a company and one of its jobs"""
+    companies = Company.objects.bulk_create([
+        Company(name=f'Company {i}', description='Seeded company', logo_url='https://example.com/logo.png')
+        for i in range(max(1, size // 100))
+    ])
+    now = timezone.now()
+    jobs = [
+        Job(
+            title=f'Engineer {i}',
+            description='Seeded job description',
+            requirements='Seeded requirements',
+            company=companies[i % len(companies)],
+            location=f'City {i % 50}',
+            salary_range=f'₹{4 + i % 20},00,000 - ₹{6 + i % 20},00,000',
+            job_type=JOB_TYPES[i % len(JOB_TYPES)],
+            posted_date=now - timedelta(minutes=i),
+        )
+        for i in range(size)
+    ]
+    # bulk_create skips the pre_save signal that fills the parsed columns
+    for job in jobs:
+        job.normalize_fields()
+    Job.objects.bulk_create(jobs, batch_size=1000)
+    get_search_backend().rebuild()
+    # Nor does bulk_create send the post_save that invalidates cached searches
+    bump_catalog_generation()
+    return companies[0], Job.objects.filter(company=companies[0]).first()
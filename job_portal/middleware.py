@@ -0,0 +1,55 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .routers import end_request, route_request
+
+# Session key of the time until which the user's catalog reads stay on the primary
+STICKY_SESSION_KEY = '_db_primary_until'
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'TRACE'})
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let the catalog reads of safe requests go to the read replicas unless the
+    user changed the catalog within DATABASE_REPLICA_STICKY_SECONDS, and mark
+    the session when the request changes it. Goes after SessionMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = route_request(self.pinned(request, request.session.get(STICKY_SESSION_KEY)))
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        if state.wrote:
+            request.session[STICKY_SESSION_KEY] = self.sticky_until()
+        return response
+
+    async def __acall__(self, request):
+        state, token = route_request(self.pinned(request, await request.session.aget(STICKY_SESSION_KEY)))
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        if state.wrote:
+            await request.session.aset(STICKY_SESSION_KEY, self.sticky_until())
+        return response
+
+    @staticmethod
+    def pinned(request, sticky_until):
+        return request.method not in SAFE_METHODS or (sticky_until is not None and sticky_until > time.time())
+
+    @staticmethod
+    def sticky_until():
+        return time.time() + settings.DATABASE_REPLICA_STICKY_SECONDS
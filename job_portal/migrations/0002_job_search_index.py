@@ -0,0 +1,41 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+def create_fts_table(apps, schema_editor):
+    """Create and populate the FTS5 table on SQLite builds that ship FTS5"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS job_portal_job_fts USING fts5("
+                "title, description, requirements, company_name, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            # SQLite compiled without FTS5; the in-memory backend is used instead
+            return
+        cursor.execute(
+            "INSERT INTO job_portal_job_fts (rowid, title, description, requirements, company_name) "
+            "SELECT j.id, j.title, j.description, j.requirements, c.name "
+            "FROM job_portal_job j JOIN job_portal_company c ON c.id = j.company_id"
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS job_portal_job_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_portal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
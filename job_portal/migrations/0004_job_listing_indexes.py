@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_portal', '0003_job_structured_salary_location'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['posted_date', 'id'], name='job_posted_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['job_type', 'posted_date'], name='job_type_posted_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['city_key', 'posted_date'], name='job_city_posted_date_idx'),
+        ),
+    ]
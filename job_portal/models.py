@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 
+from .normalization import normalize_city, parse_salary_range
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -52,6 +54,11 @@ class Company(models.Model):
     class Meta:
         verbose_name_plural = "Companies"
 
+class JobQuerySet(models.QuerySet):
+    def active(self):
+        """Jobs still listed: imported postings drop out once their feed stops carrying them"""
+        return self.filter(expired_at__isnull=True)
+
 class Job(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -61,6 +68,49 @@ class Job(models.Model):
     job_type = models.CharField(max_length=50)
     posted_date = models.DateTimeField(default=timezone.now)
     requirements = models.TextField()
+    # Parsed from salary_range and location on save (see job_portal.normalization)
+    salary_min = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    salary_max = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    city_key = models.CharField(max_length=100, blank=True, default='', editable=False)
+    # Identity of an imported posting in its feed, and a hash of the feed values
+    # it was last written from (see the import_jobs --source sync)
+    source = models.CharField(max_length=50, blank=True, default='')
+    external_id = models.CharField(max_length=100, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    expired_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = JobQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.title} at {self.company.name}"
+    
+    def normalize_fields(self):
+        """Fill the structured salary and city columns from the text fields"""
+        self.salary_min, self.salary_max = parse_salary_range(self.salary_range)
+        self.city_key = normalize_city(self.location)
+    
+    class Meta:
+        indexes = [
+            # Listings page through jobs by (-posted_date, -id)
+            models.Index(fields=['posted_date', 'id'], name='job_posted_date_id_idx'),
+            models.Index(fields=['job_type', 'posted_date'], name='job_type_posted_date_idx'),
+            models.Index(fields=['city_key', 'posted_date'], name='job_city_posted_date_idx'),
+            models.Index(fields=['city_key', 'salary_max'], name='job_city_salary_max_idx'),
+            models.Index(fields=['salary_max'], name='job_salary_max_idx'),
+            models.Index(fields=['salary_min'], name='job_salary_min_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'external_id'], name='job_source_external_id_uniq'),
+        ]
+
+class Generation(models.Model):
+    """
+    A shared version counter (see job_portal.cache): every change to what it
+    counts bumps it, so each process can tell that its cached pages and
+    in-memory indexes are stale
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField()
+    
+    def __str__(self):
+        return f'{self.name} {self.value}'
@@ -0,0 +1,129 @@
+"""
+Structured values parsed from the free-text job fields.
+
+Salaries are normalized to whole rupees per year and locations to a city
+key, so searches can filter on indexed columns instead of icontains.
+"""
+import re
+import unicodedata
+
+from django.http import QueryDict
+
+from .search import tokenize
+
+# Amount suffixes, in rupees
+UNITS = {
+    'k': 1_000, 'thousand': 1_000,
+    'l': 100_000, 'lac': 100_000, 'lacs': 100_000, 'lakh': 100_000, 'lakhs': 100_000, 'lpa': 100_000,
+    'cr': 10_000_000, 'crore': 10_000_000, 'crores': 10_000_000,
+}
+
+# A number with Indian (1,00,000) or western (100,000) grouping, and an optional unit
+AMOUNT_RE = re.compile(
+    r'(?P<number>\d+(?:,\d+)*(?:\.\d+)?)\s*(?P<unit>' + '|'.join(sorted(UNITS, key=len, reverse=True)) + r')?\b',
+    re.IGNORECASE,
+)
+FOREIGN_CURRENCY_RE = re.compile(r'[$€£¥]|\b(?:usd|eur|gbp)\b', re.IGNORECASE)
+MONTHLY_RE = re.compile(r'/\s*(?:month|mo)\b|\bper\s+month\b|\bmonthly\b|\bp\.?m\.?\b', re.IGNORECASE)
+OPEN_ENDED_RE = re.compile(r'\+\s*$|\babove\b|\bfrom\b|\bminimum\b|\bmin\b', re.IGNORECASE)
+UP_TO_RE = re.compile(r'\bup\s*to\b|\bupto\b|\bmax(?:imum)?\b|\bbelow\b', re.IGNORECASE)
+
+# Alternative spellings and old names that map to the same city key
+CITY_ALIASES = {
+    'bengaluru': 'bangalore',
+    'gurugram': 'gurgaon',
+    'bombay': 'mumbai',
+    'navi mumbai': 'mumbai',
+    'madras': 'chennai',
+    'calcutta': 'kolkata',
+    'new delhi': 'delhi',
+    'trivandrum': 'thiruvananthapuram',
+    'poona': 'pune',
+    'mysuru': 'mysore',
+}
+
+
+def parse_salary_amount(text):
+    """
+    Parse one amount such as "₹1,00,000", "12L", "1.5 Cr" or "80k" into
+    rupees. Returns None when there is no amount.
+    """
+    match = AMOUNT_RE.search(text or '')
+    if match is None:
+        return None
+    return _amount(match, None)
+
+
+def _amount(match, default_unit):
+    number = float(match.group('number').replace(',', ''))
+    unit = (match.group('unit') or default_unit or '').lower()
+    return int(round(number * UNITS.get(unit, 1)))
+
+
+def parse_salary_range(text):
+    """
+    Parse a salary range like "₹80,000 - ₹1,00,000", "10-14 LPA",
+    "₹12L+" or "Up to ₹50,000 per month" into (min, max) annual rupees.
+    Either bound may be None; both are None for text that cannot be parsed
+    or is quoted in another currency.
+    """
+    if not text or FOREIGN_CURRENCY_RE.search(text):
+        return None, None
+    matches = list(AMOUNT_RE.finditer(text))
+    if not matches:
+        return None, None
+
+    # "10-14 LPA": a unit written once applies to both bounds
+    last_unit = matches[-1].group('unit')
+    amounts = [_amount(match, last_unit) for match in matches[:2]]
+    if MONTHLY_RE.search(text):
+        amounts = [amount * 12 for amount in amounts]
+
+    if len(amounts) == 1:
+        if UP_TO_RE.search(text):
+            return None, amounts[0]
+        if OPEN_ENDED_RE.search(text):
+            return amounts[0], None
+        return amounts[0], amounts[0]
+    low, high = amounts
+    return min(low, high), max(low, high)
+
+
+def normalize_city(location):
+    """
+    City key for a location such as "Bengaluru, Karnataka": the first
+    comma-separated part, accent-folded and lowercased, with known aliases
+    resolved ("bangalore"). Empty for an empty location.
+    """
+    city = unicodedata.normalize('NFKC', location or '').split(',')[0]
+    key = ' '.join(tokenize(city))
+    return CITY_ALIASES.get(key, key)
+
+
+def normalize_search_params(params):
+    """
+    Canonical form of the job search parameters, so that equivalent query
+    strings ("Python  Django" and "python django") share cache entries
+    """
+    company = params.get('company', '').strip()
+    return {
+        'keyword': ' '.join(tokenize(params.get('keyword', ''))),
+        'location': ' '.join(params.get('location', '').split()).lower(),
+        'city': normalize_city(params.get('city', '')),
+        'salary_min': parse_salary_amount(params.get('salary_min', '')),
+        'salary_max': parse_salary_amount(params.get('salary_max', '')),
+        'job_type': params.get('job_type', '').strip(),
+        'company': int(company) if company.isdigit() else None,
+    }
+
+
+def search_query_dict(params):
+    """
+    QueryDict of the non-empty normalized search params, for links that
+    repeat the search (facets, "load more")
+    """
+    query = QueryDict(mutable=True)
+    for name, value in params.items():
+        if value is not None and value != '':
+            query[name] = str(value)
+    return query
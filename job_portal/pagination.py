@@ -0,0 +1,105 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are selected with a WHERE clause on the sort key of the last row of the
+previous page instead of an OFFSET, so every page costs the same as the first.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+DEFAULT_KEYSET = ('-posted_date', '-id')
+
+
+def _split(key):
+    return (key[1:], True) if key.startswith('-') else (key, False)
+
+
+def encode_cursor(obj, keyset):
+    """Serialize the sort key of obj into an opaque URL-safe token"""
+    values = []
+    for key in keyset:
+        value = getattr(obj, _split(key)[0])
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, model, keyset):
+    """Turn a cursor token back into typed sort key values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise Http404('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(keyset):
+        raise Http404('Invalid cursor')
+    decoded = []
+    for key, value in zip(keyset, values):
+        try:
+            field = model._meta.get_field(_split(key)[0])
+        except FieldDoesNotExist:
+            # Annotations such as search_rank are plain JSON numbers
+            decoded.append(value)
+            continue
+        try:
+            decoded.append(field.to_python(value))
+        except ValidationError:
+            raise Http404('Invalid cursor')
+    return decoded
+
+
+def keyset_filter(keyset, values):
+    """Build the "row comes after (values)" predicate for a keyset ordering"""
+    condition = Q()
+    for index, key in enumerate(keyset):
+        name, descending = _split(key)
+        clause = Q(**{f'{name}__{"lt" if descending else "gt"}': values[index]})
+        for prev_key, prev_value in zip(keyset[:index], values[:index]):
+            clause &= Q(**{_split(prev_key)[0]: prev_value})
+        condition |= clause
+    return condition
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _page_query(queryset, cursor, per_page, keyset):
+    queryset = queryset.order_by(*keyset)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, keyset)
+        queryset = queryset.filter(keyset_filter(keyset, values))
+    return queryset[:per_page + 1]
+
+
+def _page(rows, per_page, keyset):
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1], keyset)
+    return KeysetPage(rows, next_cursor)
+
+
+def paginate_keyset(queryset, cursor=None, per_page=20, keyset=DEFAULT_KEYSET):
+    """Return the KeysetPage of queryset that follows cursor"""
+    return _page(list(_page_query(queryset, cursor, per_page, keyset)), per_page, keyset)
+
+
+async def apaginate_keyset(queryset, cursor=None, per_page=20, keyset=DEFAULT_KEYSET):
+    rows = [row async for row in _page_query(queryset, cursor, per_page, keyset).aiterator()]
+    return _page(rows, per_page, keyset)
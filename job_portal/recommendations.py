@@ -0,0 +1,193 @@
+"""
+Job recommendations for resumes.
+
+Jobs are TF-IDF vectors over their title, requirements and description,
+held as a sparse term-by-job matrix in process memory: one column of
+(job_id, weight) postings per term, like the search backend's inverted
+index. Scoring a resume is a sparse matrix-vector product that only reads
+the columns of the resume's terms. Job vectors are normalized on their term
+frequencies alone, so adding or removing a job never touches other jobs;
+IDF is applied at query time. The matrix is built lazily, maintained by
+the Job signals once each write commits, and rebuilt when the catalog
+generation moves past the one it was built at.
+"""
+import heapq
+import math
+from collections import defaultdict
+from functools import lru_cache
+
+from .cache import GenerationalIndex, catalog_generation, get_search_cache
+from .search import tokenize
+
+JOB_FIELD_WEIGHTS = {
+    'title': 3.0,
+    'requirements': 2.0,
+    'description': 1.0,
+}
+
+SKILL_LEVEL_WEIGHTS = {
+    'beginner': 1.0,
+    'intermediate': 1.5,
+    'advanced': 2.0,
+    'expert': 2.5,
+}
+
+# Function words, which match between any two texts
+STOP_WORDS = frozenset('''
+    a about an and are as at be by can for from has have in into is it of on or our
+    that the their this to we will with you your
+'''.split())
+
+# Terms in more than this share of jobs say little about fit and are skipped
+MAX_DOCUMENT_FREQUENCY = 0.5
+# Only the resume's highest-weighted terms are scored, and a term is skipped
+# once its postings would take the total read past MAX_SCORED_POSTINGS. The
+# skipped terms are the most common, with the least weight.
+MAX_QUERY_TERMS = 40
+MAX_SCORED_POSTINGS = 50_000
+
+
+def term_frequencies(weighted_texts):
+    """{term: weighted count} for (text, weight) pairs"""
+    frequencies = defaultdict(float)
+    for text, weight in weighted_texts:
+        for token in tokenize(text):
+            if token not in STOP_WORDS:
+                frequencies[token] += weight
+    return frequencies
+
+
+def job_vector(title, requirements, description):
+    """Sublinear term frequencies of a job, scaled to unit length"""
+    frequencies = term_frequencies([
+        (title, JOB_FIELD_WEIGHTS['title']),
+        (requirements, JOB_FIELD_WEIGHTS['requirements']),
+        (description, JOB_FIELD_WEIGHTS['description']),
+    ])
+    # Every field weight is at least 1, so tf >= 1
+    weights = {term: 1 + math.log(tf) for term, tf in frequencies.items()}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return {term: weight / norm for term, weight in weights.items()}
+
+
+class JobMatcher(GenerationalIndex):
+    def __init__(self):
+        super().__init__()
+        self._postings = defaultdict(dict)  # term -> {job_id: weight}
+        self._doc_terms = {}                # job_id -> terms
+
+    def _add(self, job_id, vector):
+        for term, weight in vector.items():
+            self._postings[term][job_id] = weight
+        self._doc_terms[job_id] = tuple(vector)
+
+    def _remove(self, job_id):
+        for term in self._doc_terms.pop(job_id, ()):
+            postings = self._postings[term]
+            postings.pop(job_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def query_vector(self, frequencies):
+        """
+        TF-IDF weights of the resume's most telling terms, each multiplied
+        by the term's IDF once more so the product scores IDF-weighted jobs
+        """
+        total = len(self._doc_terms)
+        weights = {}
+        for term, tf in frequencies.items():
+            postings = self._postings.get(term)
+            if not postings or (total > 1 and len(postings) > total * MAX_DOCUMENT_FREQUENCY):
+                continue
+            idf = math.log((1 + total) / (1 + len(postings))) + 1
+            weights[term] = (1 + math.log(tf)) * idf * idf
+        return dict(heapq.nlargest(MAX_QUERY_TERMS, weights.items(), key=lambda item: item[1]))
+
+    def score(self, frequencies):
+        """{job_id: score} for every job sharing a term with frequencies"""
+        with self._lock:
+            self._ensure_built()
+            scores = {}
+            get = scores.get
+            scored = 0
+            for term, weight in self.query_vector(frequencies).items():
+                postings = self._postings[term]
+                if scored + len(postings) > MAX_SCORED_POSTINGS:
+                    continue
+                scored += len(postings)
+                for job_id, job_weight in postings.items():
+                    scores[job_id] = get(job_id, 0.0) + weight * job_weight
+            return scores
+
+    def top_jobs(self, frequencies, limit=5):
+        """[(job_id, score), ...] of the limit best matches, best first"""
+        scores = self.score(frequencies)
+        return [(job_id, scores[job_id]) for job_id in heapq.nlargest(limit, scores, key=scores.__getitem__)]
+
+    def update_job(self, job_id, title, requirements, description):
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(job_id)
+            self._add(job_id, job_vector(title, requirements, description))
+
+    def remove_job(self, job_id):
+        with self._lock:
+            if self._built:
+                self._remove(job_id)
+
+    def rebuild(self):
+        from .models import Job
+
+        with self._lock:
+            self._start_build()
+            self._postings.clear()
+            self._doc_terms.clear()
+            # From the primary: the index lives on, and signals only send it later changes
+            rows = Job.objects.using('default').active().values_list('pk', 'title', 'requirements', 'description')
+            for pk, title, requirements, description in rows.iterator(chunk_size=2000):
+                self._add(pk, job_vector(title, requirements, description))
+            self._built = True
+
+
+@lru_cache(maxsize=None)
+def get_job_matcher():
+    return JobMatcher()
+
+
+def resume_frequencies(resume_id):
+    """Weighted terms of a resume's skills, experience, projects and summary"""
+    from resume_builder.models import Experience, PersonalInfo, Project, Skill
+
+    texts = []
+    for name, level in Skill.objects.filter(resume_id=resume_id).values_list('name', 'level'):
+        texts.append((name, SKILL_LEVEL_WEIGHTS.get(level, 1.5)))
+    for position, description in Experience.objects.filter(resume_id=resume_id).values_list('position', 'description'):
+        texts += [(position, 2.0), (description, 1.0)]
+    for title, description in Project.objects.filter(resume_id=resume_id).values_list('title', 'description'):
+        texts += [(title, 1.0), (description, 1.0)]
+    summaries = PersonalInfo.objects.filter(resume_id=resume_id).values_list('summary', flat=True)
+    texts += [(summary, 1.0) for summary in summaries]
+    return term_frequencies(texts)
+
+
+def recommend_jobs(resume, limit=5):
+    """
+    The limit jobs that best match resume, each with a ``match_score``.
+    Cached until the resume or the job catalog changes.
+    """
+    from .models import Job
+
+    cache = get_search_cache()
+    key = f'job-recommendations:{catalog_generation()}:{resume.pk}:{resume.content_version}:{limit}'
+    ranked = cache.get(key)
+    if ranked is None:
+        ranked = get_job_matcher().top_jobs(resume_frequencies(resume.pk), limit)
+        cache.set(key, ranked)
+    jobs = Job.objects.active().select_related('company').in_bulk([job_id for job_id, _ in ranked])
+    recommended = []
+    for job_id, score in ranked:
+        if job_id in jobs:
+            jobs[job_id].match_score = score
+            recommended.append(jobs[job_id])
+    return recommended
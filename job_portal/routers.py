@@ -0,0 +1,90 @@
+"""
+Read-replica routing for the job catalog.
+
+Reads of the catalog models (jobs and companies) go to one of the
+``DATABASE_REPLICAS`` aliases; every write, and every read of any other
+model, goes to the primary (``default``). Replicas lag behind the primary,
+so reads only leave it inside a request that ReplicaRoutingMiddleware has
+cleared for replicas:
+
+- requests with an unsafe method (POST, ...) read from the primary,
+- a request that changes the catalog reads from the primary from then on,
+  and marks the session so the same user's requests keep reading from it for
+  ``DATABASE_REPLICA_STICKY_SECONDS``, long enough for the replicas to
+  catch up with the write,
+- code outside a request (management commands, tests) always uses the
+  primary.
+
+The routing state of the current request is held in a context variable, so
+it follows the request into the threads the async ORM runs queries in. The
+search result and facet caches consult it too: a pinned request bypasses
+them, so cached pages cannot hide the user's own write.
+"""
+import contextvars
+import random
+
+from django.conf import settings
+
+CATALOG_MODELS = frozenset({'job_portal.job', 'job_portal.company'})
+
+_routing = contextvars.ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    def __init__(self, pinned):
+        self.pinned = pinned  # catalog reads go to the primary
+        self.wrote = False  # the catalog was changed
+
+
+def route_request(pinned):
+    """Start routing the current request's queries: (state, token for end_request)"""
+    state = RoutingState(pinned)
+    return state, _routing.set(state)
+
+
+def end_request(token):
+    _routing.reset(token)
+
+
+def pinned_to_primary():
+    """Whether the current request reads the catalog from the primary because it is, or follows, a write"""
+    state = _routing.get()
+    return state is not None and state.pinned
+
+
+def reads_from_replicas():
+    """Whether the current request's catalog reads go to a replica"""
+    state = _routing.get()
+    return state is not None and not state.pinned and bool(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if state is None or state.pinned or not replicas or model._meta.label_lower not in CATALOG_MODELS:
+            return None
+        # Related objects come from the database their parent was read from
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in replicas:
+            return instance._state.db
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None and model._meta.label_lower in CATALOG_MODELS:
+            state.pinned = state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's rows, so objects read from either relate
+        databases = {'default', *getattr(settings, 'DATABASE_REPLICAS', ())}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema by replication
+        if db in getattr(settings, 'DATABASE_REPLICAS', ()):
+            return False
+        return None
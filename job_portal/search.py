@@ -0,0 +1,437 @@
+"""
+Full-text search backends for the job catalog.
+
+The active backend is selected with the ``JOB_SEARCH_BACKEND`` setting. Every
+backend takes a ``Job`` queryset and a keyword string and returns the queryset
+restricted to matching jobs, annotated with ``search_rank`` (lower is better)
+and ordered by BM25 relevance; ``search_page()`` returns one keyset page of
+them. Ranking happens within the queryset, so its filters (city, salary,
+expiry...) apply before any match is ranked and no match is cut off.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .cache import GenerationalIndex
+from .pagination import DEFAULT_KEYSET, KeysetPage, decode_cursor, encode_cursor, paginate_keyset
+
+FTS_TABLE = 'job_portal_job_fts'
+# Search results are paged by rank, then newest first
+SEARCH_KEYSET = ('search_rank',) + DEFAULT_KEYSET
+
+# Relative weight of each indexed field when scoring a match
+FIELD_WEIGHTS = {
+    'title': 10.0,
+    'description': 1.0,
+    'requirements': 2.0,
+    'company_name': 5.0,
+}
+
+# Up to this many scored jobs are filtered with an IN list of their ids; more
+# are intersected with the filtered queryset's ids as they stream in, so the
+# query never takes one bind parameter per match
+MAX_FILTER_IDS = 500
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split text into lowercase, accent-folded word tokens"""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return TOKEN_RE.findall(text.lower())
+
+
+def job_document(job):
+    """Return the indexed text fields for a job"""
+    return {
+        'title': job.title,
+        'description': job.description,
+        'requirements': job.requirements,
+        'company_name': job.company.name,
+    }
+
+
+def job_attributes(job):
+    """
+    Return what the in-memory index keeps of a job besides its text, for
+    ordering and facets: (posted_date, job_type, city_key, company_id,
+    company name)
+    """
+    return job.posted_date, job.job_type, job.city_key, job.company_id, job.company.name
+
+
+def ranked_queryset(queryset, ranked):
+    """
+    Restrict queryset to the ``(job_id, rank)`` pairs in ranked and annotate
+    each row with its rank as ``search_rank``.
+    """
+    if not ranked:
+        # Still annotated, so callers can order by search_rank
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+    return queryset.filter(pk__in=[job_id for job_id, _ in ranked]).annotate(
+        search_rank=Case(
+            *[When(pk=job_id, then=Value(rank)) for job_id, rank in ranked],
+            output_field=FloatField(),
+        )
+    ).order_by('search_rank', '-posted_date')
+
+
+class BaseSearchBackend:
+    """Interface shared by all job search backends"""
+
+    def search(self, queryset, keyword):
+        raise NotImplementedError
+
+    def matches(self, queryset, keyword):
+        """Every match in queryset, unranked: what facets and counts are taken over"""
+        return self.search(queryset, keyword)
+
+    def search_page(self, queryset, keyword, cursor=None, per_page=20):
+        """
+        The KeysetPage of matches that follows cursor, and a queryset of every
+        match (for counting and facets).
+        """
+        page = paginate_keyset(self.search(queryset, keyword), cursor, per_page, SEARCH_KEYSET)
+        return page, self.matches(queryset, keyword)
+
+    def index_job(self, job):
+        raise NotImplementedError
+
+    def remove_job(self, job_id):
+        raise NotImplementedError
+
+    def index_company(self, company):
+        """Re-index every job of a company, e.g. after it was renamed"""
+        for job in company.jobs.select_related('company'):
+            self.index_job(job)
+
+    def rebuild(self):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 backend. Postings live in the ``job_portal_job_fts`` virtual
+    table (created by migration 0002), keyed by the job's primary key.
+    """
+
+    def __init__(self):
+        self._available = None
+
+    @property
+    def available(self):
+        if self._available is None:
+            self._available = connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+        return self._available
+
+    @staticmethod
+    def build_match(keyword):
+        # Every token is matched as a prefix so partially typed words still hit
+        return ' '.join(f'"{token}"*' for token in tokenize(keyword))
+
+    def search(self, queryset, keyword):
+        match = self.build_match(keyword)
+        if not match:
+            return ranked_queryset(queryset, [])
+        weights = ', '.join(str(w) for w in FIELD_WEIGHTS.values())
+        table = queryset.model._meta.db_table
+        # Join the postings to the filtered jobs, so SQLite ranks only the rows
+        # the filters keep; bm25() is only valid with the MATCH in the same query
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).annotate(
+            search_rank=RawSQL(f'bm25({FTS_TABLE}, {weights})', [], output_field=FloatField()),
+        ).order_by('search_rank', '-posted_date')
+
+    def matches(self, queryset, keyword):
+        match = self.build_match(keyword)
+        if not match:
+            return queryset.none()
+        # Without bm25() the MATCH can run once as a subquery. Joined, SQLite may
+        # drive a grouped count from a job index and run the MATCH per job.
+        return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+
+    def index_job(self, job):
+        if not self.available:
+            return
+        doc = job_document(job)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [job.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description, requirements, company_name) '
+                f'VALUES (%s, %s, %s, %s, %s)',
+                [job.pk, doc['title'], doc['description'], doc['requirements'], doc['company_name']],
+            )
+
+    def remove_job(self, job_id):
+        if not self.available:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [job_id])
+
+    def rebuild(self):
+        if not self.available:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description, requirements, company_name) '
+                f'SELECT j.id, j.title, j.description, j.requirements, c.name '
+                f'FROM job_portal_job j JOIN job_portal_company c ON c.id = j.company_id'
+            )
+
+
+class IndexMatches:
+    """
+    The matches of an InvertedIndexBackend search: their job ids, counted
+    into facets from what the index holds of each job (see facet_rows()),
+    so no query lists every match.
+    """
+
+    def __init__(self, backend, job_ids):
+        self.backend = backend
+        self.job_ids = job_ids
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def facet_rows(self):
+        return self.backend.facet_rows(self.job_ids)
+
+
+class InvertedIndexBackend(GenerationalIndex, BaseSearchBackend):
+    """
+    Pure-Python inverted index kept in process memory.
+
+    Used wherever FTS5 is not available. The index is built lazily from the
+    database on first use, maintained by the Job/Company signals, and
+    rebuilt when the catalog generation moves past the one it was built at.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        super().__init__()
+        self._postings = defaultdict(dict)  # term -> {job_id: weighted tf}
+        self._doc_terms = {}                # job_id -> set of terms
+        self._doc_lengths = {}              # job_id -> weighted length
+        self._attributes = {}               # job_id -> job_attributes()
+        self._vocabulary = []               # sorted terms, for prefix lookups
+        self._total_length = 0.0
+
+    def _add(self, job_id, doc, attributes):
+        frequencies = defaultdict(float)
+        for field, text in doc.items():
+            for token in tokenize(text):
+                frequencies[token] += FIELD_WEIGHTS[field]
+        length = sum(frequencies.values())
+        for term, tf in frequencies.items():
+            if term not in self._postings:
+                self._vocabulary.insert(bisect_left(self._vocabulary, term), term)
+            self._postings[term][job_id] = tf
+        self._doc_terms[job_id] = set(frequencies)
+        self._doc_lengths[job_id] = length
+        self._attributes[job_id] = attributes
+        self._total_length += length
+
+    def _remove(self, job_id):
+        for term in self._doc_terms.pop(job_id, ()):
+            postings = self._postings[term]
+            postings.pop(job_id, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect_left(self._vocabulary, term)
+                if index < len(self._vocabulary) and self._vocabulary[index] == term:
+                    del self._vocabulary[index]
+        self._total_length -= self._doc_lengths.pop(job_id, 0.0)
+        self._attributes.pop(job_id, None)
+
+    def _expand(self, prefix):
+        """Return all indexed terms starting with prefix"""
+        index = bisect_left(self._vocabulary, prefix)
+        terms = []
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(prefix):
+            terms.append(self._vocabulary[index])
+            index += 1
+        return terms
+
+    def score(self, keyword):
+        """Return ``{job_id: bm25 score}`` for jobs matching every token"""
+        tokens = tokenize(keyword)
+        if not tokens:
+            return {}
+        with self._lock:
+            self._ensure_built()
+            total_docs = len(self._doc_lengths)
+            if not total_docs:
+                return {}
+            avg_length = self._total_length / total_docs
+            scores = None
+            for token in tokens:
+                token_scores = defaultdict(float)
+                for term in self._expand(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for job_id, tf in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[job_id] / avg_length)
+                        token_scores[job_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        job_id: score + token_scores[job_id]
+                        for job_id, score in scores.items()
+                        if job_id in token_scores
+                    }
+                if not scores:
+                    return {}
+            return scores
+
+    def ranking(self, queryset, keyword):
+        """
+        ``(search_rank, posted_date, job_id)`` of every match the queryset's
+        filters keep, in SEARCH_KEYSET order.
+        """
+        scores = self.score(keyword)
+        if not scores:
+            return []
+        job_ids = queryset.order_by().values_list('pk', flat=True)
+        if len(scores) <= MAX_FILTER_IDS:
+            job_ids = job_ids.filter(pk__in=list(scores))
+        with self._lock:
+            # Negate so that, as with FTS5's bm25(), a lower rank is a better match
+            ranking = [
+                (-scores[job_id], self._attributes[job_id][0], job_id)
+                for job_id in job_ids.iterator(chunk_size=2000)
+                if job_id in scores and job_id in self._attributes
+            ]
+        ranking.sort(key=self.sort_key)
+        return ranking
+
+    @staticmethod
+    def sort_key(row):
+        rank, posted_date, job_id = row
+        return rank, -posted_date.timestamp(), -job_id
+
+    def search(self, queryset, keyword):
+        return ranked_queryset(queryset, [(job_id, rank) for rank, _, job_id in self.ranking(queryset, keyword)])
+
+    def search_page(self, queryset, keyword, cursor=None, per_page=20):
+        # The ranks only exist here, so the page is cut from the ranking in
+        # Python (as the keyset paginator would) and only its rows are loaded
+        ranking = self.ranking(queryset, keyword)
+        start = 0
+        if cursor:
+            after = self.sort_key(decode_cursor(cursor, queryset.model, SEARCH_KEYSET))
+            start = bisect_right(ranking, after, key=self.sort_key)
+        window = ranking[start:start + per_page + 1]
+        jobs = queryset.in_bulk([job_id for _, _, job_id in window])
+        rows = []
+        for rank, _, job_id in window:
+            if job_id in jobs:
+                jobs[job_id].search_rank = rank
+                rows.append(jobs[job_id])
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1], SEARCH_KEYSET) if len(window) > per_page and rows else None
+        return KeysetPage(rows, next_cursor), self.matches(queryset, keyword, ranking)
+
+    def matches(self, queryset, keyword, ranking=None):
+        if ranking is None:
+            ranking = self.ranking(queryset, keyword)
+        return IndexMatches(self, [job_id for _, _, job_id in ranking])
+
+    def facet_rows(self, job_ids):
+        """The rows of facets.facet_query() over job_ids, counted from the index"""
+        counts = Counter()
+        with self._lock:
+            for job_id in job_ids:
+                if job_id in self._attributes:
+                    _, job_type, city_key, company_id, company_name = self._attributes[job_id]
+                    counts['job_type', job_type, job_type] += 1
+                    counts['city', city_key, city_key] += 1
+                    counts['company', str(company_id), company_name] += 1
+        return [
+            {'facet': facet, 'value': value, 'label': label, 'count': count}
+            for (facet, value, label), count in counts.items()
+        ]
+
+    # Changes are applied once the write commits, from values read now, so a
+    # rolled-back transaction leaves no postings behind
+
+    def index_job(self, job):
+        if not self._built:
+            return
+        job_id, doc, attributes = job.pk, job_document(job), job_attributes(job)
+        transaction.on_commit(lambda: self._index(job_id, doc, attributes))
+
+    def _index(self, job_id, doc, attributes):
+        with self._lock:
+            if self._built:
+                self._remove(job_id)
+                self._add(job_id, doc, attributes)
+
+    def remove_job(self, job_id):
+        transaction.on_commit(lambda: self._unindex(job_id))
+
+    def _unindex(self, job_id):
+        with self._lock:
+            if self._built:
+                self._remove(job_id)
+
+    def rebuild(self):
+        from .models import Job
+
+        with self._lock:
+            self._start_build()
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_lengths.clear()
+            self._attributes.clear()
+            self._vocabulary = []
+            self._total_length = 0.0
+            rows = Job.objects.values_list(
+                'pk', 'title', 'description', 'requirements', 'company__name',
+                'posted_date', 'job_type', 'city_key', 'company_id',
+            )
+            for pk, title, description, requirements, company_name, *attributes in rows.iterator(chunk_size=2000):
+                self._add(pk, {
+                    'title': title,
+                    'description': description,
+                    'requirements': requirements,
+                    'company_name': company_name,
+                }, (*attributes, company_name))
+            self._built = True
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """Return the configured search backend, falling back to the in-memory index"""
+    backend_path = getattr(settings, 'JOB_SEARCH_BACKEND', 'job_portal.search.SQLiteFTSBackend')
+    backend = import_string(backend_path)()
+    if isinstance(backend, SQLiteFTSBackend) and not backend.available:
+        return InvertedIndexBackend()
+    return backend
+
+
+async def asearch_page(queryset, keyword, cursor=None, per_page=20):
+    """
+    search_page() of the configured backend from async code. Backends query
+    the database (FTS5, or to build their index), so this runs in a thread.
+    """
+    return await sync_to_async(lambda: get_search_backend().search_page(queryset, keyword, cursor, per_page))()
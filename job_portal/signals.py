@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from resume_builder.signals import resume_content_changed
+
+from .cache import GenerationalIndex, bump_catalog_generation, bump_resume_generation
+from .candidates import get_candidate_matcher
+from .models import Company, Job
+from .recommendations import get_job_matcher
+from .search import get_search_backend
+from .suggest import get_suggestion_index
+
+
+@receiver(pre_save, sender=Job)
+def normalize_job(sender, instance, raw, **kwargs):
+    """Keep the parsed salary and city columns in step with the text fields"""
+    if not raw:
+        instance.normalize_fields()
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, **kwargs):
+    """Keep the search index in sync when a job is created or edited"""
+    get_search_backend().index_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    get_search_backend().remove_job(instance.pk)
+
+
+@receiver(post_save, sender=Company)
+def reindex_company_jobs(sender, instance, created, **kwargs):
+    """Company names are indexed on each job, so a rename touches all its jobs"""
+    if not created:
+        get_search_backend().index_company(instance)
+
+
+# The suggestion index and job matcher are updated once the write commits, from values read
+# now, so a rolled-back transaction leaves it untouched
+
+@receiver(post_save, sender=Job)
+def suggest_job(sender, instance, **kwargs):
+    index = get_suggestion_index()
+    if instance.expired_at is not None:
+        job_id = instance.pk
+        transaction.on_commit(lambda: index.remove_job(job_id))
+        return
+    args = (instance.pk, instance.title, instance.city_key, instance.company_id)
+    transaction.on_commit(lambda: index.update_job(*args))
+
+
+@receiver(post_delete, sender=Job)
+def unsuggest_job(sender, instance, **kwargs):
+    index = get_suggestion_index()
+    job_id = instance.pk
+    transaction.on_commit(lambda: index.remove_job(job_id))
+
+
+@receiver(post_save, sender=Job)
+def match_job(sender, instance, **kwargs):
+    matcher = get_job_matcher()
+    if instance.expired_at is not None:
+        job_id = instance.pk
+        transaction.on_commit(lambda: matcher.remove_job(job_id))
+        return
+    args = (instance.pk, instance.title, instance.requirements, instance.description)
+    transaction.on_commit(lambda: matcher.update_job(*args))
+
+
+@receiver(post_delete, sender=Job)
+def unmatch_job(sender, instance, **kwargs):
+    matcher = get_job_matcher()
+    job_id = instance.pk
+    transaction.on_commit(lambda: matcher.remove_job(job_id))
+
+
+@receiver(post_save, sender=Company)
+def suggest_company(sender, instance, **kwargs):
+    index = get_suggestion_index()
+    company_id, name = instance.pk, instance.name
+    transaction.on_commit(lambda: index.update_company(company_id, name))
+
+
+@receiver(post_delete, sender=Company)
+def unsuggest_company(sender, instance, **kwargs):
+    index = get_suggestion_index()
+    company_id = instance.pk
+    transaction.on_commit(lambda: index.remove_company(company_id))
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_search_results(sender, **kwargs):
+    """A new catalog generation makes every cached search result page stale"""
+    transaction.on_commit(publish_catalog_write)
+
+
+def publish_catalog_write():
+    # Connected after the receivers above, so the in-process indexes already
+    # hold this write and only need to know the generation it started
+    generation = bump_catalog_generation()
+    backend = get_search_backend()
+    if isinstance(backend, GenerationalIndex):
+        backend.caught_up(generation)
+    get_suggestion_index().caught_up(generation)
+    get_job_matcher().caught_up(generation)
+
+
+@receiver(resume_content_changed)
+def refresh_candidate(sender, resume_id, **kwargs):
+    matcher = get_candidate_matcher()
+
+    def refresh():
+        matcher.mark_stale(resume_id)
+        matcher.caught_up(bump_resume_generation())
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_delete, sender='resume_builder.Resume')
+def drop_candidate(sender, instance, **kwargs):
+    matcher = get_candidate_matcher()
+    resume_id = instance.pk
+
+    def drop():
+        matcher.remove_resume(resume_id)
+        matcher.caught_up(bump_resume_generation())
+
+    transaction.on_commit(drop)
+
+
+@receiver(connection_created)
+def use_wal_journal(sender, connection, **kwargs):
+    """
+    Switch a SQLite database to WAL the first time it is opened. The mode
+    persists in the file, so later connections only read it; replicas are
+    read-only copies that take it from the primary.
+    """
+    if connection.vendor != 'sqlite' or connection.alias in getattr(settings, 'DATABASE_REPLICAS', ()):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        if cursor.fetchone()[0] not in ('wal', 'memory'):
+            cursor.execute('PRAGMA journal_mode = WAL')
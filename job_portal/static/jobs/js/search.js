@@ -3,10 +3,9 @@ document.addEventListener('DOMContentLoaded', function() {
     const searchForm = document.querySelector('.search-form form');
     const keywordInput = searchForm?.querySelector('input[name="keyword"]');
     const locationInput = searchForm?.querySelector('input[name="location"]');
+    const salaryInput = searchForm?.querySelector('input[name="salary_min"]');
     const jobsList = document.querySelector('.jobs-list');
     const searchButton = searchForm?.querySelector('button[type="submit"]');
-    let keywordTimeoutId;
-    let locationTimeoutId;
 
     // Set initial button state
     const originalButtonText = searchButton?.innerHTML || '<span class="material-symbols-outlined">search</span>';
@@ -19,21 +18,17 @@ document.addEventListener('DOMContentLoaded', function() {
     if (locationInput && urlParams.has('location')) {
         locationInput.value = urlParams.get('location');
     }
-
-    // Handle real-time search for keyword input
-    if (keywordInput) {
-        keywordInput.addEventListener('input', (e) => {
-            clearTimeout(keywordTimeoutId);
-            keywordTimeoutId = setTimeout(() => handleRealTimeSearch(), 300);
-        });
+    if (salaryInput && urlParams.has('salary_min')) {
+        salaryInput.value = urlParams.get('salary_min');
     }
 
-    // Handle real-time search for location input
-    if (locationInput) {
-        locationInput.addEventListener('input', (e) => {
-            clearTimeout(locationTimeoutId);
-            locationTimeoutId = setTimeout(() => handleRealTimeSearch(), 300);
-        });
+    // Typing only fetches completions; the search itself runs on submit
+    attachSuggestions(keywordInput, '');
+    attachSuggestions(locationInput, 'location');
+
+    // Salary changes search right away; the value is parsed server-side
+    if (salaryInput) {
+        salaryInput.addEventListener('change', () => handleRealTimeSearch(true));
     }
 
     // Handle form submission
@@ -44,25 +39,60 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    function handleRealTimeSearch(isFormSubmit = false) {
-        const keyword = keywordInput?.value || '';
-        const location = locationInput?.value || '';
-
-        // Only search if we have at least 2 characters in either field
-        if (!isFormSubmit && keyword.length < 2 && location.length < 2) {
+    // Fill a datalist under input with completions from /search/suggest/
+    function attachSuggestions(input, kind) {
+        if (!input) {
             return;
         }
+        const datalist = document.createElement('datalist');
+        datalist.id = `${input.name}-suggestions`;
+        input.setAttribute('list', datalist.id);
+        input.setAttribute('autocomplete', 'off');
+        input.after(datalist);
 
+        let timeoutId;
+        let controller;
+        input.addEventListener('input', () => {
+            clearTimeout(timeoutId);
+            const prefix = input.value.trim();
+            if (prefix.length < 2) {
+                datalist.replaceChildren();
+                return;
+            }
+            timeoutId = setTimeout(() => {
+                controller?.abort();
+                controller = new AbortController();
+                const params = new URLSearchParams({ q: prefix });
+                if (kind) params.set('kind', kind);
+                fetch(`/search/suggest/?${params.toString()}`, { signal: controller.signal })
+                    .then(response => response.ok ? response.json() : { suggestions: [] })
+                    .then(data => {
+                        datalist.replaceChildren(...data.suggestions.map(suggestion => {
+                            const option = document.createElement('option');
+                            option.value = suggestion.label;
+                            option.label = `${suggestion.kind} · ${suggestion.count}`;
+                            return option;
+                        }));
+                    })
+                    .catch(error => {
+                        if (error.name !== 'AbortError') console.error('Suggestion error:', error);
+                    });
+            }, 80);
+        });
+    }
+
+    function handleRealTimeSearch(isFormSubmit = false) {
         // Update button state
         if (searchButton) {
             searchButton.disabled = true;
             searchButton.innerHTML = '<span class="spinner-border spinner-border-sm"></span>';
         }
 
-        // Build search URL
+        // Build search URL from every non-empty field of the form
         const searchParams = new URLSearchParams();
-        if (keyword) searchParams.set('keyword', keyword);
-        if (location) searchParams.set('location', location);
+        new FormData(searchForm).forEach((value, name) => {
+            if (value) searchParams.set(name, value);
+        });
         
         // Get CSRF token
         const csrftoken = getCookie('csrftoken');
@@ -112,6 +142,43 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     }
 
+    // Load the next page of results and append it to the current list
+    document.addEventListener('click', function(e) {
+        const loadMore = e.target.closest('.load-more');
+        if (!loadMore) {
+            return;
+        }
+        e.preventDefault();
+        loadMore.classList.add('disabled');
+
+        fetch(loadMore.href, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error('Network response was not ok');
+                }
+                return response.json();
+            })
+            .then(data => {
+                loadMore.insertAdjacentHTML('beforebegin', data.html);
+                if (data.next_cursor) {
+                    const nextUrl = new URL(loadMore.href, window.location.origin);
+                    nextUrl.searchParams.set('cursor', data.next_cursor);
+                    loadMore.href = nextUrl.toString();
+                    loadMore.classList.remove('disabled');
+                } else {
+                    loadMore.remove();
+                }
+            })
+            .catch(error => {
+                console.error('Load more error:', error);
+                loadMore.classList.remove('disabled');
+            });
+    });
+
     // Add clear search functionality
     const clearSearch = document.querySelector('.clear-search');
     if (clearSearch) {
@@ -119,6 +186,7 @@ document.addEventListener('DOMContentLoaded', function() {
             e.preventDefault();
             if (keywordInput) keywordInput.value = '';
             if (locationInput) locationInput.value = '';
+            if (salaryInput) salaryInput.value = '';
             window.location.href = window.location.pathname;
         });
     }
@@ -0,0 +1,202 @@
+"""
+In-process prefix index for search-as-you-type suggestions.
+
+Job titles, company names and cities are kept in sorted arrays of phrase
+keys searched with bisect, next to a ranking of each by number of jobs. Every word of a phrase starts a key, so "eng"
+completes "Senior Engineer" as well as "Engineering Manager". The index is
+built lazily from the database on first use and then maintained by the
+Job/Company signals once each write commits; it is rebuilt when the catalog
+generation moves past the one it was built at, e.g. after import_jobs.
+"""
+import heapq
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+from .cache import GenerationalIndex
+from .search import tokenize
+
+SUGGESTION_KINDS = ('title', 'company', 'location')
+# Prefixes matching more phrase keys than this are answered by walking the
+# entries from the most jobs down instead of scanning every match
+SCAN_LIMIT = 256
+
+
+def phrase_keys(text):
+    """Normalized phrase plus every suffix that starts at a word boundary"""
+    tokens = tokenize(text)
+    return [' '.join(tokens[i:]) for i in range(len(tokens))]
+
+
+class SuggestionIndex(GenerationalIndex):
+    def __init__(self):
+        super().__init__()
+        # Per kind: sorted (phrase key, value) and (-count, ' ' + phrase, value)
+        self._keys = {kind: [] for kind in SUGGESTION_KINDS}
+        self._ranking = {kind: [] for kind in SUGGESTION_KINDS}
+        self._entries = {}    # (kind, value) -> {'label', 'phrase', 'count'}
+        self._jobs = {}       # job_id -> (title, city_key, company_id)
+        self._companies = {}  # company_id -> name
+
+    def _add_keys(self, kind, value, label):
+        for key in phrase_keys(label):
+            insort(self._keys[kind], (key, value))
+
+    def _remove_keys(self, kind, value, label):
+        keys = self._keys[kind]
+        for key in phrase_keys(label):
+            index = bisect_left(keys, (key, value))
+            if index < len(keys) and keys[index] == (key, value):
+                del keys[index]
+
+    def _rank(self, kind, value, entry, add):
+        ranking = self._ranking[kind]
+        item = (-entry['count'], ' ' + entry['phrase'], value)
+        if add:
+            insort(ranking, item)
+        else:
+            index = bisect_left(ranking, item)
+            if index < len(ranking) and ranking[index] == item:
+                del ranking[index]
+
+    def _increment(self, kind, value, label):
+        entry = self._entries.get((kind, value))
+        if entry is None:
+            entry = self._entries[(kind, value)] = {'label': label, 'phrase': ' '.join(tokenize(label)), 'count': 0}
+            self._add_keys(kind, value, label)
+        else:
+            self._rank(kind, value, entry, add=False)
+        entry['count'] += 1
+        self._rank(kind, value, entry, add=True)
+
+    def _decrement(self, kind, value):
+        entry = self._entries.get((kind, value))
+        if entry is None:
+            return
+        self._rank(kind, value, entry, add=False)
+        entry['count'] -= 1
+        if entry['count'] <= 0:
+            del self._entries[(kind, value)]
+            self._remove_keys(kind, value, entry['label'])
+        else:
+            self._rank(kind, value, entry, add=True)
+
+    def _add_job(self, job_id, title, city_key, company_id):
+        self._jobs[job_id] = (title, city_key, company_id)
+        if tokenize(title):
+            self._increment('title', ' '.join(tokenize(title)), title)
+        if city_key:
+            self._increment('location', city_key, city_key.title())
+        if company_id in self._companies:
+            self._increment('company', company_id, self._companies[company_id])
+
+    def _remove_job(self, job_id):
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        title, city_key, company_id = job
+        if tokenize(title):
+            self._decrement('title', ' '.join(tokenize(title)))
+        if city_key:
+            self._decrement('location', city_key)
+        self._decrement('company', company_id)
+
+    def _matches(self, kind, prefix, limit):
+        """Up to limit (count, value) of kind with a phrase key starting with prefix, most jobs first"""
+        keys = self._keys[kind]
+        low = bisect_left(keys, (prefix,))
+        high = bisect_left(keys, (prefix + '\uffff',), low)
+        if high - low <= SCAN_LIMIT:
+            values = {value for _, value in keys[low:high]}
+            return heapq.nsmallest(limit, (
+                (-self._entries[(kind, value)]['count'], value) for value in values
+            ))
+        # Many keys match, so the entries with the most jobs soon yield enough
+        word_prefix = ' ' + prefix
+        matches = []
+        for count, phrase, value in self._ranking[kind]:
+            if word_prefix in phrase:
+                matches.append((count, value))
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def suggest(self, prefix, limit=8, kinds=SUGGESTION_KINDS):
+        """
+        Top completions of prefix as dicts with kind, value, label and the
+        number of jobs. Any word of a title, company or city may start the
+        match; among the most popular matches, those starting at the first
+        word are listed first.
+        """
+        prefix = ' '.join(tokenize(prefix))
+        if not prefix or limit <= 0:
+            return []
+        with self._lock:
+            self._ensure_built()
+            candidates = [
+                (count, kind, value)
+                for kind in kinds
+                for count, value in self._matches(kind, prefix, limit)
+            ]
+            best = [
+                (kind, value, self._entries[(kind, value)])
+                for _, kind, value in heapq.nsmallest(limit, candidates, key=lambda item: item[0])
+            ]
+        best.sort(key=lambda item: not item[2]['phrase'].startswith(prefix))
+        return [
+            {'kind': kind, 'value': value, 'label': entry['label'], 'count': entry['count']}
+            for kind, value, entry in best
+        ]
+
+    def update_job(self, job_id, title, city_key, company_id):
+        with self._lock:
+            if not self._built:
+                return
+            self._remove_job(job_id)
+            self._add_job(job_id, title, city_key, company_id)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            if self._built:
+                self._remove_job(job_id)
+
+    def update_company(self, company_id, name):
+        with self._lock:
+            if not self._built:
+                return
+            old_name = self._companies.get(company_id)
+            self._companies[company_id] = name
+            entry = self._entries.get(('company', company_id))
+            if entry is not None and old_name != name:
+                self._remove_keys('company', company_id, entry['label'])
+                self._rank('company', company_id, entry, add=False)
+                entry['label'] = name
+                entry['phrase'] = ' '.join(tokenize(name))
+                self._add_keys('company', company_id, name)
+                self._rank('company', company_id, entry, add=True)
+
+    def remove_company(self, company_id):
+        # Its jobs are deleted (and removed) along with it
+        with self._lock:
+            if self._built:
+                self._companies.pop(company_id, None)
+
+    def rebuild(self):
+        from .models import Company, Job
+
+        with self._lock:
+            self._start_build()
+            self._keys = {kind: [] for kind in SUGGESTION_KINDS}
+            self._ranking = {kind: [] for kind in SUGGESTION_KINDS}
+            self._entries.clear()
+            self._jobs.clear()
+            # From the primary: the index lives on, and signals only send it later changes
+            self._companies = dict(Company.objects.using('default').values_list('pk', 'name'))
+            rows = Job.objects.using('default').active().values_list('pk', 'title', 'city_key', 'company_id')
+            for row in rows.iterator(chunk_size=2000):
+                self._add_job(*row)
+            self._built = True
+
+
+@lru_cache(maxsize=None)
+def get_suggestion_index():
+    return SuggestionIndex()
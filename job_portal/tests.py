@@ -0,0 +1,290 @@
+import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from resume_builder.models import Resume
+
+from .cache import get_search_cache
+from .facets import facet_counts
+from .management.seeding import seed_jobs
+from .models import Company, CustomUser, Job
+from .normalization import normalize_search_params
+from .pagination import DEFAULT_KEYSET, encode_cursor
+from .search import MAX_FILTER_IDS, InvertedIndexBackend
+from .suggest import get_suggestion_index
+from .views import filter_jobs
+
+# Table sizes each query count is checked at: it must not change between them
+SIZES = (10, 1000)
+
+# Views whose rows must come straight off an index in the requested order:
+# a temporary sort there means an index is missing, even without a full scan.
+# Other views may sort rows they found through an index (search results
+# ranked by relevance, a city narrowed down by salary).
+INDEX_ORDERED = {
+    'index', 'index next page', 'search location', 'search city', 'search job type',
+    'company profile', 'resume dashboard',
+}
+
+
+def explain(sql):
+    """
+    Return (plan text, full table scan?, temp sort?) for a captured SELECT. A
+    full-text MATCH repeated per row of another table counts as a full scan.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            details = [row[-1] for row in cursor.fetchall()]
+            # "SCAN t USING [COVERING] INDEX i" walks an index in order and
+            # "SCAN t VIRTUAL TABLE INDEX" is an FTS5 MATCH; a bare "SCAN t"
+            # reads the whole table. "VIRTUAL TABLE INDEX 0:=M" is a MATCH
+            # looked up by rowid, i.e. run again for every row of a join.
+            full_scan = any(
+                (detail.startswith('SCAN ') and ' USING ' not in detail and ' VIRTUAL TABLE ' not in detail)
+                or ' VIRTUAL TABLE INDEX 0:=M' in detail
+                for detail in details
+            )
+            temp_sort = any('TEMP B-TREE FOR' in detail and 'ORDER BY' in detail for detail in details)
+            return '\n'.join(details), full_scan, temp_sort
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = []
+        stack = [plan[0]['Plan']]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node.get('Plans', []))
+        full_scan = any(node['Node Type'] == 'Seq Scan' for node in nodes)
+        temp_sort = any(node['Node Type'] in ('Sort', 'Incremental Sort') for node in nodes)
+        return '\n'.join(node['Node Type'] + (f' on {node["Relation Name"]}' if 'Relation Name' in node else '')
+                         for node in nodes), full_scan, temp_sort
+
+
+def create_admin(email='admin@example.com'):
+    return CustomUser.objects.create_superuser(email=email, password='unused', name='Admin', mobile='0000000000')
+
+
+class CacheClearingTestCase(TestCase):
+    """
+    Pages and facets cached by an earlier test would hide a view's queries;
+    the generation bumps that invalidate them are rolled back with the test.
+    """
+
+    def setUp(self):
+        self.clear_caches()
+
+    @staticmethod
+    def clear_caches():
+        cache.clear()
+        get_search_cache().clear()
+
+
+# Generations read from the database are trusted for the whole test, so
+# whether one is read again does not depend on how long the test takes
+@override_settings(SHARED_GENERATION_TTL=3600)
+class QueryCountTests(CacheClearingTestCase):
+    """Job views run a fixed number of queries, whatever the table size"""
+
+    def assertFlatQueries(self, budget, url, client=None, **headers):
+        client = client or self.client
+        seeded = 0
+        for size in SIZES:
+            company, job = seed_jobs(size - seeded)
+            seeded = size
+            self.clear_caches()
+            with self.subTest(size=size), self.assertNumQueries(budget):
+                response = client.get(url(company, job), **headers)
+                self.assertEqual(response.status_code, 200)
+
+    def test_index(self):
+        self.assertFlatQueries(1, lambda company, job: reverse('job_portal:index'))
+
+    def test_index_ajax(self):
+        self.assertFlatQueries(1, lambda company, job: reverse('job_portal:index'),
+                               HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_search_keyword(self):
+        self.assertFlatQueries(2, lambda company, job: reverse('job_portal:search_jobs') + '?keyword=engineer')
+
+    def test_search_location(self):
+        self.assertFlatQueries(2, lambda company, job: reverse('job_portal:search_jobs') + '?location=city')
+
+    def test_job_detail(self):
+        self.assertFlatQueries(1, lambda company, job: reverse('job_portal:job_detail', args=[job.pk]))
+
+    def test_company_profile(self):
+        self.assertFlatQueries(2, lambda company, job: reverse('job_portal:company_profile', args=[company.pk]))
+
+    def test_admin_job_list(self):
+        self.client.force_login(create_admin())
+        self.assertFlatQueries(9, lambda company, job: reverse('admin:job_portal_job_changelist'))
+
+
+class QueryPlanTests(CacheClearingTestCase):
+    """Every query of the hot views is served by an index, not a sorted table scan"""
+
+    size = 10000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.job = seed_jobs(cls.size)
+        cls.admin = create_admin()
+        others = CustomUser.objects.bulk_create([
+            CustomUser(email=f'query-plan-{i}@example.com', name='Check', mobile='0000000000')
+            for i in range(50)
+        ])
+        now = timezone.now()
+        Resume.objects.bulk_create([
+            Resume(user=(cls.admin if i % 10 == 0 else others[i % len(others)]), title=f'Resume {i}',
+                   updated_at=now - timedelta(hours=i))
+            for i in range(cls.size // 10)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_query_plans(self):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f'Query plans cannot be checked on {connection.vendor}')
+        self.client.force_login(self.admin)
+        second_page = encode_cursor(Job.objects.order_by(*DEFAULT_KEYSET)[19], DEFAULT_KEYSET)
+        search = reverse('job_portal:search_jobs')
+        admin_jobs = reverse('admin:job_portal_job_changelist')
+        urls = {
+            'index': reverse('job_portal:index'),
+            'index next page': reverse('job_portal:index') + f'?cursor={second_page}',
+            'search keyword': search + '?keyword=engineer',
+            'search keyword and city': search + '?keyword=engineer&city=City+7',
+            'search keyword and type': search + '?keyword=engineer&job_type=Contract',
+            'search location': search + '?location=city',
+            'search city': search + '?city=City+7',
+            'search city and salary': search + '?city=City+7&salary_min=10L',
+            'search salary': search + '?salary_min=20L',
+            'search job type': search + '?job_type=Contract',
+            'job detail': reverse('job_portal:job_detail', args=[self.job.pk]),
+            'company profile': reverse('job_portal:company_profile', args=[self.company.pk]),
+            'admin job list': admin_jobs,
+            'admin job list by type': admin_jobs + '?job_type=Contract',
+            'resume dashboard': reverse('resume_builder:dashboard'),
+        }
+        for name, url in urls.items():
+            with self.subTest(name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                for query in queries:
+                    if not query['sql'].lstrip().upper().startswith('SELECT'):
+                        continue
+                    plan, full_scan, temp_sort = explain(query['sql'])
+                    self.assertFalse(
+                        (full_scan and temp_sort) or (name in INDEX_ORDERED and temp_sort),
+                        f'{query["sql"][:200]}\n{plan}',
+                    )
+
+
+class InvertedIndexSearchTests(CacheClearingTestCase):
+    """The in-memory backend never sends the database one parameter per match"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_jobs(MAX_FILTER_IDS * 3)
+
+    def setUp(self):
+        super().setUp()
+        self.backend = InvertedIndexBackend()
+
+    def search(self, query):
+        params = normalize_search_params(QueryDict(query))
+        queryset = filter_jobs(Job.objects.active(), params).select_related('company')
+        return queryset, self.backend.search_page(queryset, params['keyword'])
+
+    def test_page_and_facets_of_every_match(self):
+        self.backend.rebuild()
+        with self.assertNumQueries(2):
+            queryset, (page, matches) = self.search('keyword=engineer&job_type=Remote')
+            counts = facet_counts(matches)
+        self.assertEqual(len(matches), queryset.count())
+        self.assertEqual(len(page.object_list), 20)
+        self.assertTrue(page.next_cursor)
+        self.assertEqual(counts, facet_counts(queryset))
+
+    def test_next_page_follows_the_ranking(self):
+        queryset, (first, _) = self.search('keyword=engineer')
+        page, _ = self.backend.search_page(queryset, 'engineer', first.next_cursor)
+        ranking = [job_id for _, _, job_id in self.backend.ranking(queryset, 'engineer')]
+        self.assertEqual([job.pk for job in first.object_list + page.object_list], ranking[:40])
+
+    def test_few_matches(self):
+        # Engineer 12, 120-129 and 1200-1299 and the jobs of Company 12: few
+        # enough for an IN list
+        queryset, (page, matches) = self.search('keyword=engineer+12')
+        expected = [
+            job.pk for job in queryset
+            if job.title.split()[1].startswith('12') or job.company.name.split()[1].startswith('12')
+        ]
+        self.assertEqual(sorted(matches.job_ids), sorted(expected))
+        self.assertEqual(facet_counts(matches), facet_counts(Job.objects.filter(pk__in=expected)))
+
+
+class SearchCacheTests(CacheClearingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_jobs(10)
+
+    def test_writer_reads_past_the_cache(self):
+        url = reverse('job_portal:search_jobs') + '?keyword=zymurgist'
+        writer = Client()
+        writer.force_login(create_admin())
+        self.client.get(url)
+        # The test's transaction never commits, so the write leaves the
+        # catalog generation, and with it the cached page, as they were
+        response = writer.post(reverse('job_portal:post_job'), {
+            'title': 'Zymurgist', 'description': 'Brews', 'requirements': 'Beer',
+            'company': Company.objects.get().pk, 'location': 'Pune',
+            'salary_range': '₹4,00,000 - ₹6,00,000', 'job_type': 'Full-time',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(writer.get(url), 'Zymurgist')
+        self.assertNotContains(self.client.get(url), 'Zymurgist')
+
+
+class SuggestTests(CacheClearingTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_jobs(100)
+
+    def setUp(self):
+        super().setUp()
+        # The index outlives the rolled-back writes of earlier tests
+        get_suggestion_index().rebuild()
+
+    def suggest(self, **params):
+        response = self.client.get(reverse('job_portal:suggest_jobs'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['suggestions']
+
+    def test_prefix_of_any_word(self):
+        labels = [item['label'] for item in self.suggest(q='4', kind='location', limit=20)]
+        self.assertEqual(sorted(labels), sorted(f'City {i}' for i in (4, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49)))
+
+    def test_most_jobs_first(self):
+        suggestions = self.suggest(q='c', limit=2)
+        self.assertEqual([(item['kind'], item['label'], item['count']) for item in suggestions][0],
+                         ('company', 'Company 0', 100))
+
+    def test_committed_jobs_are_suggested(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(
+                title='Zymurgist', description='Brews', requirements='Beer', company=Company.objects.first(),
+                location='Pune', salary_range='', job_type='Full-time',
+            )
+        self.assertEqual([item['label'] for item in self.suggest(q='zym')], ['Zymurgist'])
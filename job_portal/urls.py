@@ -11,10 +11,12 @@ urlpatterns = [
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
     path('profile/', views.ProfileView.as_view(), name='profile'),
     path('job/<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
+    path('job/<int:pk>/candidates/', views.JobCandidatesView.as_view(), name='job_candidates'),
     path('company/<int:pk>/', views.CompanyProfileView.as_view(), name='company_profile'),
     path('post-job/', views.PostJobView.as_view(), name='post_job'),
     path('update-job/<int:pk>/', views.UpdateJobView.as_view(), name='update_job'),
     path('delete-job/<int:pk>/', views.DeleteJobView.as_view(), name='delete_job'),
+    path('search/suggest/', views.SuggestView.as_view(), name='suggest_jobs'),
     path('search/', views.SearchView.as_view(), name='search_jobs'),
     path('companies/', views.CompanyListView.as_view(), name='list_companies'),
     path('add-company/', views.AddCompanyView.as_view(), name='add_company'),
@@ -1,27 +1,97 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, aget_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, FormView, TemplateView, View
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib import messages
 from django.contrib.auth import login
-from django.db.models import Q
-from django.http import JsonResponse, HttpResponseForbidden
+from django.db.models import Prefetch, Q
+from django.http import JsonResponse, HttpResponseForbidden, QueryDict
 from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
 
 from .models import CustomUser, Company, Job
 from .forms import UserRegisterForm, UserLoginForm, CompanyForm, JobForm, JobPostForm, SearchForm
+from .search import asearch_page
+from .pagination import apaginate_keyset
+from .normalization import normalize_search_params, search_query_dict
+from .facets import facet_groups, aget_facets
+from .suggest import SUGGESTION_KINDS, get_suggestion_index
+from .cache import acached_search_results
+from .recommendations import recommend_jobs
+from .candidates import get_candidate_matcher
 
-class IndexView(ListView):
-    model = Job
-    template_name = 'jobs/index.html'
-    context_object_name = 'jobs'
-    ordering = ['-posted_date']
+
+# Columns of the compact AJAX row format (?format=rows)
+ROW_COLUMNS = ('id', 'title', 'company', 'location', 'job_type', 'salary', 'snippet')
+SNIPPET_LENGTH = 120
+COMPACT_JSON = {'separators': (',', ':')}
+
+def wants_rows(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest' and request.GET.get('format') == 'rows'
+
+def jobs_page_rows(jobs):
+    """
+    Jobs as positional rows in ROW_COLUMNS order. Each company is sent once,
+    in a table keyed by the company column.
+    """
+    companies = {}
+    rows = []
+    for job in jobs:
+        if job.company_id not in companies:
+            companies[job.company_id] = {'name': job.company.name, 'logo_url': job.company.logo_url}
+        rows.append([
+            job.pk, job.title, job.company_id, job.location, job.job_type, job.salary_range,
+            Truncator(job.description).chars(SNIPPET_LENGTH),
+        ])
+    return {'columns': ROW_COLUMNS, 'rows': rows, 'companies': companies}
+
+def jobs_page_payload(request, page, context):
+    """
+    JSON payload for AJAX listings. The first page carries the whole list
+    partial (and the facet counts of a search); follow-up pages carry only
+    the cards to append. With ?format=rows the jobs come as compact rows
+    instead of HTML.
+    """
+    if wants_rows(request):
+        payload = jobs_page_rows(page.object_list)
+    elif request.GET.get('cursor'):
+        payload = {'html': render_to_string('jobs/_job_cards.html', context, request=request)}
+    else:
+        payload = {'html': render_to_string('jobs/_jobs_list.html', context, request=request)}
+    payload['next_cursor'] = page.next_cursor
+    if 'facet_counts' in context:
+        payload['facets'] = context['facet_counts']
+    return payload
+
+def render_jobs_page(request, page, context):
+    return JsonResponse(jobs_page_payload(request, page, context), json_dumps_params=COMPACT_JSON)
+
+async def resolve_user(request):
+    """
+    Load request.user with the async ORM. Async views call this before
+    rendering: templates read request.user synchronously, which would query
+    the database on the event loop.
+    """
+    request.user = await request.auser()
+
+class IndexView(View):
+    """
+    The newest jobs, keyset-paginated with ?cursor=. Async, like the other
+    browsing views, so under ASGI a request holds no worker thread between
+    its queries.
+    """
+    paginate_by = 20
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['search_form'] = SearchForm()
-        return context
+    async def get(self, request):
+        await resolve_user(request)
+        cursor = request.GET.get('cursor')
+        page = await apaginate_keyset(Job.objects.active().select_related('company'), cursor, self.paginate_by)
+        context = {'jobs': page.object_list, 'page_obj': page, 'search_form': SearchForm()}
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return render_jobs_page(request, page, context)
+        return render(request, 'jobs/index.html', context)
     
 class CustomLoginView(LoginView):
     template_name = 'jobs/login.html'
@@ -62,17 +132,28 @@ class CustomLogoutView(LogoutView):
 
 class DashboardView(LoginRequiredMixin, TemplateView):
     template_name = 'jobs/dashboard.html'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Recommendations follow the resume the user worked on last
+        resume = self.request.user.resumes.order_by('-updated_at').first()
+        if resume is not None:
+            context['recommendation_resume'] = resume
+            context['recommended_jobs'] = recommend_jobs(resume)
+        return context
 
 class ProfileView(LoginRequiredMixin, TemplateView):
     template_name = 'jobs/profile.html'
 
-class JobDetailView(DetailView):
-    model = Job
-    template_name = 'jobs/job_detail.html'
-    context_object_name = 'job'
+class JobDetailView(View):
+    async def get(self, request, pk):
+        await resolve_user(request)
+        job = await aget_object_or_404(Job.objects.select_related('company'), pk=pk)
+        return render(request, 'jobs/job_detail.html', {'job': job})
 
 class CompanyProfileView(DetailView):
     model = Company
+    queryset = Company.objects.prefetch_related(Prefetch('jobs', Job.objects.active(), to_attr='active_jobs'))
     template_name = 'jobs/company_profile.html'
     context_object_name = 'company'
 
@@ -134,42 +215,160 @@ class DeleteJobView(AdminRequiredMixin, DeleteView):
         messages.success(request, "Job deleted successfully!")
         return super().post(request, *args, **kwargs)
 
-class SearchView(View):
-    def get(self, request):
-        keyword = request.GET.get('keyword', '').strip()
-        location = request.GET.get('location', '').strip()
+class JobCandidatesView(AdminRequiredMixin, DetailView):
+    """Resumes ranked by how well their skills, languages and experience fit the job"""
+    model = Job
+    queryset = Job.objects.select_related('company')
+    template_name = 'jobs/job_candidates.html'
+    context_object_name = 'job'
+    paginate_by = 20
+    
+    def get_context_data(self, **kwargs):
+        from resume_builder.models import Resume
         
-        # Start with base query
-        query = Job.objects.all()
+        context = super().get_context_data(**kwargs)
+        job = self.object
+        ranked = get_candidate_matcher().rank(job.title, job.requirements, job.description, self.paginate_by)
+        resumes = Resume.objects.select_related('user', 'personal_info').prefetch_related('skills').in_bulk(
+            [resume_id for resume_id, _, _ in ranked]
+        )
+        context['candidates'] = [
+            {'resume': resumes[resume_id], 'score': score, 'years': years}
+            for resume_id, score, years in ranked
+            if resume_id in resumes
+        ]
+        return context
+
+def filter_jobs(queryset, params):
+    """Apply the non-keyword filters of normalized search params to queryset"""
+    if params['location']:
+        queryset = queryset.filter(location__icontains=params['location'])
+    
+    # Exact filters use the parsed, indexed columns.
+    # Open-ended ranges ("₹12L+", "Up to ₹50,000") have one bound only.
+    if params['city']:
+        queryset = queryset.filter(city_key=params['city'])
+    if params['job_type']:
+        queryset = queryset.filter(job_type=params['job_type'])
+    if params['company'] is not None:
+        queryset = queryset.filter(company_id=params['company'])
+    if params['salary_min'] is not None:
+        queryset = queryset.filter(
+            Q(salary_max__gte=params['salary_min']) | Q(salary_max__isnull=True, salary_min__isnull=False)
+        )
+    if params['salary_max'] is not None:
+        queryset = queryset.filter(
+            Q(salary_min__lte=params['salary_max']) | Q(salary_min__isnull=True, salary_max__isnull=False)
+        )
+    return queryset
+
+class SearchView(View):
+    """
+    Job search. Result pages are cached per normalized search (see
+    job_portal.cache), so the partial they render may only depend on the
+    normalized params: its links repeat the search through search_query.
+    """
+    async def get(self, request):
+        await resolve_user(request)
+        params = normalize_search_params(request.GET)
+        cursor = request.GET.get('cursor')
+        is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
         
-        # Apply filters if we have search terms
-        if keyword:
-            query = query.filter(
-                Q(title__icontains=keyword) |
-                Q(description__icontains=keyword) |
-                Q(requirements__icontains=keyword) |
-                Q(company__name__icontains=keyword)
-            )
+        # Full pages past the first (no-JS "load more") are not cached
+        if cursor and not is_ajax:
+            return render(request, 'jobs/index.html', await self.get_context(request, params, cursor))
         
-        if location:
-            query = query.filter(location__icontains=location)
+        variant = 'rows' if wants_rows(request) else 'html'
+        result = await acached_search_results(params, cursor, lambda: self.get_result(request, params, cursor), variant)
         
-        # Execute query with ordering
-        jobs = query.order_by('-posted_date')
+        # If this is an AJAX request, return only the jobs list partial (or rows)
+        if is_ajax:
+            return JsonResponse(result['payload'], json_dumps_params=COMPACT_JSON)
         
-        context = {
-            'jobs': jobs,
-            'search_keyword': keyword,
-            'search_location': location
+        # Otherwise return the full page around the cached partial
+        context = self.get_form_context(request, params)
+        context['jobs_html'] = mark_safe(result['payload']['html'])
+        return render(request, 'jobs/index.html', context)
+    
+    def get_form_context(self, request, params):
+        """Values shown in the search form, as the user typed them"""
+        return {
+            'search_keyword': request.GET.get('keyword', '').strip(),
+            'search_location': request.GET.get('location', '').strip(),
+            'search_city': params['city'],
+            'search_salary_min': request.GET.get('salary_min', '').strip(),
+            'search_salary_max': request.GET.get('salary_max', '').strip(),
+            'search_job_type': params['job_type'],
+            'search_company': params['company'],
         }
+    
+    async def get_context(self, request, params, cursor):
+        query = filter_jobs(Job.objects.active(), params)
         
-        # If this is an AJAX request, return only the jobs list partial
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            html = render_to_string('jobs/_jobs_list.html', context, request=request)
-            return JsonResponse({'html': html})
+        # Keyword matches come from the search index, ranked by relevance
+        if params['keyword']:
+            page, query = await asearch_page(
+                query.select_related('company'), params['keyword'], cursor, IndexView.paginate_by
+            )
+        else:
+            page = await apaginate_keyset(query.select_related('company'), cursor, IndexView.paginate_by)
+        search_query = search_query_dict(params)
         
-        # Otherwise return the full page
-        return render(request, 'jobs/index.html', context)
+        context = self.get_form_context(request, params)
+        context.update({
+            'jobs': page.object_list,
+            'page_obj': page,
+            'search_query': search_query,
+        })
+        # Facets describe the whole result set, so only the first page needs them
+        if not cursor:
+            counts = await aget_facets(query, params)
+            context['facet_counts'] = counts
+            context['facets'] = facet_groups(counts, search_query, request.path)
+        return context
+    
+    async def get_result(self, request, params, cursor):
+        """The cacheable part of a result page: job ids and the AJAX payload"""
+        context = await self.get_context(request, params, cursor)
+        page = context['page_obj']
+        return {
+            'ids': [job.pk for job in page.object_list],
+            'payload': jobs_page_payload(request, page, context),
+        }
+
+# Query parameter that each kind of suggestion filters the search on
+SUGGESTION_PARAMS = {'title': 'keyword', 'company': 'company', 'location': 'city'}
+MAX_SUGGESTIONS = 20
+
+class SuggestView(View):
+    """
+    Completions for the search box, answered from the in-memory prefix
+    index; the database is only asked whether the catalog changed, at most
+    once per SHARED_GENERATION_TTL. ?kind= limits them to titles, companies
+    or locations.
+    """
+    def get(self, request):
+        prefix = request.GET.get('q', '')
+        kind = request.GET.get('kind', '')
+        kinds = (kind,) if kind in SUGGESTION_KINDS else SUGGESTION_KINDS
+        try:
+            limit = min(int(request.GET.get('limit', 8)), MAX_SUGGESTIONS)
+        except ValueError:
+            limit = 8
+        
+        search_url = reverse('job_portal:search_jobs')
+        suggestions = []
+        for item in get_suggestion_index().suggest(prefix, limit, kinds):
+            value = item['label'] if item['kind'] == 'title' else item['value']
+            query = QueryDict(mutable=True)
+            query[SUGGESTION_PARAMS[item['kind']]] = value
+            suggestions.append({
+                'label': item['label'],
+                'kind': item['kind'],
+                'count': item['count'],
+                'url': f'{search_url}?{query.urlencode()}',
+            })
+        return JsonResponse({'query': prefix, 'suggestions': suggestions})
 
 class CompanyListView(AdminRequiredMixin, ListView):
     model = Company
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ResumeBuilderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resume_builder'
-    verbose_name = 'Resume Builder'
\ No newline at end of file
+    verbose_name = 'Resume Builder'
+
+    def ready(self):
+        from . import signals  # noqa: F401
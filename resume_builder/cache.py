@@ -0,0 +1,56 @@
+"""
+Cache for rendered resume HTML.
+
+Entries are keyed on ``(resume.pk, resume.template, resume.content_version)``,
+so edits never need an explicit invalidation: the version bump simply makes
+the old entry unreachable and it ages out of the cache. The storage backend
+is whichever Django cache ``RESUME_PREVIEW_CACHE`` names (see ``CACHES``).
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Resume
+
+
+def get_preview_cache():
+    return caches[getattr(settings, 'RESUME_PREVIEW_CACHE', 'default')]
+
+
+def preview_version(resume):
+    """Identify a rendering of resume; used for both cache keys and ETags"""
+    return f'{resume.pk}-{resume.template}-{resume.content_version}'
+
+
+def preview_cache_key(resume):
+    return f'resume-preview:{preview_version(resume)}'
+
+
+def render_resume_html(resume, request=None):
+    """
+    Return the rendered template for resume, from the cache when possible.
+    Only on a miss are the resume's sections loaded and the template rendered.
+    """
+    cache = get_preview_cache()
+    html = cache.get(preview_cache_key(resume))
+    if html is None:
+        hydrated = Resume.objects.with_sections().get(pk=resume.pk)
+        html = render_to_string(
+            f'resume_builder/resume_templates/{hydrated.template}.html', {'resume': hydrated}, request=request
+        )
+        cache.set(preview_cache_key(hydrated), html)
+    return mark_safe(html)
+
+
+async def arender_resume_html(resume, request=None):
+    """render_resume_html() for async views"""
+    cache = get_preview_cache()
+    html = await cache.aget(preview_cache_key(resume))
+    if html is None:
+        hydrated = await Resume.objects.with_sections().aget(pk=resume.pk)
+        html = render_to_string(
+            f'resume_builder/resume_templates/{hydrated.template}.html', {'resume': hydrated}, request=request
+        )
+        await cache.aset(preview_cache_key(hydrated), html)
+    return mark_safe(html)
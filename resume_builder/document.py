@@ -0,0 +1,220 @@
+"""
+The whole resume as one JSON document, for the single-page editor.
+
+A document holds the resume's title and template, a ``personal_info`` object
+and one list of rows per section::
+
+    {"content_version": 7, "title": "...", "personal_info": {...},
+     "education": [{"id": 3, "institution": "..."}, {"institution": "..."}]}
+
+Every key is optional, so a client may send only what it changed. A section
+list replaces the section: rows with an ``id`` update that row, rows without
+one are created, existing rows missing from the list are deleted, and the
+list order becomes the rows' ``order``. Fields left out of a row keep their
+current value. Rows are validated with the wizard's forms and the document
+is written in one transaction with a single content version bump.
+"""
+from django.db import transaction
+from django.forms import modelform_factory
+from django.forms.models import model_to_dict
+
+from .forms import (
+    ResumeForm, PersonalInfoForm, EducationForm, ExperienceForm,
+    SkillForm, ProjectForm, CertificateForm, LanguageForm
+)
+from .models import (
+    Resume, PersonalInfo, Education, Experience,
+    Skill, Project, Certificate, Language, SECTION_FLAGS
+)
+from .persistence import section_fields, touch_resume, write_section_rows
+from .signals import batched_section_writes
+
+# The wizard's formset excludes the resume from PersonalInfoForm the same way
+PersonalInfoDocumentForm = modelform_factory(PersonalInfo, form=PersonalInfoForm, exclude=['resume'])
+
+# Document key (the section's related name on Resume), model and form
+SECTIONS = (
+    ('education', Education, EducationForm),
+    ('experience', Experience, ExperienceForm),
+    ('skills', Skill, SkillForm),
+    ('projects', Project, ProjectForm),
+    ('certificates', Certificate, CertificateForm),
+    ('languages', Language, LanguageForm),
+)
+
+
+class InvalidDocument(Exception):
+    """The document failed validation; nothing was written"""
+
+    def __init__(self, errors, content_version):
+        super().__init__(errors)
+        self.errors = errors
+        self.content_version = content_version
+
+
+class StaleDocument(Exception):
+    """The client edited an older content version than the one stored"""
+
+    def __init__(self, content_version):
+        super().__init__(content_version)
+        self.content_version = content_version
+
+
+def form_data(form_class, instance, values):
+    """Bound form data: the row's current values overlaid with the submitted ones"""
+    data = model_to_dict(instance, fields=form_class.base_fields) if instance is not None else {}
+    for name, value in values.items():
+        if name in form_class.base_fields:
+            data[name] = '' if value is None else value
+    return data
+
+
+def serialize_row(form_class, instance):
+    return {'id': instance.pk, **model_to_dict(instance, fields=form_class.base_fields)}
+
+
+def serialize_resume(resume):
+    """Document for a resume loaded with Resume.objects.with_sections()"""
+    personal_info = getattr(resume, 'personal_info', None)
+    document = {
+        'id': resume.pk,
+        'content_version': resume.content_version,
+        'title': resume.title,
+        'template': resume.template,
+        'personal_info': serialize_row(PersonalInfoDocumentForm, personal_info) if personal_info else None,
+    }
+    for key, model, form_class in SECTIONS:
+        document[key] = [serialize_row(form_class, row) for row in getattr(resume, key).all()]
+    return document
+
+
+def unknown_row_error(pk):
+    return {'id': [{'message': f'Row {pk} does not belong to this resume.', 'code': 'invalid_choice'}]}
+
+
+def validate_section(model, form_class, existing, rows):
+    """
+    Validate a section's rows against its form. Returns (rows, to_create,
+    to_update, to_delete, errors): the row objects in document order, the
+    changes to write and a mapping of row positions to form errors.
+    """
+    existing = {row.pk: row for row in existing}
+    objects, to_create, to_update, errors = [], [], [], {}
+    seen = set()
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[index] = {'__all__': [{'message': 'Expected an object.', 'code': 'invalid'}]}
+            continue
+        instance = None
+        if row.get('id') is not None:
+            # bool is an int, but never a row id
+            if not isinstance(row['id'], int) or isinstance(row['id'], bool):
+                errors[index] = {'id': [{'message': 'Expected an integer or null.', 'code': 'invalid'}]}
+                continue
+            instance = existing.get(row['id'])
+            if instance is None or row['id'] in seen:
+                errors[index] = unknown_row_error(row['id'])
+                continue
+            seen.add(row['id'])
+        form = form_class(form_data(form_class, instance, row), instance=instance)
+        if not form.is_valid():
+            errors[index] = form.errors.get_json_data()
+            continue
+        obj = form.save(commit=False)
+        objects.append(obj)
+        if instance is None:
+            obj.order = index
+            to_create.append(obj)
+        elif form.has_changed() or obj.order != index:
+            obj.order = index
+            to_update.append(obj)
+    to_delete = [pk for pk in existing if pk not in seen]
+    return objects, to_create, to_update, to_delete, errors
+
+
+def save_resume_document(resume_pk, document):
+    """
+    Validate and persist a (partial) resume document in one transaction.
+    Returns (content_version, ids) where ids holds the primary keys of the
+    submitted personal info and section rows, including the created ones.
+    Raises InvalidDocument with the form errors, StaleDocument if the document
+    carries a content_version other than the stored one, and
+    Resume.DoesNotExist for an unknown pk.
+    """
+    errors = {}
+    with transaction.atomic(), batched_section_writes():
+        resume = Resume.objects.with_sections().select_for_update(of=('self',)).get(pk=resume_pk)
+        expected = document.get('content_version')
+        if expected is not None and expected != resume.content_version:
+            raise StaleDocument(resume.content_version)
+
+        resume_fields = {}
+        if 'title' in document or 'template' in document:
+            form = ResumeForm(form_data(ResumeForm, resume, document), instance=resume)
+            if not form.is_valid():
+                errors['resume'] = form.errors.get_json_data()
+            elif form.has_changed():
+                resume_fields = {name: form.cleaned_data[name] for name in ResumeForm.base_fields}
+
+        personal_info = None
+        ids = {}
+        if document.get('personal_info') is not None:
+            values = document['personal_info']
+            instance = getattr(resume, 'personal_info', None)
+            if not isinstance(values, dict):
+                errors['personal_info'] = {'__all__': [{'message': 'Expected an object.', 'code': 'invalid'}]}
+            else:
+                form = PersonalInfoDocumentForm(form_data(PersonalInfoDocumentForm, instance, values), instance=instance)
+                if not form.is_valid():
+                    errors['personal_info'] = form.errors.get_json_data()
+                elif instance is None or form.has_changed():
+                    personal_info = form.save(commit=False)
+                    personal_info.resume = resume
+                else:
+                    ids['personal_info'] = instance.pk
+
+        changes = []
+        for key, model, form_class in SECTIONS:
+            if key not in document:
+                continue
+            rows = document[key]
+            if not isinstance(rows, list):
+                errors[key] = {'__all__': [{'message': 'Expected a list.', 'code': 'invalid'}]}
+                continue
+            objects, to_create, to_update, to_delete, section_errors = validate_section(
+                model, form_class, getattr(resume, key).all(), rows
+            )
+            if section_errors:
+                errors[key] = section_errors
+                continue
+            ids[key] = objects
+            if to_create or to_update or to_delete:
+                changes.append((model, form_class, to_create, to_update, to_delete, len(rows)))
+
+        if errors:
+            raise InvalidDocument(errors, resume.content_version)
+        if not (resume_fields or personal_info or changes):
+            return resume.content_version, serialize_ids(ids)
+
+        filled = emptied = 0
+        if personal_info is not None:
+            personal_info.save()
+            ids['personal_info'] = personal_info.pk
+            filled |= SECTION_FLAGS[PersonalInfo]
+        for model, form_class, to_create, to_update, to_delete, remaining in changes:
+            write_section_rows(
+                model, resume, to_create, to_update, to_delete,
+                section_fields(model, form_class) + ['order'],
+            )
+            if remaining:
+                filled |= SECTION_FLAGS[model]
+            else:
+                emptied |= SECTION_FLAGS[model]
+        touch_resume(resume.pk, filled=filled, emptied=emptied, **resume_fields)
+        version = Resume.objects.filter(pk=resume.pk).values_list('content_version', flat=True).get()
+    return version, serialize_ids(ids)
+
+
+def serialize_ids(ids):
+    # Section rows were created by now, so every object has its primary key
+    return {key: value if key == 'personal_info' else [obj.pk for obj in value] for key, value in ids.items()}
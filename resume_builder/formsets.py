@@ -0,0 +1,58 @@
+"""
+Inline formset classes for the resume sections, built once at import.
+
+inlineformset_factory() creates a form class and a formset class through
+their metaclasses on every call, so the views look the classes up here
+instead of building them per request.
+"""
+from django.forms import inlineformset_factory
+
+from .forms import (
+    PersonalInfoForm, EducationForm, ExperienceForm,
+    SkillForm, ProjectForm, CertificateForm, LanguageForm
+)
+from .models import (
+    Resume, PersonalInfo, Education, Experience,
+    Skill, Project, Certificate, Language
+)
+from .persistence import SectionFormSet
+
+
+def section_formset(model, form, extra=1, **kwargs):
+    return inlineformset_factory(
+        Resume, model, form=form, formset=SectionFormSet, extra=extra, **kwargs
+    )
+
+
+# Personal info is a single row: an empty form is only offered until it exists
+PERSONAL_INFO_FORMSETS = {
+    extra: section_formset(
+        PersonalInfo, PersonalInfoForm, extra=extra, max_num=1,
+        can_delete=False,  # Disable deletion since it's required
+        exclude=['resume'],  # Exclude resume field since it's handled by formset
+    )
+    for extra in (0, 1)
+}
+
+EducationFormSet = section_formset(Education, EducationForm, can_delete=True)
+ExperienceFormSet = section_formset(Experience, ExperienceForm, can_delete=True)
+SkillFormSet = section_formset(Skill, SkillForm, extra=3, can_delete=True)
+ProjectFormSet = section_formset(Project, ProjectForm, can_delete=True)
+CertificateFormSet = section_formset(Certificate, CertificateForm, can_delete=True)
+LanguageFormSet = section_formset(Language, LanguageForm, can_delete=True)
+
+SECTION_FORMSETS = {
+    'education': EducationFormSet,
+    'experience': ExperienceFormSet,
+    'skills': SkillFormSet,
+    'projects': ProjectFormSet,
+    'certificates': CertificateFormSet,
+    'languages': LanguageFormSet,
+}
+
+
+def get_formset_class(section, resume):
+    """Formset class for a section of the given resume"""
+    if section == 'personal_info':
+        return PERSONAL_INFO_FORMSETS[0 if hasattr(resume, 'personal_info') else 1]
+    return SECTION_FORMSETS[section]
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from resume_builder.models import Resume, SECTION_FLAGS
+
+class Command(BaseCommand):
+    help = 'Recompute the stored completion flags of every resume'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only report resumes whose stored flags are stale')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        annotations = {
+            f'has_{model._meta.model_name}': Exists(model.objects.filter(resume_id=OuterRef('pk')))
+            for model in SECTION_FLAGS
+        }
+        resumes = Resume.objects.order_by('pk').annotate(**annotations).only('pk', 'completed_sections')
+
+        stale = []
+        checked = 0
+        for resume in resumes.iterator(chunk_size=options['batch_size']):
+            checked += 1
+            flags = 0
+            for model, flag in SECTION_FLAGS.items():
+                if getattr(resume, f'has_{model._meta.model_name}'):
+                    flags |= flag
+            if flags != resume.completed_sections:
+                resume.completed_sections = flags
+                stale.append(resume)
+            if not options['verify'] and len(stale) >= options['batch_size']:
+                self.save(stale)
+                stale = []
+
+        if options['verify']:
+            if stale:
+                raise CommandError(
+                    f'{len(stale)} of {checked} resumes have stale completion flags: '
+                    + ', '.join(str(resume.pk) for resume in stale[:20])
+                )
+            self.stdout.write(self.style.SUCCESS(f'All {checked} resumes have up-to-date completion flags.'))
+            return
+
+        self.save(stale)
+        self.stdout.write(self.style.SUCCESS(f'Completion flags recomputed for {checked} resumes.'))
+
+    def save(self, resumes):
+        with transaction.atomic():
+            Resume.objects.bulk_update(resumes, ['completed_sections'])
@@ -0,0 +1,88 @@
+import statistics
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from resume_builder.models import (
+    Resume, PersonalInfo, Education, Experience,
+    Skill, Project, Certificate, Language
+)
+from resume_builder.pdf_layouts import get_layout
+from resume_builder.utils import generate_pdf
+
+class Command(BaseCommand):
+    help = 'Benchmark PDF render time for every resume template'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=5,
+                            help='Number of entries in every resume section')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Renders per template')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            resume = self.seed(options['entries'])
+            hydrated = Resume.objects.with_sections().get(pk=resume.pk)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{options["entries"]} entries per section, {options["repeat"]} renders per template')
+        self.stdout.write(f'{"template":<14}{"compile ms":>12}{"mean ms":>10}{"p50 ms":>10}{"min ms":>10}{"KB":>8}')
+        for template, _ in Resume.TEMPLATE_CHOICES:
+            started = time.perf_counter()
+            get_layout(template)
+            compile_ms = (time.perf_counter() - started) * 1000
+
+            hydrated.template = template
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                pdf = generate_pdf(hydrated)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'{template:<14}{compile_ms:>12.2f}{statistics.mean(timings):>10.1f}'
+                f'{statistics.median(timings):>10.1f}{min(timings):>10.1f}{len(pdf) / 1024:>8.1f}'
+            )
+
+    def seed(self, size):
+        user = get_user_model().objects.create_user(
+            email='pdf-benchmark@example.com', password='unused', name='Benchmark', mobile='0000000000',
+        )
+        resume = Resume.objects.create(user=user, title='PDF benchmark')
+        PersonalInfo.objects.create(
+            resume=resume, full_name='Benchmark User', email='pdf-benchmark@example.com', phone='0000000000',
+            city='Bangalore', state='Karnataka', country='India', linkedin='https://linkedin.com/in/benchmark',
+            summary='Seasoned engineer with a focus on performance. ' * 4,
+        )
+        start = date(2015, 1, 1)
+        description = 'Led the design and delivery of a high-traffic service. ' * 3
+        Education.objects.bulk_create([
+            Education(resume=resume, institution=f'University {i}', degree='B.Tech', field_of_study='CSE',
+                      start_date=start, end_date=date(2019, 1, 1), gpa='9.1', order=i)
+            for i in range(size)
+        ])
+        Experience.objects.bulk_create([
+            Experience(resume=resume, company=f'Company {i}', position='Senior Engineer', location='Remote',
+                       start_date=start, current=i == 0, description=description, order=i)
+            for i in range(size)
+        ])
+        Skill.objects.bulk_create([
+            Skill(resume=resume, name=f'Skill {i}', level='advanced', order=i) for i in range(size)
+        ])
+        Project.objects.bulk_create([
+            Project(resume=resume, title=f'Project {i}', description=description, url='https://example.com',
+                    start_date=start, end_date=date(2016, 1, 1), order=i)
+            for i in range(size)
+        ])
+        Certificate.objects.bulk_create([
+            Certificate(resume=resume, name=f'Certificate {i}', issuing_organization='Org',
+                        date_obtained=start, order=i)
+            for i in range(size)
+        ])
+        Language.objects.bulk_create([
+            Language(resume=resume, name=f'Language {i}', proficiency='native', order=i)
+            for i in range(size)
+        ])
+        return resume
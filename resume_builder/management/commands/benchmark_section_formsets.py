@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.forms import inlineformset_factory
+
+from resume_builder.formsets import PERSONAL_INFO_FORMSETS, SECTION_FORMSETS
+from resume_builder.models import Resume
+from resume_builder.persistence import SectionFormSet
+
+
+def factory_args(formset_class):
+    """inlineformset_factory() arguments the views used to pass per request"""
+    kwargs = {
+        # The factory subclasses the form it is given
+        'form': formset_class.form.__bases__[0],
+        'formset': SectionFormSet,
+        'extra': formset_class.extra,
+        'can_delete': formset_class.can_delete,
+    }
+    if formset_class.max_num == 1:
+        kwargs.update(max_num=1, exclude=['resume'])
+    return kwargs
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request CPU time saved by building the section formset classes once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        # An unsaved resume gives the formsets an empty queryset, so no query
+        # runs and only the Python work is measured
+        resume = Resume(title='Benchmark')
+        sections = dict(SECTION_FORMSETS, personal_info=PERSONAL_INFO_FORMSETS[1])
+
+        self.stdout.write(f'{iterations} iterations, CPU microseconds per request')
+        self.stdout.write(f'{"section":<16}{"factory":>10}{"registry":>10}{"saved":>10}{"class only":>12}')
+        total_factory = total_registry = 0
+        for section, formset_class in sections.items():
+            kwargs = factory_args(formset_class)
+            model = formset_class.model
+
+            def per_request():
+                FormSet = inlineformset_factory(Resume, model, **kwargs)
+                return FormSet(instance=resume).forms
+
+            def registry():
+                return formset_class(instance=resume).forms
+
+            def class_only():
+                return inlineformset_factory(Resume, model, **kwargs)
+
+            factory_us = self.measure(per_request, iterations)
+            registry_us = self.measure(registry, iterations)
+            class_us = self.measure(class_only, iterations)
+            total_factory += factory_us
+            total_registry += registry_us
+            self.stdout.write(
+                f'{section:<16}{factory_us:>10.1f}{registry_us:>10.1f}'
+                f'{factory_us - registry_us:>10.1f}{class_us:>12.1f}'
+            )
+        self.stdout.write(
+            f'{"all sections":<16}{total_factory:>10.1f}{total_registry:>10.1f}'
+            f'{total_factory - total_registry:>10.1f}'
+        )
+
+    def measure(self, func, iterations):
+        func()
+        started = time.process_time()
+        for _ in range(iterations):
+            func()
+        return (time.process_time() - started) / iterations * 1_000_000
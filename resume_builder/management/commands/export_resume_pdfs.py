@@ -0,0 +1,212 @@
+import multiprocessing
+import os
+import time
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+# Models are imported inside functions: spawned workers import this module
+# before init_worker() has set Django up.
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def init_worker():
+    """Give each worker process its own database connection"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def render_resume(pk):
+    """Render one resume in a worker; returns (pk, pdf bytes), or (pk, None) if it was deleted"""
+    from resume_builder.models import Resume
+    from resume_builder.utils import generate_pdf
+
+    try:
+        resume = Resume.objects.with_sections().get(pk=pk)
+    except Resume.DoesNotExist:
+        return pk, None
+    return pk, generate_pdf(resume)
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size in MB of this process, and of the largest worker
+    that has exited (workers only count once the pool is closed), or None
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    unit = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit,
+    )
+
+
+class DirectoryWriter:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def existing(self):
+        return {entry.name for entry in self.path.glob('*.pdf')}
+
+    def write(self, name, data):
+        tmp = self.path / f'{name}.tmp'
+        tmp.write_bytes(data)
+        os.replace(tmp, self.path / name)
+
+    def close(self):
+        pass
+
+
+class ZipWriter:
+    """
+    Writes numbered archives next to path (export-0001.zip, export-0002.zip,
+    ...) of up to archive_size PDFs each. A zip is only readable once its
+    central directory is written on close, so each archive is written under
+    a .tmp name and renamed when complete: an interrupted export loses only
+    the PDFs of its unfinished archive, and the next run exports them again.
+    """
+
+    def __init__(self, path, archive_size):
+        path = Path(path)
+        self.directory = path.parent
+        self.stem = path.stem
+        self.archive_size = archive_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for partial in self.directory.glob(f'{self.stem}-*.zip.tmp'):
+            partial.unlink()
+        self.archives = sorted(self.directory.glob(f'{self.stem}-[0-9]*.zip'))
+        self.number = max((int(archive.stem.rsplit('-', 1)[1]) for archive in self.archives), default=0)
+        self.zip = None
+        self.count = 0
+
+    def archive_path(self, number):
+        return self.directory / f'{self.stem}-{number:04d}.zip'
+
+    def existing(self):
+        names = set()
+        for archive in self.archives:
+            with zipfile.ZipFile(archive) as finished:
+                names.update(finished.namelist())
+        return names
+
+    def write(self, name, data):
+        if self.zip is None:
+            self.number += 1
+            partial = self.archive_path(self.number).with_suffix('.zip.tmp')
+            self.zip = zipfile.ZipFile(partial, 'w', zipfile.ZIP_DEFLATED)
+        self.zip.writestr(name, data)
+        self.count += 1
+        if self.count >= self.archive_size:
+            self.close()
+
+    def close(self):
+        if self.zip is None:
+            return
+        self.zip.close()
+        os.replace(self.zip.filename, self.archive_path(self.number))
+        self.zip = None
+        self.count = 0
+
+
+class Command(BaseCommand):
+    help = 'Export resumes as PDFs into a directory or zip file using a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Output directory, or a path ending in .zip for numbered zip archives')
+        parser.add_argument('--updated-since', help='Only resumes updated since this ISO date/datetime')
+        parser.add_argument('--updated-within', type=int, metavar='HOURS',
+                            help='Only resumes updated in the last HOURS hours')
+        parser.add_argument('--template', help='Only resumes using this template')
+        parser.add_argument('--user', help='Only resumes owned by this email address')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=8,
+                            help='Resumes handed to a worker at a time')
+        parser.add_argument('--archive-size', type=int, default=500,
+                            help='PDFs per zip archive; an interrupted export redoes at most one archive')
+
+    def handle(self, *args, **options):
+        from resume_builder.models import Resume
+
+        resumes = Resume.objects.order_by('pk')
+        if options['updated_since']:
+            since = parse_datetime(options['updated_since']) or parse_date(options['updated_since'])
+            if since is None:
+                raise CommandError(f'Invalid date: {options["updated_since"]}')
+            resumes = resumes.filter(updated_at__gte=since)
+        if options['updated_within']:
+            resumes = resumes.filter(updated_at__gte=timezone.now() - timedelta(hours=options['updated_within']))
+        if options['template']:
+            resumes = resumes.filter(template=options['template'])
+        if options['user']:
+            resumes = resumes.filter(user__email=options['user'])
+
+        if options['output'].endswith('.zip'):
+            writer = ZipWriter(options['output'], options['archive_size'])
+        else:
+            writer = DirectoryWriter(options['output'])
+        # File names carry the content version, so an interrupted run resumes
+        # where it stopped and edited resumes are exported again
+        done = writer.existing()
+        names = {}
+        skipped = 0
+        for pk, version in resumes.values_list('pk', 'content_version').iterator():
+            name = f'resume_{pk}_v{version}.pdf'
+            if name in done:
+                skipped += 1
+            else:
+                names[pk] = name
+        self.stdout.write(f'Exporting {len(names)} resumes ({skipped} already exported) with {options["workers"]} workers...')
+
+        # Forked workers must not share the parent's connection
+        connections.close_all()
+        exported = 0
+        exported_bytes = 0
+        deleted = 0
+        started = time.perf_counter()
+        try:
+            with multiprocessing.Pool(options['workers'], initializer=init_worker) as pool:
+                for pk, data in pool.imap_unordered(render_resume, names, chunksize=options['chunk_size']):
+                    if data is None:
+                        deleted += 1
+                        self.stdout.write(self.style.WARNING(f'Resume {pk} was deleted during the export; skipped'))
+                        continue
+                    writer.write(names[pk], data)
+                    exported += 1
+                    exported_bytes += len(data)
+                    if exported % 100 == 0:
+                        self.report(exported, exported_bytes, started)
+        finally:
+            writer.close()
+
+        self.report(exported, exported_bytes, started)
+        outcome = f'Exported {exported} resumes to {options["output"]}'
+        if deleted:
+            outcome += f' ({deleted} deleted during the export)'
+        self.stdout.write(self.style.SUCCESS(outcome))
+
+    def report(self, exported, exported_bytes, started):
+        elapsed = time.perf_counter() - started
+        rate = exported / elapsed if elapsed else 0
+        line = f'{exported} PDFs, {exported_bytes / 1024 / 1024:.1f} MB in {elapsed:.1f}s ({rate:.1f} PDFs/sec'
+        rss = peak_rss_mb()
+        if rss is not None:
+            line += f', peak RSS {rss[0]:.0f} MB'
+            if rss[1]:
+                line += f', largest worker {rss[1]:.0f} MB'
+        self.stdout.write(line + ')')
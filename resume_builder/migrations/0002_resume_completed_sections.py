@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 12:44
+
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+# resume_builder.models.SECTION_FLAGS as of this migration, by model name
+SECTION_FLAGS = {
+    'PersonalInfo': 1,
+    'Education': 2,
+    'Experience': 4,
+    'Skill': 8,
+    'Project': 16,
+    'Certificate': 32,
+    'Language': 64,
+}
+
+
+def backfill_completed_sections(apps, schema_editor):
+    """Set the flag of every section a resume already has rows in, one UPDATE per section"""
+    Resume = apps.get_model('resume_builder', 'Resume')
+    for model_name, flag in SECTION_FLAGS.items():
+        model = apps.get_model('resume_builder', model_name)
+        Resume.objects.filter(Exists(model.objects.filter(resume_id=OuterRef('pk')))).update(
+            completed_sections=F('completed_sections').bitor(flag)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_builder', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='completed_sections',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        # Dropped along with the column when reversed
+        migrations.RunPython(backfill_completed_sections, migrations.RunPython.noop),
+    ]
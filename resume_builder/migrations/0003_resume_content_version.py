@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_builder', '0002_resume_completed_sections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 12:44
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_builder', '0004_resume_user_updated_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='personalinfo',
+            name='phone',
+            field=models.CharField(max_length=10, validators=[django.core.validators.RegexValidator('^\\d{10}$', 'Enter a valid 10-digit phone number.')]),
+        ),
+    ]
@@ -5,6 +5,23 @@ from django.contrib.auth.views import LogoutView
 from django.core.validators import RegexValidator
 from django.contrib import messages
 
+class ResumeQuerySet(models.QuerySet):
+    SECTIONS = ('education', 'experience', 'skills', 'projects', 'certificates', 'languages')
+    
+    def with_sections(self):
+        """
+        Load each resume together with its personal info and every section,
+        each section ordered by its model's Meta.ordering. Costs one query for
+        the resumes plus one per section, however many entries they hold.
+        """
+        prefetches = []
+        for name in self.SECTIONS:
+            section_model = Resume._meta.get_field(name).related_model
+            prefetches.append(models.Prefetch(
+                name, queryset=section_model.objects.order_by(*section_model._meta.ordering)
+            ))
+        return self.select_related('user', 'personal_info').prefetch_related(*prefetches)
+
 class Resume(models.Model):
     TEMPLATE_CHOICES = [
         ('classic', 'Classic'),
@@ -19,9 +36,19 @@ class Resume(models.Model):
     template = models.CharField(max_length=50, choices=TEMPLATE_CHOICES, default='classic')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bitmask of the sections that have at least one entry, see SECTION_FLAGS
+    completed_sections = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Bumped on every change to the resume or its sections; keys rendered output
+    content_version = models.PositiveIntegerField(default=1, editable=False)
+    
+    objects = ResumeQuerySet.as_manager()
     
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            # The dashboard lists a user's resumes, most recently updated first
+            models.Index(fields=['user', 'updated_at'], name='resume_user_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.user.email})"
@@ -31,36 +58,8 @@ class Resume(models.Model):
     
     def get_completion_percentage(self):
         """Calculate how complete the resume is based on filled sections"""
-        score = 0
         total = 6  # Total number of main sections
-        
-        # Check if personal info is filled
-        try:
-            if self.personal_info:
-                score += 1
-        except:
-            pass
-        
-        # Check if education info is filled
-        if self.education.exists():
-            score += 1
-        
-        # Check if experience info is filled
-        if self.experience.exists():
-            score += 1
-        
-        # Check if skills are filled
-        if self.skills.exists():
-            score += 1
-        
-        # Check if projects are filled
-        if self.projects.exists():
-            score += 1
-        
-        # Check if languages or certificates are filled
-        if self.languages.exists() or self.certificates.exists():
-            score += 1
-        
+        score = sum(1 for flag in COMPLETION_GROUPS if self.completed_sections & flag)
         return int((score / total) * 100)
 
 class PersonalInfo(models.Model):
@@ -189,4 +188,16 @@ class Language(models.Model):
     
     def __str__(self):
         return self.name
-    
+
+# Completion flag per section model. Languages and certificates share one
+# completion group, so either of them counts towards the same sixth.
+SECTION_FLAGS = {
+    PersonalInfo: 1,
+    Education: 2,
+    Experience: 4,
+    Skill: 8,
+    Project: 16,
+    Certificate: 32,
+    Language: 64,
+}
+COMPLETION_GROUPS = (1, 2, 4, 8, 16, 32 | 64)
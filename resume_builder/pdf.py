@@ -0,0 +1,111 @@
+"""
+Asynchronous, disk-cached PDF rendering for resumes.
+
+Rendering runs on a bounded thread pool so a burst of downloads cannot tie
+up every request worker. Finished PDFs are stored under
+``RESUME_PDF_CACHE_DIR`` keyed on the resume's content version, and
+concurrent requests for the same version wait on a single render. A
+render removes the older versions of its resume, so readers open the file
+before anything else can replace it.
+"""
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+from .cache import preview_version
+from .models import Resume
+from .utils import generate_pdf
+
+# Seconds a client is told to wait before retrying a render that timed out
+RETRY_AFTER = 10
+# Renders a request starts before giving up on a resume that keeps changing
+OPEN_ATTEMPTS = 3
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=getattr(settings, 'RESUME_PDF_WORKERS', 2),
+        thread_name_prefix='resume-pdf',
+    )
+
+
+def get_cache_dir():
+    return Path(getattr(settings, 'RESUME_PDF_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'resume_pdfs'))
+
+
+def pdf_cache_path(resume):
+    return get_cache_dir() / f'{preview_version(resume)}.pdf'
+
+
+def render_to_cache(resume, path):
+    """Render resume into path atomically and drop older versions of it"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.pdf.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            generate_pdf(resume, output)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    for stale in path.parent.glob(f'{resume.pk}-*.pdf'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path
+
+
+def open_resume_pdf(resume):
+    """
+    Open the cached PDF for resume, rendering it if needed. Only the
+    version fields of resume are used; sections are loaded for the render
+    itself. The file is opened here because a render of a newer version
+    removes it; an open handle stays readable after that.
+
+    Raises concurrent.futures.TimeoutError if the render takes longer than
+    RESUME_PDF_TIMEOUT; it carries on, so a later request finds it ready.
+    """
+    try:
+        return open(pdf_cache_path(resume), 'rb')
+    except FileNotFoundError:
+        pass
+    for _ in range(OPEN_ATTEMPTS):
+        path = _render(resume)
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            # Replaced by a newer version before it could be opened; the next
+            # render loads that version
+            continue
+    raise FileNotFoundError(f'Resume {resume.pk} kept changing while its PDF was rendered')
+
+
+def _render(resume):
+    """Path of the current version of resume's PDF, once it is rendered"""
+    with _inflight_lock:
+        future = _inflight.get(pdf_cache_path(resume))
+    if future is None:
+        hydrated = Resume.objects.with_sections().get(pk=resume.pk)
+        path = pdf_cache_path(hydrated)
+        if path.exists():
+            return path
+        with _inflight_lock:
+            future = _inflight.get(path)
+            if future is None:
+                future = get_executor().submit(render_to_cache, hydrated, path)
+                _inflight[path] = future
+                future.add_done_callback(lambda done, key=path: _discard(key))
+    return future.result(timeout=getattr(settings, 'RESUME_PDF_TIMEOUT', 60))
+
+
+def _discard(path):
+    with _inflight_lock:
+        _inflight.pop(path, None)
@@ -0,0 +1,359 @@
+"""
+ReportLab layouts for the five resume templates.
+
+Each template's design (fonts, colours, column structure, section titles
+and order) is described by one ``Layout``. A layout compiles its paragraph
+styles, frame geometry and per-section flowable factories once per process;
+rendering a resume is then a single pass over its prefetched sections.
+"""
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    BaseDocTemplate, Frame, FrameBreak, HRFlowable, KeepTogether,
+    NextPageTemplate, PageTemplate, Paragraph, Spacer, Table, TableStyle,
+)
+
+SECTION_KEYS = ('summary', 'experience', 'education', 'skills', 'projects', 'certificates', 'languages', 'additional')
+
+
+def month_year(value):
+    return value.strftime('%b %Y') if value else ''
+
+
+def date_range(start, end, current=False):
+    if not start:
+        return ''
+    return f"{month_year(start)} - {'Present' if current or not end else month_year(end)}"
+
+
+def strip_scheme(url):
+    return url.replace('https://', '').replace('http://', '')
+
+
+class Layout:
+    """
+    Compiled design of one resume template.
+
+    ``sections`` and ``sidebar_sections`` are ``(key, title)`` pairs in the
+    order they appear. Layouts without a sidebar render in a single column
+    with the header on top; with a sidebar the header and sidebar sections
+    fill a coloured left column on the first page.
+    """
+    page_size = letter
+    margin = 0.6 * inch
+
+    def __init__(self, name, font, bold_font, text_color, muted_color, accent_color, sections,
+                 sidebar_sections=(), sidebar_ratio=0, sidebar_fill=None, uppercase_titles=True,
+                 title_rule_color=None, header_align=TA_CENTER, base_size=10):
+        self.name = name
+        self.font = font
+        self.bold_font = bold_font
+        self.text_color = colors.HexColor(text_color)
+        self.muted_color = colors.HexColor(muted_color)
+        self.accent_color = colors.HexColor(accent_color)
+        self.sections = tuple(sections)
+        self.sidebar_sections = tuple(sidebar_sections)
+        self.sidebar_ratio = sidebar_ratio
+        # A single colour, or a (top, bottom) pair drawn as a vertical gradient
+        self.sidebar_fill = [colors.HexColor(c) for c in sidebar_fill] if sidebar_fill else None
+        self.uppercase_titles = uppercase_titles
+        self.title_rule_color = colors.HexColor(title_rule_color) if title_rule_color else None
+        self.header_align = header_align
+        self.base_size = base_size
+
+        self.styles = self._build_styles()
+        self.frames_first, self.frames_later = self._build_geometry()
+        self.factories = {key: getattr(self, f'_section_{key}') for key in SECTION_KEYS}
+
+    # Compilation
+
+    def _build_styles(self):
+        size = self.base_size
+        body = ParagraphStyle(
+            'body', fontName=self.font, fontSize=size, leading=size * 1.35, textColor=self.text_color,
+        )
+        styles = {
+            'body': body,
+            'name': ParagraphStyle('name', body, fontName=self.bold_font, fontSize=size * 2.2,
+                                   leading=size * 2.6, alignment=self.header_align, textColor=self.accent_color),
+            'position': ParagraphStyle('position', body, fontSize=size * 1.2, leading=size * 1.6,
+                                       alignment=self.header_align, textColor=self.muted_color),
+            'contact': ParagraphStyle('contact', body, fontSize=size * 0.9, alignment=self.header_align,
+                                      textColor=self.muted_color, spaceAfter=size),
+            'title': ParagraphStyle('title', body, fontName=self.bold_font, fontSize=size * 1.25,
+                                    leading=size * 1.6, textColor=self.accent_color, spaceBefore=size,
+                                    spaceAfter=2),
+            'item_title': ParagraphStyle('item_title', body, fontName=self.bold_font),
+            'item_meta': ParagraphStyle('item_meta', body, textColor=self.muted_color, fontSize=size * 0.9),
+            'item_date': ParagraphStyle('item_date', body, textColor=self.muted_color, fontSize=size * 0.9,
+                                        alignment=TA_RIGHT),
+        }
+        white = colors.white
+        styles.update({
+            'side_name': ParagraphStyle('side_name', styles['name'], textColor=white, alignment=TA_LEFT,
+                                        fontSize=size * 1.8, leading=size * 2.2),
+            'side_position': ParagraphStyle('side_position', styles['position'], textColor=white,
+                                            alignment=TA_LEFT, spaceAfter=size),
+            'side_title': ParagraphStyle('side_title', styles['title'], textColor=white),
+            'side_body': ParagraphStyle('side_body', body, textColor=white, fontSize=size * 0.9),
+        })
+        return styles
+
+    def _build_geometry(self):
+        """Frame rectangles for the first and the following pages"""
+        width, height = self.page_size
+        full = [(self.margin, self.margin, width - 2 * self.margin, height - 2 * self.margin, 'main')]
+        if not self.sidebar_sections:
+            return full, full
+        sidebar_width = width * self.sidebar_ratio
+        return [
+            (self.margin * 0.6, self.margin, sidebar_width - self.margin * 1.2, height - 2 * self.margin, 'sidebar'),
+            (sidebar_width + self.margin * 0.6, self.margin, width - sidebar_width - self.margin * 1.2,
+             height - 2 * self.margin, 'main'),
+        ], full
+
+    # Rendering
+
+    def page_templates(self):
+        """Frames hold layout state while a document builds, so each render gets its own"""
+        first = [Frame(x, y, w, h, id=frame_id) for x, y, w, h, frame_id in self.frames_first]
+        later = [Frame(x, y, w, h, id=frame_id) for x, y, w, h, frame_id in self.frames_later]
+        return [
+            PageTemplate(id='first', frames=first, onPage=self._draw_sidebar),
+            PageTemplate(id='later', frames=later),
+        ]
+
+    def _draw_sidebar(self, canvas, doc):
+        if not self.sidebar_sections:
+            return
+        width, height = self.page_size
+        sidebar_width = width * self.sidebar_ratio
+        canvas.saveState()
+        if len(self.sidebar_fill) > 1:
+            path = canvas.beginPath()
+            path.rect(0, 0, sidebar_width, height)
+            canvas.clipPath(path, stroke=0, fill=0)
+            canvas.linearGradient(0, height, 0, 0, self.sidebar_fill, extend=False)
+        else:
+            canvas.setFillColor(self.sidebar_fill[0])
+            canvas.rect(0, 0, sidebar_width, height, stroke=0, fill=1)
+        canvas.restoreState()
+
+    def build_story(self, resume):
+        sidebar = bool(self.sidebar_sections)
+        story = [NextPageTemplate('later')]
+        story += self._header(resume, sidebar)
+        for key, title in self.sidebar_sections:
+            story += self.factories[key](resume, title, True)
+        if sidebar:
+            story.append(FrameBreak())
+        for key, title in self.sections:
+            story += self.factories[key](resume, title, False)
+        return story
+
+    def render(self, resume, output):
+        doc = BaseDocTemplate(
+            output, pagesize=self.page_size, pageTemplates=self.page_templates(),
+            leftMargin=self.margin, rightMargin=self.margin, topMargin=self.margin, bottomMargin=self.margin,
+            title=resume.title,
+        )
+        doc.build(self.build_story(resume))
+
+    # Flowable factories
+
+    def _p(self, text, style):
+        return Paragraph(escape(str(text)).replace('\n', '<br/>'), self.styles[style])
+
+    def _title(self, title, sidebar):
+        text = title.upper() if self.uppercase_titles else title
+        flowables = [self._p(text, 'side_title' if sidebar else 'title')]
+        rule_color = colors.white if sidebar else self.title_rule_color
+        if rule_color is not None:
+            flowables.append(HRFlowable(width='100%', thickness=0.75, color=rule_color, spaceAfter=4))
+        return flowables
+
+    def _item(self, title, subtitle, dates, details=()):
+        header = [[
+            [self._p(title, 'item_title')] + ([self._p(subtitle, 'item_meta')] if subtitle else []),
+            self._p(dates, 'item_date') if dates else '',
+        ]]
+        table = Table(header, colWidths=['75%', '25%'])
+        table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ]))
+        return [KeepTogether([table] + [self._p(detail, 'body') for detail in details if detail] + [Spacer(1, 6)])]
+
+    def _header(self, resume, sidebar):
+        info = getattr(resume, 'personal_info', None)
+        experience = resume.experience.all()
+        flowables = []
+        if info is not None:
+            flowables.append(self._p(info.full_name, 'side_name' if sidebar else 'name'))
+        if experience:
+            flowables.append(self._p(experience[0].position, 'side_position' if sidebar else 'position'))
+        if info is None:
+            return flowables
+        location = ', '.join(part for part in (info.city, info.state, info.country) if part)
+        contact = [info.email, info.phone, location] + [
+            strip_scheme(url) for url in (info.linkedin, info.github, info.website) if url
+        ]
+        contact = [item for item in contact if item]
+        if sidebar:
+            flowables += self._title('Contact', True)
+            flowables += [self._p(item, 'side_body') for item in contact]
+        elif contact:
+            flowables.append(self._p('  |  '.join(contact), 'contact'))
+        return flowables
+
+    def _section_summary(self, resume, title, sidebar):
+        info = getattr(resume, 'personal_info', None)
+        if info is None or not info.summary:
+            return []
+        return self._title(title, sidebar) + [self._p(info.summary, 'side_body' if sidebar else 'body')]
+
+    def _section_experience(self, resume, title, sidebar):
+        items = resume.experience.all()
+        if not items:
+            return []
+        flowables = self._title(title, sidebar)
+        for exp in items:
+            subtitle = exp.company + (f', {exp.location}' if exp.location else '')
+            flowables += self._item(exp.position, subtitle, date_range(exp.start_date, exp.end_date, exp.current),
+                                    [exp.description])
+        return flowables
+
+    def _section_education(self, resume, title, sidebar):
+        items = resume.education.all()
+        if not items:
+            return []
+        flowables = self._title(title, sidebar)
+        for edu in items:
+            degree = edu.degree + (f' in {edu.field_of_study}' if edu.field_of_study else '')
+            subtitle = edu.institution + (f', {edu.location}' if edu.location else '')
+            flowables += self._item(degree, subtitle, date_range(edu.start_date, edu.end_date, edu.current),
+                                    [f'GPA: {edu.gpa}' if edu.gpa else '', edu.description])
+        return flowables
+
+    def _section_skills(self, resume, title, sidebar):
+        items = resume.skills.all()
+        if not items:
+            return []
+        names = [skill.name + (f' ({skill.get_level_display()})' if skill.level else '') for skill in items]
+        if sidebar:
+            return self._title(title, True) + [self._p(name, 'side_body') for name in names]
+        return self._title(title, False) + [self._p(', '.join(names), 'body')]
+
+    def _section_projects(self, resume, title, sidebar):
+        items = resume.projects.all()
+        if not items:
+            return []
+        flowables = self._title(title, sidebar)
+        for project in items:
+            dates = ' - '.join(str(d.year) for d in (project.start_date, project.end_date) if d)
+            flowables += self._item(project.title, strip_scheme(project.url) if project.url else '', dates,
+                                    [project.description])
+        return flowables
+
+    def _certificate_lines(self, resume):
+        return [
+            f'{cert.name} - {cert.issuing_organization} ({month_year(cert.date_obtained)})'
+            for cert in resume.certificates.all()
+        ]
+
+    def _language_lines(self, resume):
+        return [f'{language.name} ({language.get_proficiency_display()})' for language in resume.languages.all()]
+
+    def _section_certificates(self, resume, title, sidebar):
+        lines = self._certificate_lines(resume)
+        if not lines:
+            return []
+        return self._title(title, sidebar) + [self._p(line, 'side_body' if sidebar else 'body') for line in lines]
+
+    def _section_languages(self, resume, title, sidebar):
+        lines = self._language_lines(resume)
+        if not lines:
+            return []
+        if sidebar:
+            return self._title(title, True) + [self._p(line, 'side_body') for line in lines]
+        return self._title(title, False) + [self._p(', '.join(lines), 'body')]
+
+    def _section_additional(self, resume, title, sidebar):
+        """Certificates and languages combined, as in the minimalist template"""
+        certificates = self._certificate_lines(resume)
+        languages = self._language_lines(resume)
+        if not certificates and not languages:
+            return []
+        style = 'side_body' if sidebar else 'body'
+        flowables = self._title(title, sidebar)
+        if certificates:
+            flowables.append(self._p('Certifications: ' + ' • '.join(certificates), style))
+        if languages:
+            flowables.append(self._p('Languages: ' + ' • '.join(languages), style))
+        return flowables
+
+
+LAYOUTS = {
+    'classic': dict(
+        font='Times-Roman', bold_font='Times-Bold',
+        text_color='#333333', muted_color='#555555', accent_color='#333333', title_rule_color='#333333',
+        sections=[
+            ('summary', 'Professional Summary'), ('experience', 'Professional Experience'),
+            ('education', 'Education'), ('skills', 'Skills'), ('projects', 'Projects'),
+            ('certificates', 'Certifications'), ('languages', 'Languages'),
+        ],
+    ),
+    'professional': dict(
+        font='Times-Roman', bold_font='Times-Bold',
+        text_color='#222222', muted_color='#555555', accent_color='#1a5276', title_rule_color='#1a5276',
+        uppercase_titles=False,
+        sections=[
+            ('summary', 'Professional Summary'), ('experience', 'Professional Experience'),
+            ('education', 'Education'), ('skills', 'Skills & Expertise'), ('projects', 'Projects'),
+            ('certificates', 'Certifications'), ('languages', 'Languages'),
+        ],
+    ),
+    'minimalist': dict(
+        font='Helvetica', bold_font='Helvetica-Bold', base_size=9.5,
+        text_color='#333333', muted_color='#666666', accent_color='#333333', title_rule_color='#dddddd',
+        sections=[
+            ('summary', 'Summary'), ('experience', 'Experience'), ('education', 'Education'),
+            ('skills', 'Skills'), ('projects', 'Projects'), ('additional', 'Additional Information'),
+        ],
+    ),
+    'modern': dict(
+        font='Helvetica', bold_font='Helvetica-Bold',
+        text_color='#333333', muted_color='#7f8c8d', accent_color='#2c3e50', title_rule_color='#3498db',
+        sidebar_ratio=0.3, sidebar_fill=['#34495e'], header_align=TA_LEFT,
+        sidebar_sections=[('skills', 'Skills'), ('languages', 'Languages'), ('certificates', 'Certifications')],
+        sections=[
+            ('summary', 'Professional Summary'), ('experience', 'Work Experience'),
+            ('education', 'Education'), ('projects', 'Projects'),
+        ],
+    ),
+    'creative': dict(
+        font='Helvetica', bold_font='Helvetica-Bold',
+        text_color='#444444', muted_color='#777777', accent_color='#5d4157', title_rule_color='#5d4157',
+        sidebar_ratio=0.35, sidebar_fill=['#5d4157', '#a8caba'], header_align=TA_LEFT,
+        sidebar_sections=[('skills', 'Skills'), ('languages', 'Languages'), ('certificates', 'Certifications')],
+        sections=[
+            ('summary', 'About Me'), ('experience', 'Experience'),
+            ('education', 'Education'), ('projects', 'Projects'),
+        ],
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def get_layout(name):
+    """Return the compiled layout for a template name, defaulting to classic"""
+    return Layout(name, **LAYOUTS.get(name, LAYOUTS['classic']))
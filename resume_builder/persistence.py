@@ -0,0 +1,132 @@
+"""
+Batched persistence for the resume section formsets.
+
+Django's ``formset.save()`` writes one INSERT, UPDATE or DELETE per form and
+lets the section signals touch the resume after every row. Formsets built on
+``SectionFormSet`` diff the submitted forms against the existing rows
+instead, apply the changes with one bulk query per kind inside a single
+transaction, and then update the resume's timestamp, version and completion
+flags once.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.forms import BaseInlineFormSet, ModelChoiceField
+from django.utils import timezone
+
+from .models import Resume, SECTION_FLAGS
+from .signals import batched_section_writes, resume_content_changed
+
+
+def diff_formset(formset):
+    """Split a validated inline formset into rows to create, update and delete"""
+    deleted = {id(form) for form in formset.deleted_forms}
+    to_create, to_update, to_delete = [], [], []
+    for form in formset.initial_forms:
+        if id(form) in deleted:
+            to_delete.append(form.instance.pk)
+        elif form.has_changed():
+            to_update.append(form.save(commit=False))
+    for form in formset.extra_forms:
+        if form.has_changed() and id(form) not in deleted:
+            to_create.append(form.save(commit=False))
+    return to_create, to_update, to_delete
+
+
+def section_fields(model, form_class):
+    """Concrete model fields edited through a section form"""
+    return [
+        field.name for field in model._meta.concrete_fields
+        if field.name in form_class.base_fields and not field.primary_key
+    ]
+
+
+def write_section_rows(model, resume, to_create, to_update, to_delete, fields):
+    """Apply one section's changes with one bulk query per kind"""
+    if to_delete:
+        model.objects.filter(resume=resume, pk__in=to_delete).delete()
+    if to_update:
+        model.objects.bulk_update(to_update, fields)
+    if to_create:
+        for obj in to_create:
+            obj.resume = resume
+        model.objects.bulk_create(to_create)
+
+
+def touch_resume(resume_pk, filled=0, emptied=0, **fields):
+    """
+    Bump the resume's timestamp and content version and set or clear the
+    completion flags of the sections written, in one UPDATE
+    """
+    completed = F('completed_sections')
+    if filled:
+        completed = completed.bitor(filled)
+    if emptied:
+        completed = completed.bitand(~emptied & 0x7fff)
+    Resume.objects.filter(pk=resume_pk).update(
+        updated_at=timezone.now(),
+        content_version=F('content_version') + 1,
+        completed_sections=completed,
+        **fields,
+    )
+    resume_content_changed.send(sender=Resume, resume_id=resume_pk)
+
+
+def save_section_formset(formset):
+    """
+    Persist a validated inline formset for one resume section. Returns the
+    list of created and updated rows, like formset.save().
+    """
+    model = formset.model
+    resume = formset.instance
+    to_create, to_update, to_delete = diff_formset(formset)
+
+    with transaction.atomic(), batched_section_writes():
+        write_section_rows(model, resume, to_create, to_update, to_delete, section_fields(model, formset.form))
+        if to_create or to_update or to_delete:
+            remaining = len(formset.initial_forms) - len(to_delete) + len(to_create)
+            flag = SECTION_FLAGS[model]
+            if remaining:
+                touch_resume(resume.pk, filled=flag)
+            else:
+                touch_resume(resume.pk, emptied=flag)
+    return to_create + to_update
+
+
+class ExistingRowField(ModelChoiceField):
+    """
+    Hidden primary key field resolved against the rows the formset already
+    loaded, instead of one SELECT per submitted form.
+    """
+
+    def __init__(self, rows, *args, **kwargs):
+        self.rows = rows
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.rows[str(value)]
+        except KeyError:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class SectionFormSet(BaseInlineFormSet):
+    """Inline formset for a resume section that saves with bulk queries"""
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        pk_name = self.model._meta.pk.name
+        field = form.fields.get(pk_name)
+        if isinstance(field, ModelChoiceField):
+            if not hasattr(self, '_rows'):
+                self._rows = {str(obj.pk): obj for obj in self.get_queryset()}
+            form.fields[pk_name] = ExistingRowField(
+                self._rows, field.queryset, initial=field.initial, required=False, widget=field.widget,
+            )
+
+    def save(self, commit=True):
+        if not commit:
+            return super().save(commit=False)
+        return save_section_formset(self)
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import Resume, SECTION_FLAGS
+
+# Sent with resume_id after any of a resume's section rows were written,
+# whether row by row or a whole section at once
+resume_content_changed = Signal()
+
+# Set while resume_builder.persistence writes a whole section at once; it
+# then updates the resume's flags and version itself with a single query
+_batched = ContextVar('resume_section_batch', default=False)
+
+
+@contextmanager
+def batched_section_writes():
+    token = _batched.set(True)
+    try:
+        yield
+    finally:
+        _batched.reset(token)
+
+
+@receiver(pre_save, sender=Resume)
+def bump_resume_version(sender, instance, raw, **kwargs):
+    """Any edit to an existing resume invalidates its rendered output"""
+    if not raw and not instance._state.adding:
+        instance.content_version += 1
+
+
+def section_saved(sender, instance, **kwargs):
+    """A saved section row means its section is filled; set the flag in place"""
+    if _batched.get():
+        return
+    Resume.objects.filter(pk=instance.resume_id).update(
+        completed_sections=F('completed_sections').bitor(SECTION_FLAGS[sender]),
+        content_version=F('content_version') + 1,
+    )
+    resume_content_changed.send(sender=Resume, resume_id=instance.resume_id)
+
+
+def section_deleted(sender, instance, **kwargs):
+    """Clear the section's flag once its last row is gone"""
+    if _batched.get():
+        return
+    updates = {'content_version': F('content_version') + 1}
+    if not sender.objects.filter(resume_id=instance.resume_id).exists():
+        updates['completed_sections'] = F('completed_sections').bitand(~SECTION_FLAGS[sender] & 0x7fff)
+    Resume.objects.filter(pk=instance.resume_id).update(**updates)
+    resume_content_changed.send(sender=Resume, resume_id=instance.resume_id)
+
+
+for section_model in SECTION_FLAGS:
+    post_save.connect(section_saved, sender=section_model, dispatch_uid=f'section_saved_{section_model.__name__}')
+    post_delete.connect(section_deleted, sender=section_model, dispatch_uid=f'section_deleted_{section_model.__name__}')
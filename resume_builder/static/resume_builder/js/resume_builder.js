@@ -10,6 +10,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeCurrentCheckboxes();
     initializeResumePreview();
     initializeFormValidation();
+    initializeDocumentAutosave();
 });
 
 /**
@@ -220,6 +221,152 @@ function initializeResumePreview() {
     }
 }
 
+/**
+ * Build a resume document from form fields. Plain fields (title, template)
+ * become top-level keys; formset fields named prefix-index-field become rows
+ * of the section named by the prefix, with personal_info as a single object.
+ */
+function collectResumeDocument(form) {
+    const doc = {};
+    const rows = {};
+
+    Array.from(form.elements).forEach(el => {
+        if (!el.name || el.name === 'csrfmiddlewaretoken' || el.name.includes('__prefix__')) {
+            return;
+        }
+        if (el.type === 'radio' && !el.checked) {
+            return;
+        }
+        const value = el.type === 'checkbox' ? el.checked : el.value;
+        const match = el.name.match(/^(.+)-(\d+)-(.+)$/);
+        if (!match) {
+            if (!el.name.includes('-')) {
+                doc[el.name] = value;
+            }
+            return;
+        }
+        const [, prefix, index, field] = match;
+        rows[prefix] = rows[prefix] || {};
+        rows[prefix][index] = rows[prefix][index] || {};
+        rows[prefix][index][field] = value;
+    });
+
+    Object.entries(rows).forEach(([prefix, forms]) => {
+        const items = Object.keys(forms).sort((a, b) => a - b).map(index => forms[index])
+            .filter(row => !row.DELETE)
+            .map(row => {
+                delete row.DELETE;
+                if (row.id) {
+                    row.id = parseInt(row.id, 10);
+                } else {
+                    delete row.id;
+                }
+                return row;
+            });
+        doc[prefix] = prefix === 'personal_info' ? (items[0] || null) : items;
+    });
+    return doc;
+}
+
+/**
+ * Save a (partial) resume document in one request
+ */
+function saveResumeDocument(url, doc, csrfToken) {
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': csrfToken,
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        body: JSON.stringify(doc)
+    }).then(response => response.json().then(data => ({status: response.status, data: data})));
+}
+
+/**
+ * Autosave forms marked with data-autosave-url through the resume document API
+ */
+function initializeDocumentAutosave() {
+    document.querySelectorAll('form[data-autosave-url]').forEach(form => {
+        // The script is included twice on some pages
+        if (form.dataset.autosaveBound) {
+            return;
+        }
+        form.dataset.autosaveBound = 'true';
+
+        const status = form.querySelector('.autosave-status');
+        const csrfInput = form.querySelector('input[name="csrfmiddlewaretoken"]');
+        const setStatus = text => {
+            if (status) {
+                status.textContent = text;
+            }
+        };
+        let timer = null;
+        let saving = Promise.resolve();
+
+        const save = () => {
+            const doc = collectResumeDocument(form);
+            doc.content_version = parseInt(form.dataset.contentVersion, 10);
+            setStatus('Saving...');
+            return saveResumeDocument(form.dataset.autosaveUrl, doc, csrfInput ? csrfInput.value : '')
+                .then(({status: code, data}) => {
+                    if (code === 200) {
+                        form.dataset.contentVersion = data.content_version;
+                        fillCreatedIds(form, data.ids || {});
+                        setStatus('All changes saved');
+                    } else if (code === 409) {
+                        setStatus('This resume was changed elsewhere. Reload to continue editing.');
+                    } else if (code === 400) {
+                        // Stay in sync so a later, valid edit is not rejected as stale
+                        form.dataset.contentVersion = data.content_version;
+                        setStatus('Not saved: please correct the highlighted fields.');
+                    } else {
+                        setStatus('Autosave failed.');
+                    }
+                })
+                .catch(() => setStatus('Autosave failed.'));
+        };
+
+        const schedule = () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => {
+                saving = saving.then(save);
+            }, 1500);
+        };
+        form.addEventListener('input', schedule);
+        form.addEventListener('change', schedule);
+        form.addEventListener('submit', () => clearTimeout(timer));
+    });
+}
+
+/**
+ * Write the primary keys of rows the autosave created back into the formset,
+ * so the regular form submit updates them instead of adding them again
+ */
+function fillCreatedIds(form, ids) {
+    Object.entries(ids).forEach(([prefix, value]) => {
+        const pks = Array.isArray(value) ? value : [value];
+        // Deleted rows are left out of the document, so skip them here too
+        const idInputs = Array.from(form.querySelectorAll(`input[name^="${prefix}-"][name$="-id"]`))
+            .filter(input => {
+                if (input.name.includes('__prefix__')) {
+                    return false;
+                }
+                const deleteBox = form.querySelector(`input[name="${input.name.replace(/-id$/, '-DELETE')}"]`);
+                return !(deleteBox && deleteBox.checked);
+            });
+        pks.forEach((pk, position) => {
+            if (idInputs[position] && !idInputs[position].value) {
+                idInputs[position].value = pk;
+            }
+        });
+        const initialForms = form.querySelector(`input[name="${prefix}-INITIAL_FORMS"]`);
+        if (initialForms) {
+            initialForms.value = Math.max(parseInt(initialForms.value, 10), pks.length);
+        }
+    });
+}
+
 /**
  * Form validation for required fields (can be expanded as needed)
  */
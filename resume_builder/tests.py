@@ -0,0 +1,172 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import (
+    Resume, PersonalInfo, Education, Experience,
+    Skill, Project, Certificate, Language
+)
+from .views import SECTION_STEPS
+
+# Session + user lookups and the resume's version, plus on a cache miss the
+# resume with its personal info and one query per section
+QUERY_BUDGETS = {
+    'cold': 10,
+    'warm': 3,
+}
+# Entries per section each preview's query count is checked at
+SIZES = (1, 10)
+
+
+def create_user(email='owner@example.com'):
+    return get_user_model().objects.create_user(email=email, password='unused', name='Owner', mobile='0000000000')
+
+
+def seed_resume(user, size):
+    """A resume with personal info and size entries in every section"""
+    resume = Resume.objects.create(user=user, title='Seeded resume', template='classic')
+    PersonalInfo.objects.create(
+        resume=resume, full_name='Seeded Owner', email=user.email, phone='0000000000',
+        address='1 Main Street', city='Bangalore', state='Karnataka', summary='Seeded summary',
+    )
+    start = date(2020, 1, 1)
+    Education.objects.bulk_create([
+        Education(resume=resume, institution=f'University {i}', degree='B.Tech', start_date=start, order=i)
+        for i in range(size)
+    ])
+    Experience.objects.bulk_create([
+        Experience(resume=resume, company=f'Company {i}', position='Engineer', start_date=start,
+                   description='Seeded experience', order=i)
+        for i in range(size)
+    ])
+    Skill.objects.bulk_create([
+        Skill(resume=resume, name=f'Skill {i}', level='advanced', order=i) for i in range(size)
+    ])
+    Project.objects.bulk_create([
+        Project(resume=resume, title=f'Project {i}', description='Seeded project', order=i)
+        for i in range(size)
+    ])
+    Certificate.objects.bulk_create([
+        Certificate(resume=resume, name=f'Certificate {i}', issuing_organization='Org',
+                    date_obtained=start, order=i)
+        for i in range(size)
+    ])
+    Language.objects.bulk_create([
+        Language(resume=resume, name=f'Language {i}', proficiency='native', order=i)
+        for i in range(size)
+    ])
+    return resume
+
+
+class PreviewTests(TestCase):
+    def setUp(self):
+        # Previews rendered by an earlier test are cached under reused keys
+        caches[settings.RESUME_PREVIEW_CACHE].clear()
+        self.user = create_user()
+        self.client.force_login(self.user)
+
+    def count_queries(self, resume, params):
+        """Queries of a preview on a cache miss and then on a hit"""
+        # A new version makes the next render a cache miss
+        Resume.objects.filter(pk=resume.pk).update(content_version=F('content_version') + 1)
+        url = reverse('resume_builder:preview_resume', kwargs={'pk': resume.pk})
+        counts = {}
+        for state in ('cold', 'warm'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            counts[state] = len(queries)
+        return counts
+
+    def test_query_counts(self):
+        resumes = {size: seed_resume(self.user, size) for size in SIZES}
+        for template, _ in Resume.TEMPLATE_CHOICES:
+            Resume.objects.update(template=template)
+            for label, params in (('html', {'format': 'html'}), ('page', {})):
+                with self.subTest(template=template, view=label):
+                    counts = [self.count_queries(resume, params) for resume in resumes.values()]
+                    self.assertEqual(counts[0], counts[-1])
+                    for state, budget in QUERY_BUDGETS.items():
+                        self.assertLessEqual(counts[0][state], budget, state)
+
+    def test_revalidation(self):
+        resume = seed_resume(self.user, 1)
+        url = reverse('resume_builder:preview_resume', kwargs={'pk': resume.pk})
+        etag = self.client.get(url, {'format': 'html'})['ETag']
+        for if_none_match in (etag, 'W/' + etag):
+            with self.subTest(if_none_match):
+                response = self.client.get(url, {'format': 'html'}, HTTP_IF_NONE_MATCH=if_none_match)
+                self.assertEqual(response.status_code, 304)
+        Resume.objects.filter(pk=resume.pk).update(content_version=F('content_version') + 1)
+        response = self.client.get(url, {'format': 'html'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_users_resume(self):
+        resume = seed_resume(create_user('other@example.com'), 1)
+        response = self.client.get(reverse('resume_builder:preview_resume', kwargs={'pk': resume.pk}))
+        self.assertEqual(response.status_code, 403)
+
+
+class SectionWizardTests(TestCase):
+    def setUp(self):
+        self.user = create_user()
+        self.client.force_login(self.user)
+        self.resume = seed_resume(self.user, 2)
+
+    def test_every_step(self):
+        for step in SECTION_STEPS:
+            with self.subTest(step['section']):
+                response = self.client.get(
+                    reverse(f'resume_builder:edit_{step["section"]}', kwargs={'pk': self.resume.pk})
+                )
+                self.assertContains(response, step['section_title'])
+                self.assertEqual(response.context['active_step'], step['section'])
+
+    def test_other_users_resume(self):
+        resume = seed_resume(create_user('other@example.com'), 1)
+        response = self.client.get(reverse('resume_builder:edit_skills', kwargs={'pk': resume.pk}))
+        self.assertEqual(response.status_code, 403)
+
+    def post_skills(self):
+        skills = list(self.resume.skills.order_by('order'))
+        data = {
+            'skills-TOTAL_FORMS': '3',
+            'skills-INITIAL_FORMS': '2',
+            'skills-MIN_NUM_FORMS': '0',
+            'skills-MAX_NUM_FORMS': '1000',
+            'skills-0-id': skills[0].pk,
+            'skills-0-name': 'Python',
+            'skills-0-level': 'expert',
+            'skills-1-id': skills[1].pk,
+            'skills-1-name': skills[1].name,
+            'skills-1-level': skills[1].level,
+            'skills-1-DELETE': 'on',
+            'skills-2-name': 'Django',
+            'skills-2-level': 'advanced',
+        }
+        return self.client.post(reverse('resume_builder:edit_skills', kwargs={'pk': self.resume.pk}), data)
+
+    def test_save_goes_to_the_next_step(self):
+        response = self.post_skills()
+        self.assertRedirects(response, reverse('resume_builder:edit_projects', kwargs={'pk': self.resume.pk}))
+        self.assertEqual(
+            list(self.resume.skills.order_by('name').values_list('name', 'level')),
+            [('Django', 'advanced'), ('Python', 'expert')],
+        )
+
+    def test_last_step_goes_to_the_preview(self):
+        response = self.client.post(reverse('resume_builder:edit_languages', kwargs={'pk': self.resume.pk}), {
+            'languages-TOTAL_FORMS': '0',
+            'languages-INITIAL_FORMS': '0',
+            'languages-MIN_NUM_FORMS': '0',
+            'languages-MAX_NUM_FORMS': '1000',
+        })
+        self.assertRedirects(response, reverse('resume_builder:preview_resume', kwargs={'pk': self.resume.pk}),
+                             fetch_redirect_response=False)
@@ -1,20 +1,22 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import json
+from concurrent import futures
+
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.forms import modelformset_factory, inlineformset_factory
-from django.http import HttpResponse, Http404
+from django.http import FileResponse, HttpResponse, Http404, JsonResponse
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_http_methods
 
-from .models import (
-    Resume, PersonalInfo, Education, Experience, 
-    Skill, Project, Certificate, Language
-)
-from .forms import (
-    ResumeForm, PersonalInfoForm, EducationForm, ExperienceForm,
-    SkillForm, ProjectForm, CertificateForm, LanguageForm
-)
-from .utils import generate_pdf
+from .models import Resume
+from .forms import ResumeForm
+from .formsets import get_formset_class
+from .pdf import RETRY_AFTER, open_resume_pdf
+from .cache import arender_resume_html, preview_version
+from .document import InvalidDocument, StaleDocument, save_resume_document, serialize_resume
 
 @login_required
 def dashboard(request):
@@ -59,316 +61,184 @@ def edit_resume(request, pk):
     
     return render(request, 'resume_builder/edit_resume.html', {'form': form, 'resume': resume})
 
-@login_required
-def edit_personal_info(request, pk):
-    """Edit personal information for a resume"""
-    resume = get_object_or_404(Resume, pk=pk)
-    
-    # Check if the current user is the owner of the resume
-    if resume.user != request.user:
-        raise PermissionDenied
-    
-    # Create a formset for PersonalInfo with only one form
-    PersonalInfoFormSet = inlineformset_factory(
-        Resume, PersonalInfo,
-        form=PersonalInfoForm,
-        extra=1 if not hasattr(resume, 'personal_info') else 0,
-        max_num=1,
-        can_delete=False,  # Disable deletion since it's required
-        exclude=['resume'],  # Exclude resume field since it's handled by formset
-    )
-    
-    if request.method == 'POST':
-        formset = PersonalInfoFormSet(request.POST, instance=resume)
-        if formset.is_valid():
-            try:
-                instances = formset.save(commit=False)
-                for instance in instances:
-                    # Clean the phone number by removing any non-digit characters
-                    if instance.phone:
-                        instance.phone = ''.join(filter(str.isdigit, instance.phone))
-                    instance.save()
-                formset.save_m2m()
-                
-                messages.success(request, 'Personal information updated successfully!')
-                return redirect('resume_builder:edit_education', pk=resume.pk)
-            except Exception as e:
-                print(f"Error saving personal info: {str(e)}")
-                messages.error(request, 'An error occurred while saving your information.')
-        else:
-            # Log formset errors for debugging
-            print(formset.errors)
-            messages.error(request, 'Please correct the errors below.')
-    else:
-        formset = PersonalInfoFormSet(instance=resume)
-    
-    context = {
-        'formset': formset, 
-        'resume': resume,
+# The wizard's steps in order; each one edits a section through its formset
+SECTION_STEPS = [
+    {
+        'section': 'personal_info',
         'section_title': 'Personal Information',
         'section_description': 'Update your contact details and summary',
         'item_name': 'Profile',
-        'active_step': 'personal_info',
-    }
-    
-    return render(request, 'resume_builder/edit_personal_info.html', context)
-
-
-
-@login_required
-def edit_education(request, pk):
-    """Edit education entries for a resume"""
-    resume = get_object_or_404(Resume, pk=pk)
-    
-    # Check if the current user is the owner of the resume
-    if resume.user != request.user:
-        raise PermissionDenied
-    
-    EducationFormSet = inlineformset_factory(
-        Resume, Education,
-        form=EducationForm,
-        extra=1,
-        can_delete=True,
-    )
-    
-    if request.method == 'POST':
-        formset = EducationFormSet(request.POST, instance=resume)
-        if formset.is_valid():
-            formset.save()
-            messages.success(request, 'Education information updated successfully!')
-            return redirect('resume_builder:edit_experience', pk=resume.pk)
-    else:
-        formset = EducationFormSet(instance=resume)
-    
-    context = {
-        'formset': formset, 
-        'resume': resume,
+        'success_message': 'Personal information updated successfully!',
+    },
+    {
+        'section': 'education',
         'section_title': 'Education',
         'section_description': 'Add your educational background, starting with the most recent',
         'item_name': 'Education',
-        'active_step': 'education',
-        'prev_url': reverse('resume_builder:edit_personal_info', kwargs={'pk': resume.pk}),
-        'prev_title': 'Personal Information'
-    }
-    
-    return render(request, 'resume_builder/edit_education.html', context)
-
-@login_required
-def edit_experience(request, pk):
-    """Edit experience entries for a resume"""
-    resume = get_object_or_404(Resume, pk=pk)
-    
-    # Check if the current user is the owner of the resume
-    if resume.user != request.user:
-        raise PermissionDenied
-    
-    ExperienceFormSet = inlineformset_factory(
-        Resume, Experience,
-        form=ExperienceForm,
-        extra=1,
-        can_delete=True,
-    )
-    
-    if request.method == 'POST':
-        formset = ExperienceFormSet(request.POST, instance=resume)
-        if formset.is_valid():
-            formset.save()
-            messages.success(request, 'Experience information updated successfully!')
-            return redirect('resume_builder:edit_skills', pk=resume.pk)
-    else:
-        formset = ExperienceFormSet(instance=resume)
-    
-    context = {
-        'formset': formset, 
-        'resume': resume,
+        'success_message': 'Education information updated successfully!',
+    },
+    {
+        'section': 'experience',
         'section_title': 'Experience',
         'section_description': 'Add your work experience, starting with the most recent',
         'item_name': 'Experience',
-        'active_step': 'experience',
-        'prev_url': reverse('resume_builder:edit_education', kwargs={'pk': resume.pk}),
-        'prev_title': 'Education'
-    }
-    
-    return render(request, 'resume_builder/edit_experience.html', context)
-
-@login_required
-def edit_skills(request, pk):
-    """Edit skills for a resume"""
-    resume = get_object_or_404(Resume, pk=pk)
-    
-    # Check if the current user is the owner of the resume
-    if resume.user != request.user:
-        raise PermissionDenied
-    
-    SkillFormSet = inlineformset_factory(
-        Resume, Skill,
-        form=SkillForm,
-        extra=3,
-        can_delete=True,
-    )
-    
-    if request.method == 'POST':
-        formset = SkillFormSet(request.POST, instance=resume)
-        if formset.is_valid():
-            formset.save()
-            messages.success(request, 'Skills updated successfully!')
-            return redirect('resume_builder:edit_projects', pk=resume.pk)
-    else:
-        formset = SkillFormSet(instance=resume)
-    
-    context = {
-        'formset': formset, 
-        'resume': resume,
+        'success_message': 'Experience information updated successfully!',
+    },
+    {
+        'section': 'skills',
         'section_title': 'Skills',
         'section_description': 'Add your technical and soft skills with proficiency levels',
         'item_name': 'Skill',
-        'active_step': 'skills',
-        'prev_url': reverse('resume_builder:edit_experience', kwargs={'pk': resume.pk}),
-        'prev_title': 'Experience'
-    }
-    
-    return render(request, 'resume_builder/edit_skills.html', context)
-
-@login_required
-def edit_projects(request, pk):
-    """Edit projects for a resume"""
-    resume = get_object_or_404(Resume, pk=pk)
-    
-    # Check if the current user is the owner of the resume
-    if resume.user != request.user:
-        raise PermissionDenied
-    
-    ProjectFormSet = inlineformset_factory(
-        Resume, Project,
-        form=ProjectForm,
-        extra=1,
-        can_delete=True,
-    )
-    
-    if request.method == 'POST':
-        formset = ProjectFormSet(request.POST, instance=resume)
-        if formset.is_valid():
-            formset.save()
-            messages.success(request, 'Projects updated successfully!')
-            return redirect('resume_builder:edit_certificates', pk=resume.pk)
-    else:
-        formset = ProjectFormSet(instance=resume)
-    
-    context = {
-        'formset': formset, 
-        'resume': resume,
+        'success_message': 'Skills updated successfully!',
+    },
+    {
+        'section': 'projects',
         'section_title': 'Projects',
         'section_description': 'Add your significant projects with descriptions and links',
         'item_name': 'Project',
-        'active_step': 'projects',
-        'prev_url': reverse('resume_builder:edit_skills', kwargs={'pk': resume.pk}),
-        'prev_title': 'Skills'
-    }
-    
-    return render(request, 'resume_builder/edit_projects.html', context)
+        'success_message': 'Projects updated successfully!',
+    },
+    {
+        'section': 'certificates',
+        'section_title': 'Certificates',
+        'section_description': 'Add professional certifications you have earned',
+        'item_name': 'Certificate',
+        'success_message': 'Certificates updated successfully!',
+    },
+    {
+        'section': 'languages',
+        'section_title': 'Languages',
+        'section_description': 'Add languages you know and your proficiency level',
+        'item_name': 'Language',
+        'success_message': 'Languages updated successfully!',
+    },
+]
+SECTION_STEP_INDEX = {step['section']: index for index, step in enumerate(SECTION_STEPS)}
+
 
 @login_required
-def edit_certificates(request, pk):
-    """Edit certificates for a resume"""
-    resume = get_object_or_404(Resume, pk=pk)
+def edit_section(request, pk, section):
+    """Edit one section of a resume; the step's settings come from SECTION_STEPS"""
+    index = SECTION_STEP_INDEX[section]
+    step = SECTION_STEPS[index]
+    queryset = Resume.objects.select_related('personal_info') if section == 'personal_info' else Resume.objects
+    resume = get_object_or_404(queryset, pk=pk)
     
     # Check if the current user is the owner of the resume
-    if resume.user != request.user:
+    if resume.user_id != request.user.pk:
         raise PermissionDenied
     
-    CertificateFormSet = inlineformset_factory(
-        Resume, Certificate,
-        form=CertificateForm,
-        extra=1,
-        can_delete=True,
-    )
+    FormSet = get_formset_class(section, resume)
     
     if request.method == 'POST':
-        formset = CertificateFormSet(request.POST, instance=resume)
+        formset = FormSet(request.POST, instance=resume)
         if formset.is_valid():
             formset.save()
-            messages.success(request, 'Certificates updated successfully!')
-            return redirect('resume_builder:edit_languages', pk=resume.pk)
+            messages.success(request, step['success_message'])
+            if index + 1 < len(SECTION_STEPS):
+                return redirect(f'resume_builder:edit_{SECTION_STEPS[index + 1]["section"]}', pk=resume.pk)
+            return redirect('resume_builder:preview_resume', pk=resume.pk)
+        messages.error(request, 'Please correct the errors below.')
     else:
-        formset = CertificateFormSet(instance=resume)
+        formset = FormSet(instance=resume)
     
     context = {
         'formset': formset, 
         'resume': resume,
-        'section_title': 'Certificates',
-        'section_description': 'Add professional certifications you have earned',
-        'item_name': 'Certificate',
-        'active_step': 'certificates',
-        'prev_url': reverse('resume_builder:edit_projects', kwargs={'pk': resume.pk}),
-        'prev_title': 'Projects'
+        'section_title': step['section_title'],
+        'section_description': step['section_description'],
+        'item_name': step['item_name'],
+        'active_step': section,
     }
+    if index:
+        previous = SECTION_STEPS[index - 1]
+        context['prev_url'] = reverse(f'resume_builder:edit_{previous["section"]}', kwargs={'pk': resume.pk})
+        context['prev_title'] = previous['section_title']
     
-    return render(request, 'resume_builder/edit_certificates.html', context)
+    return render(request, f'resume_builder/edit_{section}.html', context)
 
 @login_required
-def edit_languages(request, pk):
-    """Edit languages for a resume"""
-    resume = get_object_or_404(Resume, pk=pk)
+@require_http_methods(['GET', 'POST'])
+def resume_document(request, pk):
+    """Read or save the whole resume as one JSON document"""
+    resume = get_object_or_404(Resume.objects.only('pk', 'user_id'), pk=pk)
     
     # Check if the current user is the owner of the resume
-    if resume.user != request.user:
+    if resume.user_id != request.user.pk:
         raise PermissionDenied
     
-    LanguageFormSet = inlineformset_factory(
-        Resume, Language,
-        form=LanguageForm,
-        extra=1,
-        can_delete=True,
-    )
-    
-    if request.method == 'POST':
-        formset = LanguageFormSet(request.POST, instance=resume)
-        if formset.is_valid():
-            formset.save()
-            messages.success(request, 'Languages updated successfully!')
-            return redirect('resume_builder:preview_resume', pk=resume.pk)
-    else:
-        formset = LanguageFormSet(instance=resume)
-    
-    context = {
-        'formset': formset, 
-        'resume': resume,
-        'section_title': 'Languages',
-        'section_description': 'Add languages you know and your proficiency level',
-        'item_name': 'Language',
-        'active_step': 'languages',
-        'prev_url': reverse('resume_builder:edit_certificates', kwargs={'pk': resume.pk}),
-        'prev_title': 'Certificates'
-    }
-    
-    return render(request, 'resume_builder/edit_languages.html', context)
+    if request.method == 'GET':
+        return JsonResponse(serialize_resume(Resume.objects.with_sections().get(pk=pk)))
+    
+    try:
+        document = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'errors': {'__all__': 'Invalid JSON.'}}, status=400)
+    if not isinstance(document, dict):
+        return JsonResponse({'errors': {'__all__': 'Expected a JSON object.'}}, status=400)
+    
+    try:
+        content_version, ids = save_resume_document(pk, document)
+    except InvalidDocument as e:
+        return JsonResponse({'errors': e.errors, 'content_version': e.content_version}, status=400)
+    except StaleDocument as e:
+        return JsonResponse({'errors': {'__all__': 'The resume was changed elsewhere.'},
+                             'content_version': e.content_version}, status=409)
+    return JsonResponse({'content_version': content_version, 'ids': ids})
 
 @login_required
-def preview_resume(request, pk):
+async def preview_resume(request, pk):
     """Preview the resume"""
-    resume = get_object_or_404(Resume, pk=pk)
+    # Templates read request.user synchronously, so load it with the async ORM first
+    request.user = await request.auser()
+    # Only the fields that identify the rendered version are loaded up front
+    resume = await aget_object_or_404(
+        Resume.objects.only('pk', 'user_id', 'title', 'template', 'content_version'), pk=pk
+    )
     
     # Check if the current user is the owner of the resume
-    if resume.user != request.user:
+    if resume.user_id != request.user.pk:
         raise PermissionDenied
     
     # Check if we want to render the HTML content directly (for iframe)
     if request.GET.get('format') == 'html':
-        template_path = f'resume_builder/resume_templates/{resume.template}.html'
-        return render(request, template_path, {'resume': resume})
-    
-    return render(request, 'resume_builder/preview_resume.html', {'resume': resume})
+        etag = quote_etag(preview_version(resume))
+        # Weak comparison: GZipMiddleware hands gzipping clients a W/ ETag
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(await arender_resume_html(resume, request))
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    return render(request, 'resume_builder/preview_resume.html', {
+        'resume': resume,
+        'resume_html': await arender_resume_html(resume, request),
+    })
 
 @login_required
 def download_resume(request, pk):
-    """Show coming soon page for PDF download"""
-    resume = get_object_or_404(Resume, pk=pk)
+    """Download the resume as a PDF"""
+    resume = get_object_or_404(
+        Resume.objects.only('pk', 'user_id', 'template', 'content_version'), pk=pk
+    )
     
     # Check if the current user is the owner of the resume
-    if resume.user != request.user:
+    if resume.user_id != request.user.pk:
         raise PermissionDenied
     
-    return render(request, 'resume_builder/coming_soon.html', {'resume': resume})
+    try:
+        pdf = open_resume_pdf(resume)
+    except futures.TimeoutError:
+        # The render goes on in the background; the retry will find it cached
+        response = HttpResponse('The PDF is still being generated, please try again shortly.',
+                                status=503, content_type='text/plain')
+        response['Retry-After'] = str(RETRY_AFTER)
+        return response
+    return FileResponse(
+        pdf, as_attachment=True,
+        filename=f'resume_{resume.pk}.pdf', content_type='application/pdf',
+    )
 
 @login_required
 def delete_resume(request, pk):